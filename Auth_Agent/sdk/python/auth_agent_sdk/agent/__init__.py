@@ -6,11 +6,20 @@ Includes browser-use integration for seamless browser automation.
 """
 
 from .auth_agent_agent_sdk import AuthAgentSDK
+from .status_poller import StatusPoller
+from .polling import PollStrategy, FixedPoll, ExponentialPoll, JitteredPoll, FastThenSlowPoll
+from .host_cache import HostSettings
 
 # Browser-use integration (optional, requires browser-use package)
 try:
     from .browser_use import AuthAgentTools
-    __all__ = ["AuthAgentSDK", "AuthAgentTools"]
+    __all__ = [
+        "AuthAgentSDK", "StatusPoller", "PollStrategy", "FixedPoll", "ExponentialPoll",
+        "JitteredPoll", "FastThenSlowPoll", "HostSettings", "AuthAgentTools",
+    ]
 except ImportError:
     # browser-use not installed, only export SDK
-    __all__ = ["AuthAgentSDK"]
+    __all__ = [
+        "AuthAgentSDK", "StatusPoller", "PollStrategy", "FixedPoll", "ExponentialPoll",
+        "JitteredPoll", "FastThenSlowPoll", "HostSettings",
+    ]
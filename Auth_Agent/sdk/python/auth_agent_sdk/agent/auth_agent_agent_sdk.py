@@ -15,19 +15,16 @@ Usage:
     # Complete flow - extracts server URL from authorization URL automatically
     status = await sdk.complete_authentication_flow_async(authorization_url)
     print(f'Authorization code: {status["code"]}')
+
+    # Reuse one pooled connection for every call and close it when done
+    async with AuthAgentSDK(agent_id='agent_xxx', agent_secret='secret_xxx', model='gpt-4') as sdk:
+        status = await sdk.complete_authentication_flow_async(authorization_url)
 """
 
-import re
 import json
 import time
-from typing import Optional, Dict, Any, Callable, List
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple, Union
 from urllib.parse import urlencode, urlparse
-try:
-    import aiohttp
-    ASYNC_AVAILABLE = True
-except ImportError:
-    ASYNC_AVAILABLE = False
-    import requests
 
 from ..common.errors import (
     AuthAgentError,
@@ -36,8 +33,24 @@ from ..common.errors import (
     AuthAgentValidationError,
     AuthAgentSecurityError,
 )
-from ..common.validation import validate_url
-from ..common.retry import retry_with_backoff, retry_with_backoff_async, RetryOptions
+from ..common.deadline import Deadline
+from ..common.validation import URLValidator
+from ..common.host_matcher import HostMatcher
+from ..common.retry import (
+    retry_with_backoff,
+    retry_with_backoff_async,
+    RetryOptions,
+    RetryBudget,
+    CircuitBreakerRegistry,
+    parse_retry_after,
+)
+from ..common.transport import AsyncTransport, SyncTransport, PoolOptions, ASYNC_AVAILABLE, iter_body
+from ..common.batch import BatchRun
+from ..common.singleflight import SingleFlight
+from .status_poller import StatusPoller
+from .polling import PollStrategy, FixedPoll
+from .extraction import RequestIdScanner, find_request_id, CHUNK_SIZE, DEFAULT_MAX_PAGE_BYTES, NOT_FOUND_MESSAGE
+from .host_cache import HostCache, HostEntry, HostSettings
 
 
 class AuthAgentSDK:
@@ -48,8 +61,19 @@ class AuthAgentSDK:
         agent_id: str,
         agent_secret: str,
         model: str,
-        allowed_hosts: Optional[List[str]] = None,
-        retry_options: Optional[RetryOptions] = None
+        allowed_hosts: Optional[Union[List[str], HostMatcher]] = None,
+        retry_options: Optional[RetryOptions] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        pool_options: Optional[PoolOptions] = None,
+        transport: Optional[AsyncTransport] = None,
+        sync_transport: Optional[SyncTransport] = None,
+        max_page_bytes: int = DEFAULT_MAX_PAGE_BYTES,
+        host_settings: Optional[Dict[str, HostSettings]] = None,
+        max_hosts: int = 64,
+        url_validator: Optional[URLValidator] = None,
+        circuit_breakers: Optional[CircuitBreakerRegistry] = None,
+        max_polls_in_flight: int = 10,
+        max_polls_per_second: Optional[float] = None
     ):
         """
         Initialize Auth Agent SDK.
@@ -58,8 +82,27 @@ class AuthAgentSDK:
             agent_id: Agent ID registered with Auth Agent
             agent_secret: Agent secret (keep secure!)
             model: Model identifier (e.g., 'gpt-4', 'claude-3.5-sonnet')
-            allowed_hosts: Optional whitelist of allowed hosts for SSRF protection
+            allowed_hosts: Optional whitelist of allowed hosts for SSRF protection, or a
+                HostMatcher that can be shared and reloaded
             retry_options: Optional retry configuration
+            retry_budget: Optional budget that caps retries as a share of requests across
+                every call made by this instance (default: retry_options' budget, which is
+                none unless set)
+            pool_options: Optional connection pool configuration (limits, keep-alive)
+            transport: Optional shared async transport; when given, the caller owns its lifetime
+            sync_transport: Optional shared sync transport; when given, the caller owns its lifetime
+            max_page_bytes: Maximum bytes of the authorization page read while looking for request_id
+            host_settings: Optional per-hostname overrides (retry options, dedicated pool)
+            max_hosts: Maximum number of auth-server origins kept in the resolution cache
+            url_validator: Optional URL policy; overrides allowed_hosts (e.g. to reach a local
+                test server)
+            circuit_breakers: Optional per-origin circuit breakers, e.g. shared with other
+                SDK instances (default: a registry for this instance)
+            max_polls_in_flight: Maximum status checks in flight across all async waits
+                (default: 10). With many waiters this, not poll_interval, sets how often
+                each request is polled
+            max_polls_per_second: Optional cap on status checks per second across all async
+                waits (default: no cap)
         """
         if not agent_id or not agent_secret or not model:
             raise AuthAgentValidationError('agent_id, agent_secret, and model are required')
@@ -69,7 +112,61 @@ class AuthAgentSDK:
         self.agent_secret = agent_secret
         self.model = model
         self.allowed_hosts = allowed_hosts
+        self.url_validator = url_validator or URLValidator(allowed_hosts)
         self.retry_options = retry_options or RetryOptions()
+        if retry_budget is not None:
+            self.retry_options = self.retry_options.with_retry_budget(retry_budget)
+        self.max_page_bytes = max_page_bytes
+        self._owns_transport = transport is None
+        self.transport = transport or AsyncTransport(pool_options)
+        self._owns_sync_transport = sync_transport is None
+        self.sync_transport = sync_transport or SyncTransport(pool_options)
+        self.host_settings = host_settings or {}
+        self.circuit_breakers = circuit_breakers if circuit_breakers is not None else CircuitBreakerRegistry()
+        # Validated base URL, pools and settings per auth-server origin
+        self.hosts = HostCache(self._create_host_entry, max_hosts)
+        # Concurrent identical requests share one round trip
+        self.single_flight = SingleFlight()
+        # One background loop polls every pending request_id for this SDK instance
+        self.status_poller = StatusPoller(
+            lambda request_id, authorization_url, deadline: self.check_status_async(
+                request_id, authorization_url, deadline
+            ),
+            max_in_flight=max_polls_in_flight,
+            max_polls_per_second=max_polls_per_second
+        )
+
+    def __enter__(self) -> 'AuthAgentSDK':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    async def __aenter__(self) -> 'AuthAgentSDK':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    def close(self) -> None:
+        """
+        Close pooled connections owned by this SDK instance.
+
+        Prefer aclose() from async code: the shared async pool is only closed
+        there, and dedicated per-host async pools cannot be closed from inside
+        a running event loop.
+        """
+        self.hosts.close()
+        if self._owns_sync_transport:
+            self.sync_transport.close()
+
+    async def aclose(self) -> None:
+        """Stop status polling and close all pooled connections owned by this SDK instance."""
+        await self.status_poller.aclose()
+        await self.hosts.aclose()
+        self.close()
+        if self._owns_transport:
+            await self.transport.aclose()
 
     def _extract_auth_server_url(self, authorization_url: str) -> str:
         """
@@ -82,13 +179,63 @@ class AuthAgentSDK:
             Base URL (protocol + host)
         """
         try:
-            parsed = validate_url(authorization_url, self.allowed_hosts)
+            parsed = self.url_validator.validate(authorization_url)
             return f"{parsed.scheme}://{parsed.netloc}"
         except (AuthAgentSecurityError, AuthAgentValidationError):
             raise
         except Exception as e:
             raise AuthAgentValidationError(f"Invalid authorization URL: {authorization_url}") from e
 
+    def _create_host_entry(self, authorization_url: str) -> HostEntry:
+        """
+        Validate a new auth-server origin and build its cache entry.
+
+        Args:
+            authorization_url: Authorization URL on the new origin
+
+        Returns:
+            HostEntry with the base URL, pools and retry options for the origin
+        """
+        policy_version = self.url_validator.policy_version
+        base_url = self._extract_auth_server_url(authorization_url)
+        settings = self.host_settings.get(urlparse(base_url).hostname or '') or HostSettings()
+        retry_options = settings.retry_options or self.retry_options
+        breaker = self.circuit_breakers.get(base_url)
+
+        if settings.pool_options is not None:
+            return HostEntry(
+                base_url,
+                retry_options,
+                AsyncTransport(settings.pool_options),
+                SyncTransport(settings.pool_options),
+                owns_transports=True,
+                policy_version=policy_version,
+                breaker=breaker
+            )
+        return HostEntry(
+            base_url, retry_options, self.transport, self.sync_transport,
+            policy_version=policy_version, breaker=breaker
+        )
+
+    def _get_host(self, authorization_url: str) -> HostEntry:
+        """
+        Resolve the auth server for an authorization URL.
+
+        Args:
+            authorization_url: Authorization URL to resolve
+
+        Returns:
+            Cached HostEntry for the URL's origin
+        """
+        entry = self.hosts.get(authorization_url)
+        policy_version = self.url_validator.policy_version
+        if entry.policy_version != policy_version:
+            # allowed_hosts was reloaded since this origin was validated
+            self.url_validator.validate(entry.base_url)
+            entry.policy_version = policy_version
+        self.auth_server_url = entry.base_url
+        return entry
+
     def _get_auth_server_url(self, authorization_url: str) -> str:
         """
         Get or extract auth server URL.
@@ -99,86 +246,87 @@ class AuthAgentSDK:
         Returns:
             Base URL of auth server
         """
-        if not self.auth_server_url:
-            self.auth_server_url = self._extract_auth_server_url(authorization_url)
-        return self.auth_server_url
+        return self._get_host(authorization_url).base_url
 
-    def extract_request_id(self, authorization_url_or_html: str) -> str:
+    def extract_request_id(
+        self,
+        authorization_url_or_html: str,
+        deadline: Optional[Deadline] = None
+    ) -> str:
         """
         Extract request_id from authorization page HTML or URL.
 
+        When given a URL, the page is streamed and reading stops as soon as
+        window.authRequest is found, or after `max_page_bytes`.
+
         Args:
             authorization_url_or_html: Full authorization URL or HTML content
+            deadline: Optional deadline bounding the fetch, retries included
 
         Returns:
             request_id string
 
         Raises:
             ValueError: If request_id cannot be extracted
-            RuntimeError: If using async methods without aiohttp
+            AuthAgentTimeoutError: If the deadline passes first
+            RuntimeError: If requests is not installed
         """
         # If it's a URL, extract auth server URL and fetch the HTML
         if authorization_url_or_html.startswith('http://') or authorization_url_or_html.startswith('https://'):
-            # Extract and store auth server URL
-            self.auth_server_url = self._extract_auth_server_url(authorization_url_or_html)
-            # It's a URL - fetch it
-            if ASYNC_AVAILABLE:
-                raise RuntimeError("Use extract_request_id_async() for async requests, or install 'requests' for sync")
-            else:
-                import requests
-                def _fetch():
-                    response = requests.get(
-                        authorization_url_or_html,
-                        timeout=self.retry_options.timeout
-                    )
-                    response.raise_for_status()
-                    return response.text
-                
-                html = retry_with_backoff(_fetch, self.retry_options)
-        else:
-            # Assume it's HTML content
-            html = authorization_url_or_html
-
-        # Try to extract from window.authRequest in script tag
-        window_auth_match = re.search(
-            r'window\.authRequest\s*=\s*\{[^}]*request_id:\s*[\'"]([^\'"]+)[\'"]',
-            html
-        )
-        if window_auth_match:
-            return window_auth_match.group(1)
+            # Resolve (and cache) the auth server for this URL
+            host = self._get_host(authorization_url_or_html)
 
-        # Try alternative pattern: request_id: '...'
-        direct_match = re.search(
-            r'request_id:\s*[\'"]([^\'"]+)[\'"]',
-            html
-        )
-        if direct_match:
-            return direct_match.group(1)
+            def _fetch():
+                attempt = Deadline.within(host.retry_options.timeout, deadline)
+                response = host.sync_transport.stream('GET', authorization_url_or_html, attempt)
+                with response:
+                    if not response.ok:
+                        error = AuthAgentNetworkError(
+                            f"Failed to fetch authorization page: {response.status_code} {response.reason}"
+                        )
+                        error.status_code = response.status_code
+                        error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        raise error
 
-        # Try extracting from script tag more flexibly
-        script_match = re.search(
-            r'<script[^>]*>[\s\S]*?request_id[^}]*[\'"]([^\'"]+)[\'"]',
-            html
-        )
-        if script_match:
-            return script_match.group(1)
+                    scanner = RequestIdScanner(self.max_page_bytes, response.encoding)
+                    for chunk in iter_body(response, attempt, CHUNK_SIZE):
+                        request_id = scanner.feed(chunk)
+                        if request_id:
+                            return request_id
+                        if scanner.exhausted:
+                            break
+                    return scanner.finish()
 
-        raise AuthAgentValidationError(
-            'Could not extract request_id from authorization page. Make sure the page is loaded correctly and contains window.authRequest.request_id.'
-        )
+            return retry_with_backoff(_fetch, host.retry_options, host.breaker, deadline)
+
+        # Assume it's HTML content
+        request_id = find_request_id(authorization_url_or_html)
+        if request_id:
+            return request_id
+
+        raise AuthAgentValidationError(NOT_FOUND_MESSAGE)
 
-    async def extract_request_id_async(self, authorization_url_or_html: str) -> str:
+    async def extract_request_id_async(
+        self,
+        authorization_url_or_html: str,
+        deadline: Optional[Deadline] = None
+    ) -> str:
         """
         Extract request_id from authorization page HTML or URL (async version).
 
+        When given a URL, the page is streamed and reading stops as soon as
+        window.authRequest is found, or after `max_page_bytes`.
+
         Args:
             authorization_url_or_html: Full authorization URL or HTML content
+            deadline: Optional deadline bounding the fetch, retries included
 
         Returns:
             request_id string
 
         Raises:
             ValueError: If request_id cannot be extracted
+            AuthAgentTimeoutError: If the deadline passes first
             RuntimeError: If aiohttp is not installed
         """
         if not ASYNC_AVAILABLE:
@@ -186,42 +334,56 @@ class AuthAgentSDK:
 
         # If it's a URL, extract auth server URL and fetch the HTML
         if authorization_url_or_html.startswith('http://') or authorization_url_or_html.startswith('https://'):
-            # Extract and store auth server URL
-            self.auth_server_url = self._extract_auth_server_url(authorization_url_or_html)
-            
+            # Resolve (and cache) the auth server for this URL
+            host = self._get_host(authorization_url_or_html)
+
             async def _fetch():
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(authorization_url_or_html) as response:
-                        if not response.ok:
-                            raise AuthAgentNetworkError(
-                                f"Failed to fetch authorization page: {response.status} {response.reason}"
-                            )
-                        return await response.text()
-            
-            html = await retry_with_backoff_async(_fetch, self.retry_options)
-        else:
-            # Assume it's HTML content
-            html = authorization_url_or_html
+                session = await host.transport.get_session()
+                async with session.get(authorization_url_or_html) as response:
+                    if not response.ok:
+                        error = AuthAgentNetworkError(
+                            f"Failed to fetch authorization page: {response.status} {response.reason}"
+                        )
+                        error.status_code = response.status
+                        error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        raise error
+
+                    scanner = RequestIdScanner(self.max_page_bytes, response.charset)
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        request_id = scanner.feed(chunk)
+                        if request_id:
+                            return request_id
+                        if scanner.exhausted:
+                            break
+                    return scanner.finish()
+
+            return await retry_with_backoff_async(_fetch, host.retry_options, host.breaker, deadline)
 
         # Use same extraction logic as sync version
-        return self.extract_request_id(html)
+        return self.extract_request_id(authorization_url_or_html)
 
-    def authenticate(self, request_id: str, authorization_url: str) -> Dict[str, Any]:
+    def authenticate(
+        self,
+        request_id: str,
+        authorization_url: str,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Authenticate the agent with Auth Agent server.
 
         Args:
             request_id: Request ID extracted from authorization page
             authorization_url: Authorization URL (used to extract server URL)
+            deadline: Optional deadline bounding the request, retries included
 
         Returns:
             Authentication result dictionary with 'success', 'message', 'error', etc.
 
         Raises:
-            RuntimeError: If using async methods without aiohttp
+            RuntimeError: If requests is not installed
         """
-        auth_server_url = self._get_auth_server_url(authorization_url)
-        url = f"{auth_server_url}/api/agent/authenticate"
+        host = self._get_host(authorization_url)
+        url = f"{host.base_url}/api/agent/authenticate"
 
         payload = {
             'request_id': request_id,
@@ -230,53 +392,56 @@ class AuthAgentSDK:
             'model': self.model,
         }
 
-        if ASYNC_AVAILABLE:
-            raise RuntimeError("Use authenticate_async() for async requests, or install 'requests' for sync")
-        else:
-            import requests
-            def _authenticate():
-                response = requests.post(
-                    url,
-                    json=payload,
-                    timeout=self.retry_options.timeout
+        def _authenticate():
+            attempt = Deadline.within(host.retry_options.timeout, deadline)
+            response = host.sync_transport.request('POST', url, attempt, json=payload)
+            data = response.json()
+
+            if not response.ok:
+                error_msg = (
+                    f"Authentication failed: {data.get('error_description', data.get('error', f'HTTP {response.status_code}'))}"
                 )
-                data = response.json()
-                
-                if not response.ok:
-                    error_msg = (
-                        f"Authentication failed: {data.get('error_description', data.get('error', f'HTTP {response.status_code}'))}"
-                    )
-                    error = AuthAgentNetworkError(error_msg)
-                    error.status_code = response.status_code
-                    raise error
-                
-                return {
-                    'success': True,
-                    'message': data.get('message', 'Agent authenticated successfully'),
-                }
-            
-            try:
-                return retry_with_backoff(_authenticate, self.retry_options)
-            except AuthAgentNetworkError as e:
-                return {
-                    'success': False,
-                    'error': 'network_error',
-                    'error_description': e.message,
-                }
-            except Exception as e:
-                return {
-                    'success': False,
-                    'error': 'network_error',
-                    'error_description': str(e),
-                }
+                error = AuthAgentNetworkError(error_msg)
+                error.status_code = response.status_code
+                error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                raise error
+
+            return {
+                'success': True,
+                'message': data.get('message', 'Agent authenticated successfully'),
+                'requires_2fa': data.get('requires_2fa', False),
+                'expires_in': data.get('expires_in'),
+                'data': data,
+            }
 
-    async def authenticate_async(self, request_id: str, authorization_url: str) -> Dict[str, Any]:
+        try:
+            return retry_with_backoff(_authenticate, host.retry_options, host.breaker, deadline)
+        except AuthAgentNetworkError as e:
+            return {
+                'success': False,
+                'error': 'network_error',
+                'error_description': e.message,
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': 'network_error',
+                'error_description': str(e),
+            }
+
+    async def authenticate_async(
+        self,
+        request_id: str,
+        authorization_url: str,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Authenticate the agent with Auth Agent server (async version).
 
         Args:
             request_id: Request ID extracted from authorization page
             authorization_url: Authorization URL (used to extract server URL)
+            deadline: Optional deadline bounding the request, retries included
 
         Returns:
             Authentication result dictionary with 'success', 'message', 'error', etc.
@@ -287,8 +452,8 @@ class AuthAgentSDK:
         if not ASYNC_AVAILABLE:
             raise RuntimeError("aiohttp is required for async methods. Install with: pip install aiohttp")
 
-        auth_server_url = self._get_auth_server_url(authorization_url)
-        url = f"{auth_server_url}/api/agent/authenticate"
+        host = self._get_host(authorization_url)
+        url = f"{host.base_url}/api/agent/authenticate"
 
         payload = {
             'request_id': request_id,
@@ -298,28 +463,29 @@ class AuthAgentSDK:
         }
 
         async def _authenticate():
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload) as response:
-                    data = await response.json()
+            session = await host.transport.get_session()
+            async with session.post(url, json=payload) as response:
+                data = await response.json()
                     
-                    if not response.ok:
-                        error_msg = (
-                            f"Authentication failed: {data.get('error_description', data.get('error', f'HTTP {response.status}'))}"
-                        )
-                        error = AuthAgentNetworkError(error_msg)
-                        error.status_code = response.status
-                        raise error
+                if not response.ok:
+                    error_msg = (
+                        f"Authentication failed: {data.get('error_description', data.get('error', f'HTTP {response.status}'))}"
+                    )
+                    error = AuthAgentNetworkError(error_msg)
+                    error.status_code = response.status
+                    error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    raise error
 
-                    return {
-                        'success': True,
-                        'message': data.get('message', 'Agent authenticated successfully'),
-                        'requires_2fa': data.get('requires_2fa', False),
-                        'expires_in': data.get('expires_in'),
-                        'data': data,
-                    }
+                return {
+                    'success': True,
+                    'message': data.get('message', 'Agent authenticated successfully'),
+                    'requires_2fa': data.get('requires_2fa', False),
+                    'expires_in': data.get('expires_in'),
+                    'data': data,
+                }
         
         try:
-            return await retry_with_backoff_async(_authenticate, self.retry_options)
+            return await retry_with_backoff_async(_authenticate, host.retry_options, host.breaker, deadline)
         except AuthAgentNetworkError as e:
             return {
                 'success': False,
@@ -333,7 +499,13 @@ class AuthAgentSDK:
                 'error_description': str(e),
             }
 
-    async def verify_2fa_async(self, request_id: str, code: str, authorization_url: str) -> Dict[str, Any]:
+    async def verify_2fa_async(
+        self,
+        request_id: str,
+        code: str,
+        authorization_url: str,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Verify 2FA code with Auth Agent server (async version).
 
@@ -341,6 +513,7 @@ class AuthAgentSDK:
             request_id: Request ID from the initial authentication
             code: 6-digit verification code from email
             authorization_url: Authorization URL (used to extract server URL)
+            deadline: Optional deadline bounding the request, retries included
 
         Returns:
             Verification result dictionary with 'success', 'message', 'error', etc.
@@ -351,8 +524,8 @@ class AuthAgentSDK:
         if not ASYNC_AVAILABLE:
             raise RuntimeError("aiohttp is required for async methods. Install with: pip install aiohttp")
 
-        auth_server_url = self._get_auth_server_url(authorization_url)
-        url = f"{auth_server_url}/api/agent/verify-2fa"
+        host = self._get_host(authorization_url)
+        url = f"{host.base_url}/api/agent/verify-2fa"
 
         payload = {
             'request_id': request_id,
@@ -361,26 +534,27 @@ class AuthAgentSDK:
         }
 
         async def _verify():
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload) as response:
-                    data = await response.json()
+            session = await host.transport.get_session()
+            async with session.post(url, json=payload) as response:
+                data = await response.json()
 
-                    if not response.ok:
-                        error_msg = (
-                            f"2FA verification failed: {data.get('error_description', data.get('error', f'HTTP {response.status}'))}"
-                        )
-                        error = AuthAgentNetworkError(error_msg)
-                        error.status_code = response.status
-                        raise error
+                if not response.ok:
+                    error_msg = (
+                        f"2FA verification failed: {data.get('error_description', data.get('error', f'HTTP {response.status}'))}"
+                    )
+                    error = AuthAgentNetworkError(error_msg)
+                    error.status_code = response.status
+                    error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    raise error
 
-                    return {
-                        'success': True,
-                        'message': data.get('message', '2FA verification successful'),
-                        'data': data,
-                    }
+                return {
+                    'success': True,
+                    'message': data.get('message', '2FA verification successful'),
+                    'data': data,
+                }
         
         try:
-            return await retry_with_backoff_async(_verify, self.retry_options)
+            return await retry_with_backoff_async(_verify, host.retry_options, host.breaker, deadline)
         except AuthAgentNetworkError as e:
             return {
                 'success': False,
@@ -394,49 +568,60 @@ class AuthAgentSDK:
                 'error_description': str(e),
             }
 
-    def check_status(self, request_id: str, authorization_url: str) -> Dict[str, Any]:
+    def check_status(
+        self,
+        request_id: str,
+        authorization_url: str,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Check authentication status.
 
         Args:
             request_id: Request ID to check
             authorization_url: Authorization URL (used to extract server URL)
+            deadline: Optional deadline bounding the request, retries included
 
         Returns:
             Status dictionary with 'status', 'code', 'redirect_uri', etc.
 
         Raises:
-            RuntimeError: If using async methods without aiohttp
+            RuntimeError: If requests is not installed
         """
-        auth_server_url = self._get_auth_server_url(authorization_url)
-        url = f"{auth_server_url}/api/check-status"
+        host = self._get_host(authorization_url)
+        url = f"{host.base_url}/api/check-status"
         params = {'request_id': request_id}
 
-        if ASYNC_AVAILABLE:
-            raise RuntimeError("Use check_status_async() for async requests, or install 'requests' for sync")
-        else:
-            import requests
-            def _check():
-                response = requests.get(
-                    url,
-                    params=params,
-                    timeout=self.retry_options.timeout
+        def _check():
+            attempt = Deadline.within(host.retry_options.timeout, deadline)
+            response = host.sync_transport.request('GET', url, attempt, params=params)
+            if not response.ok:
+                error = AuthAgentNetworkError(
+                    f"Status check failed: {response.status_code} {response.reason}"
                 )
-                if not response.ok:
-                    raise AuthAgentNetworkError(
-                        f"Status check failed: {response.status_code} {response.reason}"
-                    )
-                return response.json()
-            
-            return retry_with_backoff(_check, self.retry_options)
+                error.status_code = response.status_code
+                error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                raise error
+            return response.json()
+
+        return retry_with_backoff(_check, host.retry_options, host.breaker, deadline)
 
-    async def check_status_async(self, request_id: str, authorization_url: str) -> Dict[str, Any]:
+    async def check_status_async(
+        self,
+        request_id: str,
+        authorization_url: str,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """
         Check authentication status (async version).
 
+        Concurrent checks of the same request_id share one HTTP request, which
+        runs under the deadline of the caller that started it.
+
         Args:
             request_id: Request ID to check
             authorization_url: Authorization URL (used to extract server URL)
+            deadline: Optional deadline bounding the request, retries included
 
         Returns:
             Status dictionary with 'status', 'code', 'redirect_uri', etc.
@@ -447,20 +632,27 @@ class AuthAgentSDK:
         if not ASYNC_AVAILABLE:
             raise RuntimeError("aiohttp is required for async methods. Install with: pip install aiohttp")
 
-        auth_server_url = self._get_auth_server_url(authorization_url)
-        url = f"{auth_server_url}/api/check-status"
+        host = self._get_host(authorization_url)
+        url = f"{host.base_url}/api/check-status"
         params = {'request_id': request_id}
 
         async def _check():
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    if not response.ok:
-                        raise AuthAgentNetworkError(
-                            f"Status check failed: {response.status} {response.reason}"
-                        )
-                    return await response.json()
-        
-        return await retry_with_backoff_async(_check, self.retry_options)
+            session = await host.transport.get_session()
+            async with session.get(url, params=params) as response:
+                if not response.ok:
+                    error = AuthAgentNetworkError(
+                        f"Status check failed: {response.status} {response.reason}"
+                    )
+                    error.status_code = response.status
+                    error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    raise error
+                return await response.json()
+
+        status = await self.single_flight.do(
+            ('check-status', host.base_url, request_id),
+            lambda: retry_with_backoff_async(_check, host.retry_options, host.breaker, deadline)
+        )
+        return dict(status)
 
     def wait_for_authentication(
         self,
@@ -468,34 +660,44 @@ class AuthAgentSDK:
         authorization_url: str,
         poll_interval: float = 0.5,
         timeout: float = 60.0,
-        on_status_update: Optional[Callable[[Dict[str, Any]], None]] = None
+        on_status_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+        poll_strategy: Optional[PollStrategy] = None,
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Any]:
         """
         Wait for authentication to complete by polling status.
 
+        Each status check is cut off when the wait's deadline passes, so the
+        call returns within `timeout` even if the server stops responding.
+
         Args:
             request_id: Request ID to poll
             authorization_url: Authorization URL (used to extract server URL)
             poll_interval: Seconds between polls (default: 0.5)
             timeout: Maximum wait time in seconds (default: 60.0)
             on_status_update: Optional callback function called on each status check
+            poll_strategy: Optional polling schedule (e.g. FastThenSlowPoll()); overrides poll_interval
+            deadline: Optional deadline; the wait ends at whichever of it and `timeout` comes first
 
         Returns:
             Final status dictionary with authorization code
 
         Raises:
             TimeoutError: If authentication times out
-            RuntimeError: If using async methods without aiohttp
+            RuntimeError: If requests is not installed
         """
-        start_time = time.time()
+        strategy = poll_strategy or FixedPoll(poll_interval)
+        wait_deadline = Deadline.within(timeout, deadline)
+        attempt = 0
 
         while True:
-            # Check timeout
-            if time.time() - start_time > timeout:
-                raise TimeoutError('Authentication timeout - exceeded maximum wait time')
-
             # Check status
-            status = self.check_status(request_id, authorization_url)
+            try:
+                status = self.check_status(request_id, authorization_url, wait_deadline)
+            except AuthAgentTimeoutError:
+                if wait_deadline.expired:
+                    raise TimeoutError('Authentication timeout - exceeded maximum wait time')
+                raise
 
             # Call status update callback
             if on_status_update:
@@ -510,8 +712,12 @@ class AuthAgentSDK:
                 error_msg = status.get('error', 'Authentication failed')
                 raise RuntimeError(error_msg)
 
-            # Still pending, wait and continue polling
-            time.sleep(poll_interval)
+            # Still pending, wait (never past the deadline) and continue polling
+            remaining = wait_deadline.remaining()
+            if remaining <= 0:
+                raise TimeoutError('Authentication timeout - exceeded maximum wait time')
+            time.sleep(strategy.next_delay(attempt, remaining))
+            attempt += 1
 
     async def wait_for_authentication_async(
         self,
@@ -519,17 +725,25 @@ class AuthAgentSDK:
         authorization_url: str,
         poll_interval: float = 0.5,
         timeout: float = 60.0,
-        on_status_update: Optional[Callable[[Dict[str, Any]], None]] = None
+        on_status_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+        poll_strategy: Optional[PollStrategy] = None,
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Any]:
         """
         Wait for authentication to complete by polling status (async version).
 
+        Polls are scheduled by the SDK's shared StatusPoller, so concurrent waits
+        on the same request_id share one poll stream, and all pending requests
+        are polled from a single background loop.
+
         Args:
             request_id: Request ID to poll
             authorization_url: Authorization URL (used to extract server URL)
             poll_interval: Seconds between polls (default: 0.5)
             timeout: Maximum wait time in seconds (default: 60.0)
             on_status_update: Optional callback function called on each status check
+            poll_strategy: Optional polling schedule (e.g. FastThenSlowPoll()); overrides poll_interval
+            deadline: Optional deadline; the wait ends at whichever of it and `timeout` comes first
 
         Returns:
             Final status dictionary with authorization code
@@ -541,102 +755,169 @@ class AuthAgentSDK:
         if not ASYNC_AVAILABLE:
             raise RuntimeError("aiohttp is required for async methods. Install with: pip install aiohttp")
 
-        import asyncio
-        start_time = time.time()
-
-        while True:
-            # Check timeout
-            if time.time() - start_time > timeout:
+        if deadline is not None:
+            timeout = deadline.cap(timeout)
+            if timeout <= 0:
                 raise TimeoutError('Authentication timeout - exceeded maximum wait time')
 
-            # Check status
-            status = await self.check_status_async(request_id, authorization_url)
-
-            # Call status update callback
-            if on_status_update:
-                on_status_update(status)
-
-            # Check if authentication completed
-            if status.get('status') in ('authenticated', 'completed'):
-                return status
-
-            # Check if there was an error
-            if status.get('status') in ('error', 'expired'):
-                error_msg = status.get('error', 'Authentication failed')
-                raise RuntimeError(error_msg)
-
-            # Still pending, wait and continue polling
-            await asyncio.sleep(poll_interval)
+        return await self.status_poller.wait(
+            request_id,
+            authorization_url,
+            poll_interval=poll_interval,
+            timeout=timeout,
+            on_status_update=on_status_update,
+            poll_strategy=poll_strategy
+        )
 
     def complete_authentication_flow(
         self,
         authorization_url: str,
         poll_interval: float = 0.5,
         timeout: float = 60.0,
-        on_status_update: Optional[Callable[[Dict[str, Any]], None]] = None
+        on_status_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+        poll_strategy: Optional[PollStrategy] = None,
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Any]:
         """
         Complete authentication flow: extract request_id, authenticate, and wait.
 
+        `timeout` bounds the whole flow, as in complete_authentication_flow_async:
+        every request's connect and read timeouts are cut to the time left.
+
         Args:
             authorization_url: Full authorization URL
             poll_interval: Seconds between polls (default: 0.5)
-            timeout: Maximum wait time in seconds (default: 60.0)
+            timeout: Maximum time for the whole flow in seconds (default: 60.0)
             on_status_update: Optional callback function called on each status check
+            poll_strategy: Optional polling schedule; overrides poll_interval
+            deadline: Optional deadline to use instead of one built from `timeout`
 
         Returns:
             Final status dictionary with authorization code
 
         Raises:
-            RuntimeError: If using async methods without aiohttp
+            AuthAgentTimeoutError: If the deadline passes while fetching the page
+            TimeoutError: If the deadline passes while waiting
+            RuntimeError: If requests is not installed
         """
+        if deadline is None:
+            deadline = Deadline(timeout)
+
         # Step 1: Extract request_id (also extracts and stores auth server URL)
-        request_id = self.extract_request_id(authorization_url)
+        request_id = self.extract_request_id(authorization_url, deadline)
 
         # Step 2: Authenticate
-        auth_result = self.authenticate(request_id, authorization_url)
+        auth_result = self.authenticate(request_id, authorization_url, deadline)
 
         if not auth_result.get('success'):
             error_desc = auth_result.get('error_description') or auth_result.get('error', 'Authentication failed')
             raise RuntimeError(error_desc)
 
         # Step 3: Wait for completion
-        return self.wait_for_authentication(request_id, authorization_url, poll_interval, timeout, on_status_update)
+        return self.wait_for_authentication(
+            request_id, authorization_url, poll_interval, timeout, on_status_update, poll_strategy, deadline
+        )
 
     async def complete_authentication_flow_async(
         self,
         authorization_url: str,
         poll_interval: float = 0.5,
         timeout: float = 60.0,
-        on_status_update: Optional[Callable[[Dict[str, Any]], None]] = None
+        on_status_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+        poll_strategy: Optional[PollStrategy] = None,
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Any]:
         """
         Complete authentication flow: extract request_id, authenticate, and wait (async version).
 
+        `timeout` bounds the whole flow, not just the wait: one deadline is
+        shared by the page fetch, the authenticate call and the polling, and
+        each request's timeout and retries are cut to the time left.
+
         Args:
             authorization_url: Full authorization URL
             poll_interval: Seconds between polls (default: 0.5)
-            timeout: Maximum wait time in seconds (default: 60.0)
+            timeout: Maximum time for the whole flow in seconds (default: 60.0)
             on_status_update: Optional callback function called on each status check
+            poll_strategy: Optional polling schedule; overrides poll_interval
+            deadline: Optional deadline to use instead of one built from `timeout`
 
         Returns:
             Final status dictionary with authorization code
 
         Raises:
+            AuthAgentTimeoutError: If the deadline passes while fetching the page
+            TimeoutError: If the deadline passes while waiting
             RuntimeError: If aiohttp is not installed
         """
+        if deadline is None:
+            deadline = Deadline(timeout)
+
         # Step 1: Extract request_id (also extracts and stores auth server URL)
-        request_id = await self.extract_request_id_async(authorization_url)
+        request_id = await self.extract_request_id_async(authorization_url, deadline)
 
         # Step 2: Authenticate
-        auth_result = await self.authenticate_async(request_id, authorization_url)
+        auth_result = await self.authenticate_async(request_id, authorization_url, deadline)
 
         if not auth_result.get('success'):
             error_desc = auth_result.get('error_description') or auth_result.get('error', 'Authentication failed')
             raise RuntimeError(error_desc)
 
         # Step 3: Wait for completion
-        return await self.wait_for_authentication_async(request_id, authorization_url, poll_interval, timeout, on_status_update)
+        return await self.wait_for_authentication_async(
+            request_id, authorization_url, poll_interval, timeout, on_status_update, poll_strategy, deadline
+        )
+
+    def authenticate_many_async(
+        self,
+        items: Iterable[Tuple[str, str]],
+        concurrency: int = 10,
+        poll_interval: float = 0.5,
+        timeout: float = 60.0,
+        poll_strategy: Optional[PollStrategy] = None
+    ) -> BatchRun:
+        """
+        Authenticate many pending requests concurrently over the shared connection pool.
+
+        Each item is authenticated and then polled until completion. At most
+        `concurrency` items are in flight, and one item's failure does not affect
+        the others.
+
+        Args:
+            items: Iterable of (request_id, authorization_url) pairs
+            concurrency: Maximum number of requests in flight (default: 10)
+            poll_interval: Seconds between status polls per request (default: 0.5)
+            timeout: Maximum time per request in seconds, authenticate call included (default: 60.0)
+            poll_strategy: Optional polling schedule; overrides poll_interval
+
+        Returns:
+            BatchRun to iterate with `async for` (results as they complete) or
+            `await run.collect()`. Each BatchItemResult is keyed by request_id and
+            holds the final status dictionary or the error; aggregate timing is on
+            `run.stats` once the batch finishes.
+
+        Example:
+            async with sdk.authenticate_many_async(pending, concurrency=50) as run:
+                async for result in run:
+                    if result.ok:
+                        print(result.key, result.value['code'])
+            print(run.stats)
+        """
+        async def _authenticate_one(item: Tuple[str, str]) -> Dict[str, Any]:
+            request_id, authorization_url = item
+            deadline = Deadline(timeout)
+            auth_result = await self.authenticate_async(request_id, authorization_url, deadline)
+
+            if not auth_result.get('success'):
+                error_desc = auth_result.get('error_description') or auth_result.get('error', 'Authentication failed')
+                raise RuntimeError(error_desc)
+
+            return await self.wait_for_authentication_async(
+                request_id, authorization_url, poll_interval, timeout,
+                poll_strategy=poll_strategy, deadline=deadline
+            )
+
+        return BatchRun(items, _authenticate_one, concurrency=concurrency, key=lambda item: item[0])
 
 
 def create_auth_agent_agent_sdk(
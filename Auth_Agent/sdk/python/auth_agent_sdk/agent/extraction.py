@@ -0,0 +1,135 @@
+"""
+Incremental request_id extraction from the authorization page
+
+The spinning page declares `window.authRequest = { request_id: '...' }` near the
+top of its first script, so the scanner looks for that pattern on every chunk
+and lets the caller stop reading as soon as it is found. The looser fallback
+patterns only run once the body ends or the byte cap is reached.
+"""
+
+import codecs
+import re
+from typing import Optional
+
+from ..common.errors import AuthAgentValidationError
+
+# Preferred: the object the spinning page assigns to window.authRequest
+WINDOW_AUTH_REQUEST_PATTERN = re.compile(
+    r'window\.authRequest\s*=\s*\{[^}]*request_id:\s*[\'"]([^\'"]+)[\'"]'
+)
+# Fallback: a bare `request_id: '...'` anywhere on the page
+DIRECT_PATTERN = re.compile(r'request_id:\s*[\'"]([^\'"]+)[\'"]')
+# Fallback: a quoted value assigned to `request_id` inside a script, as a JS
+# property (`request_id: '...'`, `request_id = "..."`) or a JSON key
+# (`"request_id": "..."`). No unbounded run precedes the value, so matching
+# stays linear in the page size.
+SCRIPT_PATTERN = re.compile(r'request_id[\'"]?\s*[:=]\s*[\'"]([^\'"]+)[\'"]')
+
+DEFAULT_MAX_PAGE_BYTES = 1024 * 1024
+CHUNK_SIZE = 8192
+
+# How far back into already-scanned text a new search starts, so a match split
+# across two chunks is still found
+_OVERLAP = 1024
+
+NOT_FOUND_MESSAGE = (
+    'Could not extract request_id from authorization page. Make sure the page is loaded '
+    'correctly and contains window.authRequest.request_id.'
+)
+
+
+def find_request_id(html: str) -> Optional[str]:
+    """
+    Find request_id in a complete authorization page.
+
+    Args:
+        html: Page content
+
+    Returns:
+        request_id, or None if the page does not contain one
+    """
+    match = WINDOW_AUTH_REQUEST_PATTERN.search(html) or DIRECT_PATTERN.search(html)
+    if match:
+        return match.group(1)
+
+    script_start = html.find('<script')
+    if script_start != -1:
+        match = SCRIPT_PATTERN.search(html, script_start)
+        if match:
+            return match.group(1)
+
+    return None
+
+
+class RequestIdScanner:
+    """
+    Scan an authorization page chunk by chunk.
+
+    Example:
+        scanner = RequestIdScanner()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            request_id = scanner.feed(chunk)
+            if request_id or scanner.exhausted:
+                break
+        request_id = request_id or scanner.finish()
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_PAGE_BYTES, encoding: Optional[str] = None):
+        """
+        Initialize the scanner.
+
+        Args:
+            max_bytes: Stop scanning after this many bytes of body
+            encoding: Body encoding (default: utf-8)
+        """
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self._decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+        self._text = ''
+        self._scanned = 0
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether the byte cap has been reached."""
+        return self.bytes_read >= self.max_bytes
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        """
+        Add a chunk of body and look for window.authRequest in it.
+
+        Args:
+            chunk: Next chunk of the response body
+
+        Returns:
+            request_id as soon as window.authRequest is seen, otherwise None
+        """
+        room = self.max_bytes - self.bytes_read
+        if room <= 0:
+            return None
+        chunk = chunk[:room]
+        self.bytes_read += len(chunk)
+        self._text += self._decoder.decode(chunk)
+
+        match = WINDOW_AUTH_REQUEST_PATTERN.search(self._text, max(0, self._scanned - _OVERLAP))
+        self._scanned = len(self._text)
+        return match.group(1) if match else None
+
+    def finish(self) -> str:
+        """
+        Run every pattern over what has been read once no more data is coming.
+
+        Returns:
+            request_id
+
+        Raises:
+            AuthAgentValidationError: If the page does not contain a request_id
+        """
+        self._text += self._decoder.decode(b'', final=True)
+        request_id = find_request_id(self._text)
+        if request_id:
+            return request_id
+        if self.exhausted:
+            raise AuthAgentValidationError(
+                f'{NOT_FOUND_MESSAGE} Stopped after reading {self.max_bytes} bytes.'
+            )
+        raise AuthAgentValidationError(NOT_FOUND_MESSAGE)
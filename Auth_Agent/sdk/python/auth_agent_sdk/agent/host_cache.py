@@ -0,0 +1,236 @@
+"""
+Per-host resolution cache for Auth Agent deployments
+
+Maps the origin of an authorization URL to its validated base URL, the
+connection pools used to reach it and any per-host settings, so a single SDK
+instance can serve agents that log in to several deployments. URL validation
+runs once per origin, not once per request.
+"""
+
+import asyncio
+import re
+import threading
+import warnings
+from collections import OrderedDict
+from typing import Callable, List, Optional, Set
+
+from ..common.retry import RetryOptions, CircuitBreaker
+from ..common.transport import AsyncTransport, SyncTransport, PoolOptions
+
+_ORIGIN_PATTERN = re.compile(r'[^:/?#]*://[^/?#]*')
+
+
+def origin_of(url: str) -> str:
+    """
+    Return the lowercased `scheme://netloc` prefix of a URL without parsing the rest.
+
+    Args:
+        url: Absolute URL
+
+    Returns:
+        Origin string used as the cache key
+    """
+    match = _ORIGIN_PATTERN.match(url)
+    return (match.group(0) if match else url).lower()
+
+
+class HostSettings:
+    """Per-host overrides for one Auth Agent deployment."""
+
+    def __init__(
+        self,
+        retry_options: Optional[RetryOptions] = None,
+        pool_options: Optional[PoolOptions] = None
+    ):
+        """
+        Initialize per-host settings.
+
+        Args:
+            retry_options: Retry configuration for this host (default: the SDK's)
+            pool_options: Dedicated connection pool configuration for this host
+                (default: share the SDK's pools)
+        """
+        self.retry_options = retry_options
+        self.pool_options = pool_options
+
+
+class HostEntry:
+    """Resolved state for one auth-server origin."""
+
+    __slots__ = (
+        'base_url', 'retry_options', 'transport', 'sync_transport', 'policy_version', 'breaker', '_owns_transports'
+    )
+
+    def __init__(
+        self,
+        base_url: str,
+        retry_options: RetryOptions,
+        transport: AsyncTransport,
+        sync_transport: SyncTransport,
+        owns_transports: bool = False,
+        policy_version: int = 0,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.base_url = base_url
+        self.retry_options = retry_options
+        self.transport = transport
+        self.sync_transport = sync_transport
+        # URL policy version the base URL was validated against
+        self.policy_version = policy_version
+        # Circuit breaker for the origin; outlives the entry if it is evicted
+        self.breaker = breaker
+        self._owns_transports = owns_transports
+
+    def close(self) -> None:
+        """Close the sync pool if it is dedicated to this host."""
+        if self._owns_transports:
+            self.sync_transport.close()
+
+    async def aclose(self) -> None:
+        """Close both pools if they are dedicated to this host."""
+        if self._owns_transports:
+            self.sync_transport.close()
+            await self.transport.aclose()
+
+
+class HostCache:
+    """
+    Thread-safe LRU cache of HostEntry objects keyed by origin.
+
+    Lookups are a regex prefix match plus a dict access. When the cache is full
+    the least recently used host is evicted and its dedicated pools, if any,
+    are closed. An evicted async pool is closed in a background task, or, when
+    no event loop is running, kept until close() or aclose().
+    """
+
+    def __init__(self, factory: Callable[[str], HostEntry], max_hosts: int = 64):
+        """
+        Initialize the cache.
+
+        Args:
+            factory: Builds and validates an entry for a URL; may raise on invalid URLs
+            max_hosts: Maximum number of origins kept
+        """
+        self._factory = factory
+        self.max_hosts = max_hosts
+        self._entries: 'OrderedDict[str, HostEntry]' = OrderedDict()
+        # Evicted entries whose async pools could not be closed yet
+        self._evicted: List[HostEntry] = []
+        # Background tasks closing evicted async pools
+        self._closing: Set['asyncio.Task[None]'] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, url: str) -> bool:
+        return origin_of(url) in self._entries
+
+    def get(self, url: str) -> HostEntry:
+        """
+        Get the entry for a URL's origin, building it on first use.
+
+        Args:
+            url: Any URL on the auth server
+
+        Returns:
+            HostEntry for the URL's origin
+        """
+        key = origin_of(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        # Validation happens outside the lock; a concurrent build of the same key is harmless
+        entry = self._factory(url)
+
+        evicted: List[HostEntry] = []
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._entries.move_to_end(key)
+                return existing
+            self._entries[key] = entry
+            while len(self._entries) > self.max_hosts:
+                evicted.append(self._entries.popitem(last=False)[1])
+
+        for old in evicted:
+            self._close_evicted(old)
+        return entry
+
+    def clear(self) -> List[HostEntry]:
+        """
+        Remove every entry.
+
+        Returns:
+            The removed entries, so the caller can close them
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        return entries
+
+    def close(self) -> None:
+        """
+        Remove every entry and close its dedicated pools.
+
+        Dedicated async pools are closed on a temporary event loop. If a loop
+        is already running in this thread that is not possible; a
+        ResourceWarning is raised and aclose() should be awaited instead.
+        """
+        entries = self._take_all()
+        for entry in entries:
+            entry.close()
+        transports = [
+            entry.transport for entry in entries if entry._owns_transports and not entry.transport.closed
+        ]
+        if not transports:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(_aclose_all(transports))
+            return
+        warnings.warn(
+            f'{len(transports)} dedicated aiohttp session(s) left open; '
+            'await aclose() instead of calling close() from a running event loop',
+            ResourceWarning,
+            stacklevel=2
+        )
+
+    async def aclose(self) -> None:
+        """Remove every entry, close its dedicated pools and wait for evicted pools to close."""
+        for entry in self._take_all():
+            await entry.aclose()
+        loop = asyncio.get_running_loop()
+        pending = [task for task in self._closing if task.get_loop() is loop]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _take_all(self) -> List[HostEntry]:
+        entries = self.clear()
+        with self._lock:
+            evicted, self._evicted = self._evicted, []
+        return entries + evicted
+
+    def _close_evicted(self, entry: HostEntry) -> None:
+        entry.close()
+        if not entry._owns_transports:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            with self._lock:
+                self._evicted.append(entry)
+            return
+        # Keep a reference so the task is not collected before it finishes
+        task = loop.create_task(entry.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+
+async def _aclose_all(transports: List[AsyncTransport]) -> None:
+    for transport in transports:
+        await transport.aclose()
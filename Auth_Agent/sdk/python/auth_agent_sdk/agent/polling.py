@@ -0,0 +1,113 @@
+"""
+Polling schedules for wait_for_authentication
+
+A strategy maps the number of polls already made to the delay before the next
+one. Strategies are stateless, so one instance can be shared by any number of
+concurrent waits.
+"""
+
+import random
+from typing import Optional
+
+
+class PollStrategy:
+    """Base class for polling schedules."""
+
+    def delay(self, attempt: int) -> float:
+        """
+        Delay before the next poll.
+
+        Args:
+            attempt: Number of polls made so far, minus one (0 after the first poll)
+
+        Returns:
+            Delay in seconds
+        """
+        raise NotImplementedError
+
+    def next_delay(self, attempt: int, remaining: float) -> float:
+        """
+        Delay before the next poll, clamped so it never sleeps past the deadline.
+
+        Args:
+            attempt: Number of polls made so far, minus one
+            remaining: Seconds left until the caller's deadline
+
+        Returns:
+            Delay in seconds, between 0 and `remaining`
+        """
+        return max(0.0, min(self.delay(attempt), remaining))
+
+
+class FixedPoll(PollStrategy):
+    """Poll at a constant interval."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+
+    def delay(self, attempt: int) -> float:
+        return self.interval
+
+
+class ExponentialPoll(PollStrategy):
+    """Poll with exponentially growing intervals, capped at `max_interval`."""
+
+    def __init__(self, initial: float = 0.1, multiplier: float = 2.0, max_interval: float = 2.0):
+        self.initial = initial
+        self.multiplier = multiplier
+        self.max_interval = max_interval
+
+    def delay(self, attempt: int) -> float:
+        # Stop growing once the cap is reached so large attempts cannot overflow
+        delay = self.initial
+        for _ in range(attempt):
+            delay *= self.multiplier
+            if delay >= self.max_interval:
+                return self.max_interval
+        return min(delay, self.max_interval)
+
+
+class JitteredPoll(PollStrategy):
+    """
+    Randomize another strategy's delays by +/- `jitter` (a fraction of the delay).
+
+    Spreads the polls of agents that started together so they do not hit the
+    server in lockstep.
+    """
+
+    def __init__(self, base: Optional[PollStrategy] = None, jitter: float = 0.2, rng: Optional[random.Random] = None):
+        self.base = base or FixedPoll()
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        delay = self.base.delay(attempt)
+        return max(0.0, delay * self._rng.uniform(1.0 - self.jitter, 1.0 + self.jitter))
+
+
+class FastThenSlowPoll(PollStrategy):
+    """
+    Poll aggressively right after authenticate returns, then back off.
+
+    Most requests complete within a few hundred milliseconds of the
+    authenticate POST, so the first `fast_polls` polls use `fast_interval`.
+    After that the interval grows exponentially from `slow_interval` up to
+    `max_interval`, which keeps idle waits cheap for the server.
+    """
+
+    def __init__(
+        self,
+        fast_interval: float = 0.05,
+        fast_polls: int = 6,
+        slow_interval: float = 0.25,
+        multiplier: float = 2.0,
+        max_interval: float = 2.0
+    ):
+        self.fast_interval = fast_interval
+        self.fast_polls = fast_polls
+        self._slow = ExponentialPoll(slow_interval, multiplier, max_interval)
+
+    def delay(self, attempt: int) -> float:
+        if attempt < self.fast_polls:
+            return self.fast_interval
+        return self._slow.delay(attempt - self.fast_polls)
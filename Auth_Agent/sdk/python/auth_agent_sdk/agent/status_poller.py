@@ -0,0 +1,277 @@
+"""
+Multiplexed status polling for pending authentication requests
+
+A single background loop polls /api/check-status for every pending request_id,
+instead of one polling loop per waiting coroutine.
+"""
+
+import asyncio
+import heapq
+import itertools
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..common.deadline import Deadline
+from ..common.errors import AuthAgentError
+from .polling import PollStrategy, FixedPoll
+
+StatusCallback = Callable[[Dict[str, Any]], None]
+
+
+class _Waiter:
+    __slots__ = ('future', 'on_status_update', 'deadline', 'timer')
+
+    def __init__(self, future: asyncio.Future, on_status_update: Optional[StatusCallback], deadline: float):
+        self.future = future
+        self.on_status_update = on_status_update
+        self.deadline = deadline
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class _PendingRequest:
+    __slots__ = ('request_id', 'authorization_url', 'strategy', 'attempt', 'waiters', 'closed')
+
+    def __init__(self, request_id: str, authorization_url: str, strategy: PollStrategy):
+        self.request_id = request_id
+        self.authorization_url = authorization_url
+        self.strategy = strategy
+        self.attempt = 0
+        self.waiters: List[_Waiter] = []
+        self.closed = False
+
+
+class StatusPoller:
+    """
+    Central scheduler for status polls of many pending request_ids.
+
+    Concurrent waits on the same request_id are coalesced into one poll stream,
+    and each waiter gets its own future with its own deadline. Outbound traffic
+    is bounded by `max_in_flight` concurrent polls and, optionally, by
+    `max_polls_per_second` across all requests; when either limit is reached,
+    polls are delayed beyond their strategy's interval. AuthAgentSDK exposes
+    both as `max_polls_in_flight` and `max_polls_per_second`. The background
+    loop only runs while at least one request is pending.
+
+    Example:
+        poller = StatusPoller(sdk.check_status_async, max_polls_per_second=50)
+        status = await poller.wait(request_id, authorization_url, timeout=30.0)
+    """
+
+    def __init__(
+        self,
+        check_status: Callable[[str, str, Optional[Deadline]], Awaitable[Dict[str, Any]]],
+        max_in_flight: int = 10,
+        max_polls_per_second: Optional[float] = None
+    ):
+        """
+        Initialize the poller.
+
+        Args:
+            check_status: Coroutine function (request_id, authorization_url, deadline) -> status
+                dictionary. The deadline is the latest of the request's waiters', so a poll
+                never outlives everyone waiting for it
+            max_in_flight: Maximum number of status requests in flight at once (default: 10)
+            max_polls_per_second: Optional cap on status requests per second across all request_ids
+        """
+        self._check_status = check_status
+        self.max_in_flight = max_in_flight
+        self.max_polls_per_second = max_polls_per_second
+        self.polls_sent = 0
+
+        self._pending: Dict[str, _PendingRequest] = {}
+        self._schedule: List[Tuple[float, int, _PendingRequest]] = []
+        self._counter = itertools.count()
+        self._in_flight = 0
+        self._poll_tasks: set = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of request_ids currently being polled."""
+        return len(self._pending)
+
+    async def wait(
+        self,
+        request_id: str,
+        authorization_url: str,
+        poll_interval: float = 0.5,
+        timeout: float = 60.0,
+        on_status_update: Optional[StatusCallback] = None,
+        poll_strategy: Optional[PollStrategy] = None
+    ) -> Dict[str, Any]:
+        """
+        Wait until a request is authenticated.
+
+        Args:
+            request_id: Request ID to poll
+            authorization_url: Authorization URL (used to extract server URL)
+            poll_interval: Seconds between polls (default: 0.5)
+            timeout: Maximum wait time in seconds for this waiter (default: 60.0)
+            on_status_update: Optional callback function called on each status check
+            poll_strategy: Optional polling schedule; overrides poll_interval. When several
+                waiters share a request_id, the first waiter's schedule is used.
+
+        Returns:
+            Final status dictionary with authorization code
+
+        Raises:
+            TimeoutError: If this waiter's deadline passes first
+            RuntimeError: If the server reports an error or expired request
+        """
+        loop = asyncio.get_running_loop()
+        self._bind(loop)
+
+        entry = self._pending.get(request_id)
+        if entry is None:
+            entry = _PendingRequest(request_id, authorization_url, poll_strategy or FixedPoll(poll_interval))
+            self._pending[request_id] = entry
+            self._push(entry, loop.time())
+
+        waiter = _Waiter(loop.create_future(), on_status_update, loop.time() + timeout)
+        waiter.timer = loop.call_later(timeout, self._expire, waiter)
+        entry.waiters.append(waiter)
+        self._ensure_running(loop)
+
+        try:
+            return await waiter.future
+        finally:
+            waiter.timer.cancel()
+            self._remove_waiter(entry, waiter)
+
+    async def aclose(self) -> None:
+        """Stop polling and fail every outstanding waiter."""
+        entries = list(self._pending.values())
+        self._pending.clear()
+        self._schedule.clear()
+        for entry in entries:
+            self._finish(entry, error=AuthAgentError('Status poller was closed'))
+
+        tasks = list(self._poll_tasks)
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        if tasks and self._loop is asyncio.get_running_loop():
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    def _bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._loop is loop:
+            return
+        # Futures and tasks from a previous event loop cannot be reused
+        self._pending.clear()
+        self._schedule.clear()
+        self._poll_tasks.clear()
+        self._in_flight = 0
+        self._task = None
+        self._wakeup = asyncio.Event()
+        self._loop = loop
+
+    def _ensure_running(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def _push(self, entry: _PendingRequest, when: float) -> None:
+        heapq.heappush(self._schedule, (when, next(self._counter), entry))
+
+    def _expire(self, waiter: _Waiter) -> None:
+        if not waiter.future.done():
+            waiter.future.set_exception(TimeoutError('Authentication timeout - exceeded maximum wait time'))
+
+    def _remove_waiter(self, entry: _PendingRequest, waiter: _Waiter) -> None:
+        if waiter in entry.waiters:
+            entry.waiters.remove(waiter)
+        if not entry.waiters and not entry.closed:
+            entry.closed = True
+            if self._pending.get(entry.request_id) is entry:
+                del self._pending[entry.request_id]
+            self._wakeup.set()
+
+    def _finish(self, entry: _PendingRequest, result: Any = None, error: Optional[Exception] = None) -> None:
+        entry.closed = True
+        if self._pending.get(entry.request_id) is entry:
+            del self._pending[entry.request_id]
+        for waiter in list(entry.waiters):
+            if waiter.future.done():
+                continue
+            if error is not None:
+                waiter.future.set_exception(error)
+            else:
+                waiter.future.set_result(result)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_dispatch = 0.0
+
+        while self._pending:
+            while self._schedule and self._schedule[0][2].closed:
+                heapq.heappop(self._schedule)
+
+            now = loop.time()
+            delay: Optional[float] = None
+            if self._schedule and self._in_flight < self.max_in_flight:
+                due_at = self._schedule[0][0]
+                if self.max_polls_per_second:
+                    due_at = max(due_at, next_dispatch)
+                if due_at <= now:
+                    _, _, entry = heapq.heappop(self._schedule)
+                    self._dispatch(loop, entry)
+                    if self.max_polls_per_second:
+                        next_dispatch = now + 1.0 / self.max_polls_per_second
+                    continue
+                delay = due_at - now
+
+            # Sleep until the next poll is due, a poll completes, or a request is added
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop, entry: _PendingRequest) -> None:
+        self._in_flight += 1
+        self.polls_sent += 1
+        task = loop.create_task(self._poll(entry))
+        self._poll_tasks.add(task)
+        task.add_done_callback(self._poll_tasks.discard)
+
+    async def _poll(self, entry: _PendingRequest) -> None:
+        deadline = None
+        if entry.waiters:
+            # Waiter deadlines are on the loop clock
+            loop = asyncio.get_running_loop()
+            latest = max(waiter.deadline for waiter in entry.waiters)
+            deadline = Deadline(latest - loop.time(), loop.time)
+        try:
+            status = await self._check_status(entry.request_id, entry.authorization_url, deadline)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            self._finish(entry, error=error)
+        else:
+            self._handle_status(entry, status)
+        finally:
+            self._in_flight -= 1
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def _handle_status(self, entry: _PendingRequest, status: Dict[str, Any]) -> None:
+        for waiter in list(entry.waiters):
+            if waiter.on_status_update and not waiter.future.done():
+                try:
+                    waiter.on_status_update(status)
+                except Exception as error:
+                    waiter.future.set_exception(error)
+
+        if status.get('status') in ('authenticated', 'completed'):
+            self._finish(entry, result=status)
+        elif status.get('status') in ('error', 'expired'):
+            self._finish(entry, error=RuntimeError(status.get('error', 'Authentication failed')))
+        elif not entry.closed and entry.waiters:
+            # Never sleep past the latest waiter's deadline; earlier ones time out on their own
+            now = self._loop.time()
+            remaining = max(waiter.deadline for waiter in entry.waiters) - now
+            self._push(entry, now + entry.strategy.next_delay(entry.attempt, remaining))
+            entry.attempt += 1
@@ -5,5 +5,35 @@ OAuth 2.1 client implementation with PKCE support for Python web frameworks.
 """
 
 from .auth_client import AuthAgentClient
+from .introspection_cache import IntrospectionCache
+from .token_verifier import LocalTokenVerifier
+from .token_manager import TokenManager, TokenSet
+from .discovery import MetadataCache, ServerMetadata
+from .pkce_pool import PKCEPool
+from .sign_in import SignInResult
+from .middleware import AuthAgentASGIMiddleware, AuthAgentWSGIMiddleware, AuthTimings
+from .pending_auth import (
+    PendingAuth,
+    PendingAuthStore,
+    MemoryPendingAuthStore,
+    SQLitePendingAuthStore,
+)
 
-__all__ = ["AuthAgentClient"]
+__all__ = [
+    "AuthAgentClient",
+    "IntrospectionCache",
+    "LocalTokenVerifier",
+    "TokenManager",
+    "TokenSet",
+    "MetadataCache",
+    "ServerMetadata",
+    "PKCEPool",
+    "PendingAuth",
+    "PendingAuthStore",
+    "MemoryPendingAuthStore",
+    "SQLitePendingAuthStore",
+    "AuthAgentASGIMiddleware",
+    "AuthAgentWSGIMiddleware",
+    "AuthTimings",
+    "SignInResult",
+]
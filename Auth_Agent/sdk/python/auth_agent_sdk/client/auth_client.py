@@ -4,22 +4,52 @@ Auth Agent Client SDK - For website backends
 OAuth 2.1 client implementation with PKCE support for Python web frameworks.
 """
 
+import asyncio
 import secrets
+import time
 import hashlib
 import base64
-from typing import Optional, Dict, Any, Tuple, List
-from urllib.parse import urlencode
-
-try:
-    import aiohttp
-    ASYNC_AVAILABLE = True
-except ImportError:
-    ASYNC_AVAILABLE = False
-    import requests
+from typing import Optional, Dict, Any, Tuple, List, Union, Iterable
+from urllib.parse import urlencode, quote
 
 from ..common.errors import AuthAgentError, AuthAgentNetworkError, AuthAgentValidationError, AuthAgentSecurityError
-from ..common.validation import validate_url, validate_redirect_uri
-from ..common.retry import retry_with_backoff_async, RetryOptions
+from ..common.deadline import Deadline
+from ..common.validation import URLValidator, validate_redirect_uri
+from ..common.host_matcher import HostMatcher
+from ..common.retry import (
+    retry_with_backoff,
+    retry_with_backoff_async,
+    RetryOptions,
+    RetryBudget,
+    CircuitBreakerRegistry,
+    parse_retry_after,
+)
+from ..common.transport import AsyncTransport, SyncTransport, PoolOptions, ASYNC_AVAILABLE
+from ..common.singleflight import SingleFlight
+from ..common.batch import BatchRun
+from .introspection_cache import IntrospectionCache
+from .token_verifier import LocalTokenVerifier
+from .discovery import MetadataCache, ServerMetadata, WELL_KNOWN_PATH, DEFAULT_ENDPOINT_PATHS
+from .pkce_pool import PKCEPool
+from .pending_auth import PendingAuthStore
+from .sign_in import SignInResult
+
+
+async def _error_body(response: Any) -> Dict[str, Any]:
+    # Gateways answer 502/503 with HTML; the status code still has to reach the retry layer
+    try:
+        data = await response.json(content_type=None)
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _error_body_sync(response: Any) -> Dict[str, Any]:
+    try:
+        data = response.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
 
 
 class AuthAgentClient:
@@ -47,8 +77,21 @@ class AuthAgentClient:
         client_secret: Optional[str] = None,
         auth_server_url: str = "https://auth.auth-agent.com",
         scope: str = "openid profile",
-        allowed_hosts: Optional[List[str]] = None,
-        retry_options: Optional[RetryOptions] = None
+        allowed_hosts: Optional[Union[List[str], HostMatcher]] = None,
+        retry_options: Optional[RetryOptions] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        pool_options: Optional[PoolOptions] = None,
+        transport: Optional[AsyncTransport] = None,
+        sync_transport: Optional[SyncTransport] = None,
+        url_validator: Optional[URLValidator] = None,
+        introspection_cache: Optional[IntrospectionCache] = None,
+        jwt_secret: Optional[str] = None,
+        token_issuer: Optional[str] = None,
+        clock_skew: float = 30.0,
+        metadata_cache: Optional[MetadataCache] = None,
+        pkce_pool: Optional[PKCEPool] = None,
+        pending_auth_store: Optional[PendingAuthStore] = None,
+        circuit_breakers: Optional[CircuitBreakerRegistry] = None
     ):
         """
         Initialize the Auth Agent client.
@@ -59,11 +102,34 @@ class AuthAgentClient:
             client_secret: Optional client secret (for confidential clients)
             auth_server_url: Auth Agent server URL (default: production)
             scope: OAuth scope (default: "openid profile")
-            allowed_hosts: Optional whitelist of allowed hosts for SSRF protection
+            allowed_hosts: Optional whitelist of allowed hosts for SSRF protection, or a
+                HostMatcher that can be shared and reloaded
             retry_options: Optional retry configuration
+            retry_budget: Optional budget that caps retries as a share of requests across
+                every call made by this instance (default: retry_options' budget, which is
+                none unless set)
+            pool_options: Optional connection pool configuration (limits, keep-alive)
+            transport: Optional shared async transport; when given, the caller owns its lifetime
+            sync_transport: Optional shared sync transport; when given, the caller owns its lifetime
+            url_validator: Optional URL policy; overrides allowed_hosts (e.g. to reach a local
+                test server)
+            introspection_cache: Optional cache of introspection results (default: disabled)
+            jwt_secret: Optional access-token signing secret shared with the auth server;
+                enables verify_access_token_local() without a network round trip
+            token_issuer: Expected token issuer (default: auth_server_url)
+            clock_skew: Clock-skew tolerance in seconds for local token verification
+            metadata_cache: Optional metadata cache; enables endpoint discovery from
+                /.well-known/oauth-authorization-server (default: fixed endpoint paths)
+            pkce_pool: Optional pool of pre-generated PKCE verifiers and states for
+                get_authorization_url(); the caller owns its lifetime
+            pending_auth_store: Optional store that keeps each code verifier under its
+                state until complete_callback(); the caller owns its lifetime
+            circuit_breakers: Optional per-origin circuit breakers, e.g. shared with other
+                clients (default: a registry for this client)
         """
         # Validate URLs
-        validate_url(auth_server_url, allowed_hosts)
+        url_validator = url_validator or URLValidator(allowed_hosts)
+        url_validator.validate(auth_server_url)
         validate_redirect_uri(redirect_uri)
         
         if not client_id:
@@ -75,7 +141,57 @@ class AuthAgentClient:
         self.auth_server_url = auth_server_url.rstrip('/')
         self.scope = scope
         self.allowed_hosts = allowed_hosts
+        self.url_validator = url_validator
         self.retry_options = retry_options or RetryOptions()
+        if retry_budget is not None:
+            self.retry_options = self.retry_options.with_retry_budget(retry_budget)
+        self.circuit_breakers = circuit_breakers if circuit_breakers is not None else CircuitBreakerRegistry()
+        self._owns_transport = transport is None
+        self.transport = transport or AsyncTransport(pool_options)
+        self._owns_sync_transport = sync_transport is None
+        self.sync_transport = sync_transport or SyncTransport(pool_options)
+        self.introspection_cache = introspection_cache
+        # Concurrent identical requests share one round trip
+        self.single_flight = SingleFlight()
+        # Bumped when a revocation starts and ends; introspections overlapping one are not cached
+        self._revocations = 0
+        self.metadata_cache = metadata_cache
+        self._checked_endpoints: set = set()
+        self.pkce_pool = pkce_pool
+        self.pending_auth_store = pending_auth_store
+        # ((endpoint, redirect_uri, scope, policy version), validated authorize URL prefix)
+        self._authorize_prefix: Optional[Tuple[Tuple[Any, ...], str]] = None
+        self.token_verifier: Optional[LocalTokenVerifier] = None
+        if jwt_secret:
+            self.token_verifier = LocalTokenVerifier(
+                jwt_secret,
+                issuer=token_issuer or self.auth_server_url,
+                client_id=client_id,
+                leeway=clock_skew
+            )
+
+    def __enter__(self) -> 'AuthAgentClient':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    async def __aenter__(self) -> 'AuthAgentClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    def close(self) -> None:
+        """Close sync pooled connections owned by this client."""
+        if self._owns_sync_transport:
+            self.sync_transport.close()
+
+    async def aclose(self) -> None:
+        """Close all pooled connections owned by this client."""
+        self.close()
+        if self._owns_transport:
+            await self.transport.aclose()
 
     def _generate_code_verifier(self, length: int = 128) -> str:
         """Generate a cryptographically random code verifier."""
@@ -90,6 +206,67 @@ class AuthAgentClient:
         """Generate a random state parameter for CSRF protection."""
         return secrets.token_urlsafe(length)
 
+    async def discover(self) -> Optional[ServerMetadata]:
+        """
+        Load the authorization server's metadata into the metadata cache.
+
+        Call at startup so even the synchronous methods resolve endpoints from
+        the discovered document.
+
+        Returns:
+            Server metadata, or None if no metadata cache is configured
+
+        Raises:
+            AuthAgentNetworkError: If the document cannot be fetched and none is cached
+        """
+        if self.metadata_cache is None:
+            return None
+        return await self.metadata_cache.get(self.auth_server_url, self._fetch_metadata)
+
+    async def _fetch_metadata(self) -> Dict[str, Any]:
+        if not ASYNC_AVAILABLE:
+            raise RuntimeError("aiohttp is required for async methods. Install with: pip install aiohttp")
+
+        metadata_url = f"{self.auth_server_url}{WELL_KNOWN_PATH}"
+
+        async def _fetch():
+            session = await self.transport.get_session()
+            async with session.get(metadata_url) as response:
+                if not response.ok:
+                    error = AuthAgentNetworkError(f"Metadata discovery failed: HTTP {response.status}")
+                    error.status_code = response.status
+                    error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    raise error
+                return await response.json()
+
+        return await retry_with_backoff_async(_fetch, self.retry_options, self.circuit_breakers.get(metadata_url))
+
+    def _endpoint_from(self, metadata: Optional[ServerMetadata], name: str) -> str:
+        url = metadata.endpoint(name) if metadata is not None else None
+        if url is None:
+            return f"{self.auth_server_url}{DEFAULT_ENDPOINT_PATHS[name]}"
+        if url not in self._checked_endpoints:
+            # Discovered endpoints are subject to the same SSRF policy as auth_server_url
+            self.url_validator.validate(url)
+            self._checked_endpoints.add(url)
+        return url
+
+    def _cached_endpoint(self, name: str) -> str:
+        """Resolve an endpoint from already-cached metadata, without network access."""
+        metadata = self.metadata_cache.peek(self.auth_server_url) if self.metadata_cache else None
+        return self._endpoint_from(metadata, name)
+
+    async def _endpoint(self, name: str) -> str:
+        """Resolve an endpoint, discovering the server metadata on first use."""
+        metadata = None
+        if self.metadata_cache is not None:
+            try:
+                metadata = await self.discover()
+            except Exception:
+                # Servers without discovery still serve the default paths
+                metadata = None
+        return self._endpoint_from(metadata, name)
+
     def get_authorization_url(
         self,
         state: Optional[str] = None
@@ -102,28 +279,51 @@ class AuthAgentClient:
 
         Returns:
             Tuple of (authorization_url, code_verifier, state)
-            Store code_verifier and state in your session for later verification
+            Store code_verifier and state in your session for later verification,
+            or configure a pending_auth_store and call complete_callback()
+        """
+        if self.pkce_pool is not None:
+            code_verifier, code_challenge, generated_state = self.pkce_pool.take()
+        else:
+            code_verifier = self._generate_code_verifier()
+            code_challenge = self._generate_code_challenge(code_verifier)
+            generated_state = None
+
+        if state:
+            query_state = quote(state, safe='')
+        else:
+            # Generated states are URL-safe base64 and need no quoting
+            state = query_state = generated_state or self._generate_state()
+
+        auth_url = f"{self._get_authorize_prefix()}&state={query_state}&code_challenge={code_challenge}"
+        if self.pending_auth_store is not None:
+            self.pending_auth_store.put(state, code_verifier)
+        return auth_url, code_verifier, state
+
+    def _get_authorize_prefix(self) -> str:
+        """
+        Get the validated authorization URL up to the per-request parameters.
+
+        Rebuilt only when the endpoint, redirect_uri, scope or URL policy changes.
         """
-        code_verifier = self._generate_code_verifier()
-        code_challenge = self._generate_code_challenge(code_verifier)
-        state = state or self._generate_state()
+        endpoint = self._cached_endpoint('authorization_endpoint')
+        key = (endpoint, self.redirect_uri, self.scope, self.url_validator.policy_version)
+        cached = self._authorize_prefix
+        if cached is not None and cached[0] == key:
+            return cached[1]
 
         params = {
             'client_id': self.client_id,
             'redirect_uri': self.redirect_uri,
             'response_type': 'code',
-            'state': state,
-            'code_challenge': code_challenge,
             'code_challenge_method': 'S256',
             'scope': self.scope,
         }
-
-        auth_url = f"{self.auth_server_url}/authorize?{urlencode(params)}"
-        
-        # Validate the final URL before returning
-        validate_url(auth_url, self.allowed_hosts)
-        
-        return auth_url, code_verifier, state
+        prefix = f"{endpoint}?{urlencode(params)}"
+        # Validate once; the per-request parameters cannot change the host
+        self.url_validator.validate(prefix)
+        self._authorize_prefix = (key, prefix)
+        return prefix
 
     async def exchange_code_for_tokens(
         self,
@@ -133,6 +333,8 @@ class AuthAgentClient:
         """
         Exchange authorization code for tokens (async version).
 
+        Concurrent exchanges of the same code and verifier share one request.
+
         Args:
             code: The authorization code from the callback
             code_verifier: The code verifier from the authorization request
@@ -158,25 +360,239 @@ class AuthAgentClient:
         if self.client_secret:
             payload['client_secret'] = self.client_secret
 
+        token_url = await self._endpoint('token_endpoint')
+
         async def _exchange():
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.auth_server_url}/token",
-                    json=payload,
-                    headers={'Content-Type': 'application/json'}
-                ) as response:
-                    data = await response.json()
-
-                    if not response.ok:
-                        error_msg = (
-                            f"Token exchange failed: {data.get('error', 'unknown_error')} - "
-                            f"{data.get('error_description', 'No description')}"
-                        )
-                        raise AuthAgentNetworkError(error_msg)
-
-                    return data
-        
-        return await retry_with_backoff_async(_exchange, self.retry_options)
+            session = await self.transport.get_session()
+            async with session.post(
+                token_url,
+                json=payload,
+                headers={'Content-Type': 'application/json'}
+            ) as response:
+                if not response.ok:
+                    data = await _error_body(response)
+                    error_msg = (
+                        f"Token exchange failed: {data.get('error', 'unknown_error')} - "
+                        f"{data.get('error_description', 'No description')}"
+                    )
+                    error = AuthAgentNetworkError(error_msg)
+                    error.status_code = response.status
+                    error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    raise error
+
+                return await response.json()
+
+        tokens = await self.single_flight.do(
+            ('token', code, code_verifier),
+            lambda: retry_with_backoff_async(_exchange, self.retry_options, self.circuit_breakers.get(token_url))
+        )
+        return dict(tokens)
+
+    async def complete_sign_in(
+        self,
+        code: str,
+        code_verifier: str,
+        userinfo: bool = True,
+        introspect: bool = True
+    ) -> SignInResult:
+        """
+        Exchange the code, then fetch userinfo and token details concurrently.
+
+        Both follow-up requests reuse the client's pooled connections. Token
+        details come from verify_access_token_local(), so they are checked
+        in-process when a jwt_secret is configured and introspected otherwise.
+
+        Args:
+            code: The authorization code from the callback
+            code_verifier: The code verifier from the authorization request
+            userinfo: Fetch /userinfo
+            introspect: Fetch token details
+
+        Returns:
+            SignInResult with tokens, userinfo, introspection and per-stage timings
+
+        Raises:
+            Exception: If token exchange or a follow-up request fails
+        """
+        started = time.perf_counter()
+        tokens = await self.exchange_code_for_tokens(code, code_verifier)
+        exchanged = time.perf_counter()
+        timings = {'exchange': exchanged - started}
+        access_token = tokens['access_token']
+
+        async def _timed(name, call):
+            result = await call
+            timings[name] = time.perf_counter() - exchanged
+            return result
+
+        stages = []
+        if userinfo:
+            stages.append(_timed('userinfo', self.get_userinfo(access_token)))
+        if introspect:
+            stages.append(_timed('introspection', self.verify_access_token_local(access_token)))
+        results = list(await asyncio.gather(*stages))
+
+        userinfo_result = results.pop(0) if userinfo else None
+        introspection_result = results.pop(0) if introspect else None
+        timings['total'] = time.perf_counter() - started
+        return SignInResult(tokens, userinfo_result, introspection_result, timings)
+
+    async def get_userinfo(self, access_token: str) -> Dict[str, Any]:
+        """
+        Get the user information for an access token (async version).
+
+        Args:
+            access_token: The access token to look up
+
+        Returns:
+            Dictionary with sub and, depending on scope, email and name
+
+        Raises:
+            RuntimeError: If aiohttp is not installed
+            AuthAgentNetworkError: If the token is rejected or the request fails
+        """
+        if not ASYNC_AVAILABLE:
+            raise RuntimeError("aiohttp is required for async methods. Install with: pip install aiohttp")
+
+        userinfo_url = await self._endpoint('userinfo_endpoint')
+
+        async def _userinfo():
+            session = await self.transport.get_session()
+            async with session.get(
+                userinfo_url,
+                headers={'Authorization': f'Bearer {access_token}'}
+            ) as response:
+                data = await response.json()
+
+                if not response.ok:
+                    error = AuthAgentNetworkError(
+                        f"Userinfo request failed: {data.get('error', 'unknown_error')} - "
+                        f"{data.get('error_description', 'No description')}"
+                    )
+                    error.status_code = response.status
+                    error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    error.oauth_error = data.get('error')
+                    raise error
+
+                return data
+
+        data = await self.single_flight.do(
+            ('userinfo', access_token),
+            lambda: retry_with_backoff_async(_userinfo, self.retry_options, self.circuit_breakers.get(userinfo_url))
+        )
+        return dict(data)
+
+    async def complete_callback(self, state: str, code: str) -> Dict[str, Any]:
+        """
+        Finish a sign-in started with get_authorization_url() (async version).
+
+        Looks up and deletes the pending sign-in for `state`, then exchanges the
+        code with its verifier. The entry is removed before the exchange, so a
+        replayed callback is rejected even if the first one is still running.
+
+        Args:
+            state: The state query parameter from the callback
+            code: The authorization code from the callback
+
+        Returns:
+            Dictionary containing access_token, refresh_token, etc.
+
+        Raises:
+            AuthAgentValidationError: If no pending_auth_store is configured
+            AuthAgentSecurityError: If the state is unknown, expired or already used
+            Exception: If token exchange fails
+        """
+        code_verifier = self._pop_pending_auth(state)
+        return await self.exchange_code_for_tokens(code, code_verifier)
+
+    def complete_callback_sync(self, state: str, code: str) -> Dict[str, Any]:
+        """
+        Finish a sign-in started with get_authorization_url() (sync version).
+
+        Args:
+            state: The state query parameter from the callback
+            code: The authorization code from the callback
+
+        Returns:
+            Dictionary containing access_token, refresh_token, etc.
+
+        Raises:
+            AuthAgentValidationError: If no pending_auth_store is configured
+            AuthAgentSecurityError: If the state is unknown, expired or already used
+            Exception: If token exchange fails
+        """
+        code_verifier = self._pop_pending_auth(state)
+        return self.exchange_code_for_tokens_sync(code, code_verifier)
+
+    def _pop_pending_auth(self, state: str) -> str:
+        if self.pending_auth_store is None:
+            raise AuthAgentValidationError('complete_callback requires a pending_auth_store')
+        if not state:
+            raise AuthAgentSecurityError('Missing state parameter')
+        pending = self.pending_auth_store.pop(state)
+        if pending is None:
+            raise AuthAgentSecurityError('Unknown, expired or already used state')
+        return pending.code_verifier
+
+    async def refresh_tokens(self, refresh_token: str) -> Dict[str, Any]:
+        """
+        Get a new token set with a refresh token (async version).
+
+        The server rotates refresh tokens: the returned set carries a new
+        refresh_token and the old one stops working. Concurrent refreshes with
+        the same refresh token share one request.
+
+        Args:
+            refresh_token: The refresh token from a previous token response
+
+        Returns:
+            Dictionary containing access_token, refresh_token, expires_in, etc.
+
+        Raises:
+            RuntimeError: If aiohttp is not installed
+            AuthAgentNetworkError: If the refresh fails
+        """
+        if not ASYNC_AVAILABLE:
+            raise RuntimeError("aiohttp is required for async methods. Install with: pip install aiohttp")
+
+        payload = {
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token,
+            'client_id': self.client_id,
+        }
+
+        if self.client_secret:
+            payload['client_secret'] = self.client_secret
+
+        token_url = await self._endpoint('token_endpoint')
+
+        async def _refresh():
+            session = await self.transport.get_session()
+            async with session.post(
+                token_url,
+                json=payload,
+                headers={'Content-Type': 'application/json'}
+            ) as response:
+                data = await response.json()
+
+                if not response.ok:
+                    error_msg = (
+                        f"Token refresh failed: {data.get('error', 'unknown_error')} - "
+                        f"{data.get('error_description', 'No description')}"
+                    )
+                    error = AuthAgentNetworkError(error_msg)
+                    error.status_code = response.status
+                    error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    error.oauth_error = data.get('error')
+                    raise error
+
+                return data
+
+        tokens = await self.single_flight.do(
+            ('refresh', refresh_token),
+            lambda: retry_with_backoff_async(_refresh, self.retry_options, self.circuit_breakers.get(token_url))
+        )
+        return dict(tokens)
 
     def exchange_code_for_tokens_sync(
         self,
@@ -194,6 +610,7 @@ class AuthAgentClient:
             Dictionary containing access_token, refresh_token, etc.
 
         Raises:
+            RuntimeError: If requests is not installed
             Exception: If token exchange fails
         """
         payload = {
@@ -207,12 +624,15 @@ class AuthAgentClient:
         if self.client_secret:
             payload['client_secret'] = self.client_secret
 
+        token_url = self._cached_endpoint('token_endpoint')
+
         def _exchange():
-            response = requests.post(
-                f"{self.auth_server_url}/token",
+            response = self.sync_transport.request(
+                'POST',
+                token_url,
+                Deadline(self.retry_options.timeout),
                 json=payload,
-                headers={'Content-Type': 'application/json'},
-                timeout=self.retry_options.timeout
+                headers={'Content-Type': 'application/json'}
             )
 
             data = response.json()
@@ -224,22 +644,28 @@ class AuthAgentClient:
                 )
                 error = AuthAgentNetworkError(error_msg)
                 error.status_code = response.status_code
+                error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
                 raise error
 
             return data
-        
-        from ..common.retry import retry_with_backoff
-        return retry_with_backoff(_exchange, self.retry_options)
+
+        return retry_with_backoff(_exchange, self.retry_options, self.circuit_breakers.get(token_url))
 
     async def introspect_token(
         self,
-        access_token: str
+        access_token: str,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Introspect an access token to get user/agent information (async version).
 
+        Concurrent introspections of the same token share one request. When an
+        introspection cache is configured, repeated tokens are answered from it
+        until their entry expires.
+
         Args:
             access_token: The access token to introspect
+            use_cache: Set to False to always ask the server (the fresh result is still cached)
 
         Returns:
             Dictionary with token information (active, sub, model, etc.)
@@ -247,6 +673,12 @@ class AuthAgentClient:
         Raises:
             RuntimeError: If aiohttp is not installed
         """
+        cache = self.introspection_cache
+        if cache is not None and use_cache:
+            cached = cache.get(access_token)
+            if cached is not None:
+                return cached
+
         if not ASYNC_AVAILABLE:
             raise RuntimeError("aiohttp is required for async methods. Install with: pip install aiohttp")
 
@@ -259,17 +691,286 @@ class AuthAgentClient:
         if self.client_secret:
             payload['client_secret'] = self.client_secret
 
+        introspect_url = await self._endpoint('introspection_endpoint')
+
         async def _introspect():
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.auth_server_url}/introspect",
-                    json=payload,
-                    headers={'Content-Type': 'application/json'}
-                ) as response:
-                    if not response.ok:
-                        data = await response.json()
-                        error_msg = data.get('error_description', f'HTTP {response.status}')
-                        raise AuthAgentNetworkError(f"Token introspection failed: {error_msg}")
-                    return await response.json()
+            session = await self.transport.get_session()
+            async with session.post(
+                introspect_url,
+                json=payload,
+                headers={'Content-Type': 'application/json'}
+            ) as response:
+                if not response.ok:
+                    data = await _error_body(response)
+                    error_msg = data.get('error_description', f'HTTP {response.status}')
+                    error = AuthAgentNetworkError(f"Token introspection failed: {error_msg}")
+                    error.status_code = response.status
+                    error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    raise error
+                return await response.json()
         
-        return await retry_with_backoff_async(_introspect, self.retry_options)
+        async def _introspect_and_cache():
+            revocations = self._revocations
+            result = await retry_with_backoff_async(
+                _introspect, self.retry_options, self.circuit_breakers.get(introspect_url)
+            )
+            # A revocation may have finished while this request was in flight
+            if cache is not None and self._revocations == revocations:
+                cache.put(access_token, result)
+            return result
+
+        result = await self.single_flight.do(('introspect', access_token), _introspect_and_cache)
+        return dict(result)
+
+    def introspect_token_sync(
+        self,
+        access_token: str,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Introspect an access token to get user/agent information (sync version).
+
+        Args:
+            access_token: The access token to introspect
+            use_cache: Set to False to always ask the server (the fresh result is still cached)
+
+        Returns:
+            Dictionary with token information (active, sub, model, etc.)
+
+        Raises:
+            RuntimeError: If requests is not installed
+        """
+        cache = self.introspection_cache
+        if cache is not None and use_cache:
+            cached = cache.get(access_token)
+            if cached is not None:
+                return cached
+
+        payload = {
+            'token': access_token,
+            'token_type_hint': 'access_token',
+            'client_id': self.client_id,
+        }
+
+        if self.client_secret:
+            payload['client_secret'] = self.client_secret
+
+        introspect_url = self._cached_endpoint('introspection_endpoint')
+
+        def _introspect():
+            response = self.sync_transport.request(
+                'POST',
+                introspect_url,
+                Deadline(self.retry_options.timeout),
+                json=payload,
+                headers={'Content-Type': 'application/json'}
+            )
+
+            if not response.ok:
+                data = _error_body_sync(response)
+                error_msg = data.get('error_description', f'HTTP {response.status_code}')
+                error = AuthAgentNetworkError(f"Token introspection failed: {error_msg}")
+                error.status_code = response.status_code
+                error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                raise error
+
+            return response.json()
+
+        revocations = self._revocations
+        result = retry_with_backoff(_introspect, self.retry_options, self.circuit_breakers.get(introspect_url))
+        # A revocation may have finished while this request was in flight
+        if cache is not None and self._revocations == revocations:
+            cache.put(access_token, result)
+        return dict(result)
+
+    async def verify_access_token_local(
+        self,
+        access_token: str,
+        check_revocation: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Validate an access token in-process when possible.
+
+        With a jwt_secret configured, the signature, exp/iat, issuer and
+        client_id are checked locally. Without one, or when check_revocation is
+        True, this falls back to introspect_token().
+
+        Args:
+            access_token: The access token to validate
+            check_revocation: Ask the server, skipping the introspection cache, so revoked
+                tokens are reported inactive
+
+        Returns:
+            Dictionary shaped like an introspection result: `active` plus the
+            token claims (sub, client_id, model, scope, exp) when active
+        """
+        if self.token_verifier is None or check_revocation:
+            return await self.introspect_token(access_token, use_cache=not check_revocation)
+
+        return self._verify_local(access_token)
+
+    def verify_access_token_local_sync(
+        self,
+        access_token: str,
+        check_revocation: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Validate an access token in-process when possible (sync version).
+
+        Args:
+            access_token: The access token to validate
+            check_revocation: Ask the server, skipping the introspection cache, so revoked
+                tokens are reported inactive
+
+        Returns:
+            Dictionary shaped like an introspection result
+        """
+        if self.token_verifier is None or check_revocation:
+            return self.introspect_token_sync(access_token, use_cache=not check_revocation)
+
+        return self._verify_local(access_token)
+
+    def _verify_local(self, access_token: str) -> Dict[str, Any]:
+        try:
+            claims = self.token_verifier.verify(access_token)
+        except AuthAgentSecurityError:
+            return {'active': False}
+        return {'active': True, **claims}
+
+    async def revoke_token(
+        self,
+        token: str,
+        token_type_hint: str = 'access_token'
+    ) -> None:
+        """
+        Revoke an access or refresh token (async version).
+
+        The server answers 200 for unknown tokens too (RFC 7009), so revoking an
+        already revoked token succeeds. Any cached introspection result for the
+        token is dropped.
+
+        Args:
+            token: The token to revoke
+            token_type_hint: 'access_token' or 'refresh_token'
+
+        Raises:
+            RuntimeError: If aiohttp is not installed
+            AuthAgentNetworkError: If the server cannot be reached or rejects the request
+        """
+        if not ASYNC_AVAILABLE:
+            raise RuntimeError("aiohttp is required for async methods. Install with: pip install aiohttp")
+
+        payload = {
+            'token': token,
+            'token_type_hint': token_type_hint,
+            'client_id': self.client_id,
+        }
+
+        if self.client_secret:
+            payload['client_secret'] = self.client_secret
+
+        revoke_url = await self._endpoint('revocation_endpoint')
+
+        async def _revoke():
+            session = await self.transport.get_session()
+            async with session.post(
+                revoke_url,
+                json=payload,
+                headers={'Content-Type': 'application/json'}
+            ) as response:
+                if not response.ok:
+                    error = AuthAgentNetworkError(f"Token revocation failed: HTTP {response.status}")
+                    error.status_code = response.status
+                    error.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    raise error
+                await response.read()
+
+        self._revocations += 1
+        self.invalidate_token(token)
+        try:
+            await self.single_flight.do(
+                ('revoke', token),
+                lambda: retry_with_backoff_async(_revoke, self.retry_options, self.circuit_breakers.get(revoke_url))
+            )
+        finally:
+            # Drop anything an introspection cached while the revocation was in flight
+            self._revocations += 1
+            self.invalidate_token(token)
+
+    def introspect_many(
+        self,
+        tokens: Iterable[str],
+        concurrency: int = 10,
+        use_cache: bool = True
+    ) -> BatchRun:
+        """
+        Introspect many tokens concurrently over the shared connection pool.
+
+        Args:
+            tokens: Access tokens to introspect (consumed lazily)
+            concurrency: Maximum number of requests in flight (default: 10)
+            use_cache: Answer tokens from the introspection cache when possible
+
+        Returns:
+            BatchRun to iterate with `async for` (results as they complete) or
+            `await run.collect()`. Each BatchItemResult is keyed by token and holds
+            the introspection result or the error; aggregate timing is on
+            `run.stats` once the batch finishes.
+
+        Example:
+            async with client.introspect_many(tokens, concurrency=50) as run:
+                async for result in run:
+                    if result.ok and result.value['active']:
+                        print(result.value['sub'])
+            print(run.stats)
+        """
+        return BatchRun(
+            tokens,
+            lambda token: self.introspect_token(token, use_cache=use_cache),
+            concurrency=concurrency
+        )
+
+    def revoke_many(
+        self,
+        tokens: Iterable[str],
+        concurrency: int = 10,
+        token_type_hint: str = 'access_token'
+    ) -> BatchRun:
+        """
+        Revoke many tokens concurrently over the shared connection pool.
+
+        One failed revocation does not stop the others; check `result.ok` and
+        retry the failed keys.
+
+        Args:
+            tokens: Tokens to revoke (consumed lazily)
+            concurrency: Maximum number of requests in flight (default: 10)
+            token_type_hint: 'access_token' or 'refresh_token'
+
+        Returns:
+            BatchRun yielding one BatchItemResult per token, keyed by token, with
+            aggregate timing on `run.stats` once the batch finishes.
+
+        Example:
+            run = client.revoke_many(leaked_tokens, concurrency=100)
+            failed = [r.key for r in await run.collect() if not r.ok]
+            print(run.stats)
+        """
+        return BatchRun(
+            tokens,
+            lambda token: self.revoke_token(token, token_type_hint),
+            concurrency=concurrency
+        )
+
+    def invalidate_token(self, access_token: str) -> None:
+        """
+        Forget any cached introspection result for a token.
+
+        Call this when a token is revoked or a user signs out, so the next
+        introspect_token() asks the server.
+
+        Args:
+            access_token: The access token to forget
+        """
+        if self.introspection_cache is not None:
+            self.introspection_cache.invalidate(access_token)
@@ -0,0 +1,253 @@
+"""
+Cached authorization-server metadata discovery (RFC 8414)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..common.errors import AuthAgentSecurityError
+from ..common.singleflight import SingleFlight
+
+WELL_KNOWN_PATH = '/.well-known/oauth-authorization-server'
+
+# Paths used when no metadata document is available
+DEFAULT_ENDPOINT_PATHS = {
+    'authorization_endpoint': '/authorize',
+    'token_endpoint': '/token',
+    'introspection_endpoint': '/introspect',
+    'revocation_endpoint': '/revoke',
+    'userinfo_endpoint': '/userinfo',
+}
+
+
+def _same_issuer(a: Any, b: str) -> bool:
+    return isinstance(a, str) and a.rstrip('/') == b.rstrip('/')
+
+
+class ServerMetadata:
+    """A discovered metadata document and when it was fetched."""
+
+    __slots__ = ('issuer', 'document', 'fetched_at')
+
+    def __init__(self, issuer: str, document: Dict[str, Any], fetched_at: float):
+        self.issuer = issuer
+        self.document = document
+        self.fetched_at = fetched_at
+
+    def endpoint(self, name: str) -> Optional[str]:
+        """
+        Get an endpoint URL from the document.
+
+        Args:
+            name: Metadata field, e.g. 'token_endpoint'
+
+        Returns:
+            Endpoint URL, or None if the server does not publish it
+        """
+        value = self.document.get(name)
+        return value if isinstance(value, str) and value else None
+
+    def __repr__(self) -> str:
+        return f"ServerMetadata(issuer={self.issuer!r}, fetched_at={self.fetched_at:.0f})"
+
+
+class MetadataCache:
+    """
+    Process-wide cache of authorization-server metadata, keyed by issuer.
+
+    A document is fetched once per issuer and reused for `ttl` seconds. Once
+    it is older than `ttl - refresh_margin`, callers still get it immediately,
+    even past `ttl`, while a background task fetches a new copy. If a refresh
+    fails, the stale document keeps being served and no refresh is attempted
+    for `failure_ttl` seconds. With `cache_dir` set, documents are also
+    written to disk and read back on a cold start, so the first request after
+    a restart needs no discovery round trip.
+
+    A failed fetch for an issuer with nothing cached is remembered for
+    `failure_ttl` seconds, during which lookups fail at once without a
+    request, so a server without a metadata document costs one round trip
+    per `failure_ttl` rather than one per call.
+
+    A document whose `issuer` differs from the issuer it was fetched for is
+    rejected (RFC 8414 section 3.3), so a tampered document cannot redirect
+    credentials to another server.
+
+    Share one cache between clients to discover each issuer once per process.
+
+    Example:
+        metadata = MetadataCache(cache_dir='/var/cache/auth-agent')
+        client = AuthAgentClient(client_id, redirect_uri, client_secret,
+                                 metadata_cache=metadata)
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        refresh_margin: float = 300.0,
+        cache_dir: Optional[str] = None,
+        failure_ttl: float = 30.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a document is considered fresh
+            refresh_margin: Seconds before expiry a background refresh starts
+            cache_dir: Optional directory for persisting documents across restarts
+            failure_ttl: Seconds a failed discovery is remembered before it is retried
+            clock: Wall-clock time source
+        """
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.cache_dir = cache_dir
+        self.failure_ttl = failure_ttl
+        self.fetches = 0
+        self._clock = clock
+        self._entries: Dict[str, ServerMetadata] = {}
+        self._failures: Dict[str, Tuple[float, Exception]] = {}
+        self._flights = SingleFlight()
+        self._tasks: set = set()
+
+    def peek(self, issuer: str) -> Optional[ServerMetadata]:
+        """
+        Get a cached document without any network access.
+
+        Args:
+            issuer: Issuer (auth server base URL)
+
+        Returns:
+            Cached metadata, possibly stale, or None
+        """
+        entry = self._entries.get(issuer)
+        if entry is None and self.cache_dir:
+            entry = self._load(issuer)
+            if entry is not None:
+                self._entries[issuer] = entry
+        return entry
+
+    async def get(
+        self,
+        issuer: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> ServerMetadata:
+        """
+        Get the metadata for an issuer, fetching it on first use.
+
+        Args:
+            issuer: Issuer (auth server base URL)
+            fetch: Coroutine function returning the metadata document
+
+        Returns:
+            Cached (possibly stale) or freshly fetched metadata
+
+        Raises:
+            Exception: If nothing is cached and the fetch fails, or failed
+                less than `failure_ttl` seconds ago
+        """
+        entry = self.peek(issuer)
+        failure = self._recent_failure(issuer)
+        if entry is None:
+            if failure is not None:
+                raise failure
+            return await self._flights.do(issuer, lambda: self._fetch(issuer, fetch))
+
+        # Even past `ttl`, serve the cached document at once rather than make
+        # the caller wait on a fetch and its retries
+        age = self._clock() - entry.fetched_at
+        if age >= self.ttl - self.refresh_margin and failure is None:
+            self._refresh_in_background(issuer, fetch)
+        return entry
+
+    def invalidate(self, issuer: str) -> None:
+        """Forget the cached document or failure for an issuer (memory and disk)."""
+        self._entries.pop(issuer, None)
+        self._failures.pop(issuer, None)
+        if self.cache_dir:
+            try:
+                os.remove(self._path(issuer))
+            except OSError:
+                pass
+
+    async def aclose(self) -> None:
+        """Cancel background refreshes."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _recent_failure(self, issuer: str) -> Optional[Exception]:
+        failure = self._failures.get(issuer)
+        if failure is not None and self._clock() - failure[0] < self.failure_ttl:
+            return failure[1]
+        return None
+
+    def _refresh_in_background(self, issuer: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        if issuer in self._flights:
+            return
+        task = asyncio.ensure_future(self._flights.do(issuer, lambda: self._fetch(issuer, fetch)))
+        self._tasks.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: 'asyncio.Future') -> None:
+        self._tasks.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, issuer: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> ServerMetadata:
+        try:
+            document = await fetch()
+            self.fetches += 1
+            issuer_claimed = document.get('issuer') if isinstance(document, dict) else None
+            if not _same_issuer(issuer_claimed, issuer):
+                raise AuthAgentSecurityError(
+                    f"Metadata issuer {issuer_claimed!r} does not match the requested issuer {issuer!r}"
+                )
+        except Exception as error:
+            self._failures[issuer] = (self._clock(), error)
+            raise
+        self._failures.pop(issuer, None)
+        entry = ServerMetadata(issuer, document, self._clock())
+        self._entries[issuer] = entry
+        if self.cache_dir:
+            self._store(entry)
+        return entry
+
+    def _path(self, issuer: str) -> str:
+        digest = hashlib.sha256(issuer.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f'oauth-metadata-{digest}.json')
+
+    def _load(self, issuer: str) -> Optional[ServerMetadata]:
+        try:
+            with open(self._path(issuer), encoding='utf-8') as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('issuer') != issuer or not isinstance(data.get('document'), dict):
+            return None
+        if not _same_issuer(data['document'].get('issuer'), issuer):
+            return None
+        return ServerMetadata(issuer, data['document'], float(data.get('fetched_at', 0)))
+
+    def _store(self, entry: ServerMetadata) -> None:
+        # Best effort: a read-only or full disk only costs a discovery on the next cold start
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+                json.dump({'issuer': entry.issuer, 'fetched_at': entry.fetched_at, 'document': entry.document}, handle)
+            os.replace(tmp_path, self._path(entry.issuer))
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
@@ -0,0 +1,127 @@
+"""
+Introspection result cache for resource servers
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class IntrospectionCache:
+    """
+    Bounded LRU cache of /introspect results.
+
+    Entries are keyed by a SHA-256 digest of the token, so raw tokens are not
+    kept in memory. An active result lives for at most `max_ttl` seconds and
+    never past the token's `exp`; an inactive result lives for `negative_ttl`
+    seconds, so a burst of requests with a bad token costs one round trip.
+
+    Example:
+        cache = IntrospectionCache(max_entries=50_000, max_ttl=30.0)
+        client = AuthAgentClient(client_id, redirect_uri, client_secret,
+                                 introspection_cache=cache)
+        info = await client.introspect_token(token)   # network
+        info = await client.introspect_token(token)   # cache
+        client.invalidate_token(token)                # e.g. after logout
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_ttl: float = 60.0,
+        negative_ttl: float = 5.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of tokens kept
+            max_ttl: Upper bound in seconds on how long an active result is reused
+            negative_ttl: Seconds an inactive result is reused (0 disables negative caching)
+            clock: Wall-clock time source, compared with the token's `exp`
+        """
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: 'OrderedDict[bytes, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            token: Access token
+
+        Returns:
+            Copy of the cached introspection result, or None if absent or expired
+        """
+        key = self._key(token)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, token: str, result: Dict[str, Any]) -> None:
+        """
+        Store an introspection result.
+
+        Args:
+            token: Access token
+            result: Response from /introspect
+        """
+        now = self._clock()
+        if result.get('active'):
+            ttl = self.max_ttl
+            exp = result.get('exp')
+            if isinstance(exp, (int, float)):
+                ttl = min(ttl, exp - now)
+        else:
+            ttl = self.negative_ttl
+        if ttl <= 0:
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (now + ttl, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> bool:
+        """
+        Drop a token's cached result, e.g. after it was revoked.
+
+        Args:
+            token: Access token
+
+        Returns:
+            True if an entry was removed
+        """
+        with self._lock:
+            return self._entries.pop(self._key(token), None) is not None
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
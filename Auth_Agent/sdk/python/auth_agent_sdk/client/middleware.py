@@ -0,0 +1,375 @@
+"""
+ASGI and WSGI middleware that authenticates bearer tokens
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from ..common.stats import percentile
+from .introspection_cache import IntrospectionCache
+
+# Fields of a verification result exposed to the application
+PRINCIPAL_FIELDS = ('sub', 'client_id', 'model', 'scope', 'exp')
+
+TimingHook = Callable[[float, str], None]
+
+
+class AuthTimings:
+    """
+    Time spent authenticating requests.
+
+    Outcomes are 'authenticated', 'rejected' (missing or inactive token),
+    'excluded' (path not protected) and 'error' (token could not be checked).
+    Percentiles cover the most recent `window` requests.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total_time = 0.0
+        self.outcomes: Dict[str, int] = {}
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float, outcome: str) -> None:
+        """Record one request."""
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            self._recent.append(elapsed)
+
+    @property
+    def mean(self) -> float:
+        """Mean time per request in seconds."""
+        return self.total_time / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Latency percentile over the recent window.
+
+        Args:
+            fraction: Percentile as a fraction, e.g. 0.99
+
+        Returns:
+            Latency in seconds
+        """
+        with self._lock:
+            recent = sorted(self._recent)
+        return percentile(recent, fraction)
+
+    def __repr__(self) -> str:
+        return (
+            f"AuthTimings(count={self.count}, mean={self.mean * 1000:.3f}ms, "
+            f"p99={self.percentile(0.99) * 1000:.3f}ms)"
+        )
+
+
+class _BearerAuth:
+    """Token checking shared by the ASGI and WSGI middleware."""
+
+    def __init__(
+        self,
+        client: Any,
+        cache: Optional[IntrospectionCache],
+        exclude_paths: Iterable[str],
+        required: bool,
+        check_revocation: bool,
+        scope_key: str,
+        on_timing: Optional[TimingHook]
+    ):
+        self.client = client
+        if cache is None:
+            cache = client.introspection_cache
+        # An empty cache is falsy, so compare with None
+        self.cache = cache if cache is not None else IntrospectionCache()
+        self.exclude_paths = tuple(exclude_paths)
+        # '/health' covers '/health' and '/health/...', not '/healthz'
+        self._excluded_prefixes = tuple(prefix.rstrip('/') for prefix in self.exclude_paths)
+        self.required = required
+        self.check_revocation = check_revocation
+        self.scope_key = scope_key
+        self.on_timing = on_timing
+        self.timings = AuthTimings()
+
+    def is_excluded(self, path: str) -> bool:
+        return any(
+            path == prefix or path.startswith(prefix + '/') for prefix in self._excluded_prefixes
+        )
+
+    def cached(self, token: str) -> Optional[Dict[str, Any]]:
+        if self.check_revocation:
+            # A cached result could hide a revocation made since it was stored
+            return None
+        return self.cache.get(token)
+
+    def remember(self, token: str, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        self.cache.put(token, result)
+        return principal_from(result)
+
+    def finish(self, started: float, outcome: str) -> None:
+        elapsed = time.perf_counter() - started
+        self.timings.record(elapsed, outcome)
+        if self.on_timing is not None:
+            self.on_timing(elapsed, outcome)
+
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """
+    Extract the token from an Authorization header value.
+
+    Args:
+        authorization: Header value, e.g. 'Bearer abc'
+
+    Returns:
+        The token, or None if the header is absent or not a bearer credential
+    """
+    if not authorization:
+        return None
+    scheme, _, token = authorization.strip().partition(' ')
+    token = token.strip()
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    return token
+
+
+def principal_from(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Build the principal attached to a request from a verification result.
+
+    Args:
+        result: Result of introspect_token() or verify_access_token_local()
+
+    Returns:
+        Dictionary with sub, agent_id, client_id, model, scope and exp, or None
+        if the token is not active
+    """
+    if not result.get('active'):
+        return None
+    principal = {field: result.get(field) for field in PRINCIPAL_FIELDS}
+    # Auth Agent access tokens are issued to agents; `sub` is the agent id
+    principal['agent_id'] = result.get('sub')
+    return principal
+
+
+def _outcome(principal: Optional[Dict[str, Any]], error: str) -> str:
+    if principal is not None:
+        return 'authenticated'
+    return 'error' if error == 'temporarily_unavailable' else 'rejected'
+
+
+def _error_body(error: str, description: str) -> bytes:
+    return json.dumps({'error': error, 'error_description': description}).encode('utf-8')
+
+
+def _error_response(error: str) -> Tuple[int, str, bytes, Tuple[Tuple[str, str], ...]]:
+    if error == 'temporarily_unavailable':
+        body = _error_body(error, 'Access token could not be verified')
+        return 503, 'Service Unavailable', body, (('Content-Type', 'application/json'),)
+    if error == 'invalid_request':
+        # No credentials at all: RFC 6750 asks for a bare challenge
+        body = _error_body(error, 'Missing bearer access token')
+        challenge = 'Bearer'
+    else:
+        body = _error_body(error, 'Invalid or expired access token')
+        challenge = f'Bearer error="{error}"'
+    return 401, 'Unauthorized', body, (
+        ('Content-Type', 'application/json'),
+        ('WWW-Authenticate', challenge),
+    )
+
+
+class AuthAgentASGIMiddleware:
+    """
+    ASGI middleware (Starlette, FastAPI) that authenticates bearer tokens.
+
+    Each HTTP or WebSocket request's token is checked against the
+    verification cache first, then with verify_access_token_local(), which
+    verifies signed tokens in-process when the client has a jwt_secret and
+    introspects them otherwise. The principal (sub, agent_id, client_id,
+    model, scope, exp) is stored in `scope[scope_key]`. Requests without a
+    valid token get a 401 (503 if the token could not be checked) unless
+    `required` is False, in which case the principal is None.
+
+    Pass the same client to every middleware in a process so they share its
+    pooled connections.
+
+    Example:
+        client = AuthAgentClient(client_id, redirect_uri, client_secret,
+                                 introspection_cache=IntrospectionCache())
+        app.add_middleware(AuthAgentASGIMiddleware, client=client, exclude_paths=['/health'])
+
+        @app.get('/me')
+        async def me(request: Request):
+            return request.scope['auth_agent']
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        client: Any,
+        cache: Optional[IntrospectionCache] = None,
+        exclude_paths: Iterable[str] = (),
+        required: bool = True,
+        check_revocation: bool = False,
+        scope_key: str = 'auth_agent',
+        on_timing: Optional[TimingHook] = None
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+            client: AuthAgentClient used to verify tokens
+            cache: Verification cache (default: the client's introspection cache, or a new one)
+            exclude_paths: Paths served without authentication, each with everything below it
+            required: Reject requests without a valid token
+            check_revocation: Always introspect, bypassing the verification cache and local
+                verification
+            scope_key: Scope key the principal is stored under
+            on_timing: Optional callback receiving (seconds spent, outcome) per request
+        """
+        self.app = app
+        self._auth = _BearerAuth(client, cache, exclude_paths, required, check_revocation, scope_key, on_timing)
+
+    @property
+    def timings(self) -> AuthTimings:
+        """Time spent authenticating requests."""
+        return self._auth.timings
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] not in ('http', 'websocket'):
+            await self.app(scope, receive, send)
+            return
+
+        auth = self._auth
+        started = time.perf_counter()
+        if auth.is_excluded(scope.get('path', '')):
+            auth.finish(started, 'excluded')
+            await self.app(scope, receive, send)
+            return
+
+        principal, error = await self._authenticate(scope)
+        auth.finish(started, _outcome(principal, error))
+        if principal is None and auth.required:
+            await self._reject(scope, receive, send, error)
+            return
+
+        scope[auth.scope_key] = principal
+        await self.app(scope, receive, send)
+
+    async def _authenticate(self, scope: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+        authorization = None
+        for name, value in scope.get('headers', ()):
+            if name == b'authorization':
+                authorization = value.decode('latin-1')
+                break
+        token = bearer_token(authorization)
+        if token is None:
+            return None, 'invalid_request'
+
+        auth = self._auth
+        cached = auth.cached(token)
+        if cached is not None:
+            return principal_from(cached), 'invalid_token'
+        try:
+            result = await auth.client.verify_access_token_local(token, check_revocation=auth.check_revocation)
+        except Exception:
+            return None, 'temporarily_unavailable'
+        return auth.remember(token, result), 'invalid_token'
+
+    async def _reject(self, scope: Dict[str, Any], receive: Callable, send: Callable, error: str) -> None:
+        if scope['type'] == 'websocket':
+            await send({'type': 'websocket.close', 'code': 1008})
+            return
+        status, _, body, headers = _error_response(error)
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+class AuthAgentWSGIMiddleware:
+    """
+    WSGI middleware (Flask, Django) that authenticates bearer tokens.
+
+    Behaves like AuthAgentASGIMiddleware using the client's sync methods; the
+    principal is stored in `environ[scope_key]`. The client's sync transport
+    keeps one pooled session per worker thread.
+
+    Example:
+        app.wsgi_app = AuthAgentWSGIMiddleware(app.wsgi_app, client, exclude_paths=['/health'])
+
+        @app.get('/me')
+        def me():
+            return request.environ['auth_agent']
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        client: Any,
+        cache: Optional[IntrospectionCache] = None,
+        exclude_paths: Iterable[str] = (),
+        required: bool = True,
+        check_revocation: bool = False,
+        scope_key: str = 'auth_agent',
+        on_timing: Optional[TimingHook] = None
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: WSGI application to wrap
+            client: AuthAgentClient used to verify tokens
+            cache: Verification cache (default: the client's introspection cache, or a new one)
+            exclude_paths: Paths served without authentication, each with everything below it
+            required: Reject requests without a valid token
+            check_revocation: Always introspect, bypassing the verification cache and local
+                verification
+            scope_key: Environ key the principal is stored under
+            on_timing: Optional callback receiving (seconds spent, outcome) per request
+        """
+        self.app = app
+        self._auth = _BearerAuth(client, cache, exclude_paths, required, check_revocation, scope_key, on_timing)
+
+    @property
+    def timings(self) -> AuthTimings:
+        """Time spent authenticating requests."""
+        return self._auth.timings
+
+    def __call__(self, environ: Dict[str, Any], start_response: Callable) -> Iterable[bytes]:
+        auth = self._auth
+        started = time.perf_counter()
+        if auth.is_excluded(environ.get('PATH_INFO', '')):
+            auth.finish(started, 'excluded')
+            return self.app(environ, start_response)
+
+        principal, error = self._authenticate(environ)
+        auth.finish(started, _outcome(principal, error))
+        if principal is None and auth.required:
+            status, reason, body, headers = _error_response(error)
+            start_response(f'{status} {reason}', list(headers) + [('Content-Length', str(len(body)))])
+            return [body]
+
+        environ[auth.scope_key] = principal
+        return self.app(environ, start_response)
+
+    def _authenticate(self, environ: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+        token = bearer_token(environ.get('HTTP_AUTHORIZATION'))
+        if token is None:
+            return None, 'invalid_request'
+
+        auth = self._auth
+        cached = auth.cached(token)
+        if cached is not None:
+            return principal_from(cached), 'invalid_token'
+        try:
+            result = auth.client.verify_access_token_local_sync(token, check_revocation=auth.check_revocation)
+        except Exception:
+            return None, 'temporarily_unavailable'
+        return auth.remember(token, result), 'invalid_token'
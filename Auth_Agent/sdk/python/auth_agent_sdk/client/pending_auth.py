@@ -0,0 +1,277 @@
+"""
+Storage for PKCE verifiers between the authorization redirect and the callback
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+
+class PendingAuth:
+    """A sign-in waiting for its callback."""
+
+    __slots__ = ('state', 'code_verifier', 'expires_at', 'bucket')
+
+    def __init__(self, state: str, code_verifier: str, expires_at: float, bucket: Optional[Set[str]] = None):
+        self.state = state
+        self.code_verifier = code_verifier
+        self.expires_at = expires_at
+        self.bucket = bucket
+
+    def __repr__(self) -> str:
+        return f"PendingAuth(expires_at={self.expires_at:.0f})"
+
+
+class PendingAuthStore:
+    """
+    Base class for pending sign-in storage.
+
+    Entries are keyed by the OAuth state and live for at most `ttl` seconds.
+    `pop()` removes the entry it returns, so a state can complete only once.
+    """
+
+    ttl: float = 600.0
+
+    def put(self, state: str, code_verifier: str) -> None:
+        """
+        Remember the code verifier for a sign-in.
+
+        Args:
+            state: OAuth state sent in the authorization URL
+            code_verifier: PKCE code verifier for the same request
+        """
+        raise NotImplementedError
+
+    def pop(self, state: str) -> Optional[PendingAuth]:
+        """
+        Remove and return the pending sign-in for a state.
+
+        Args:
+            state: OAuth state received on the callback
+
+        Returns:
+            The pending sign-in, or None if the state is unknown or expired
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release resources held by the store."""
+
+
+class MemoryPendingAuthStore(PendingAuthStore):
+    """
+    In-process pending sign-in store.
+
+    Expiry is driven by a time wheel: each entry is filed in the bucket for
+    the tick at which it expires, and every call first empties the buckets
+    whose tick has passed. Adding, completing and expiring an entry are all
+    constant time, and memory is capped at `max_entries`; when the store is
+    full, the entries closest to expiry are evicted first.
+
+    Only suitable when callbacks reach the process that created the URL. Use
+    SQLitePendingAuthStore to share state between worker processes.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        max_entries: int = 100000,
+        resolution: float = 1.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            ttl: Seconds a sign-in may take before its state is forgotten
+            max_entries: Maximum number of pending sign-ins kept
+            resolution: Width of one time-wheel slot in seconds
+            clock: Monotonic time source
+        """
+        if ttl <= 0 or resolution <= 0:
+            raise ValueError('ttl and resolution must be positive')
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1')
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.resolution = resolution
+        self.expired = 0
+        self.evicted = 0
+        self._clock = clock
+        # One extra slot so an entry is never dropped before its expiry time
+        self._ttl_ticks = math.ceil(ttl / resolution) + 1
+        self._buckets: List[Set[str]] = [set() for _ in range(self._ttl_ticks + 1)]
+        self._entries: Dict[str, PendingAuth] = {}
+        self._tick = self._current_tick(clock())
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, state: str, code_verifier: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._advance(now)
+            self._remove(state)
+            if len(self._entries) >= self.max_entries:
+                self._evict_oldest()
+            bucket = self._buckets[(self._tick + self._ttl_ticks) % len(self._buckets)]
+            bucket.add(state)
+            self._entries[state] = PendingAuth(state, code_verifier, now + self.ttl, bucket)
+
+    def pop(self, state: str) -> Optional[PendingAuth]:
+        now = self._clock()
+        with self._lock:
+            self._advance(now)
+            entry = self._remove(state)
+            if entry is not None and entry.expires_at <= now:
+                # Past its TTL but its wheel slot has not come round yet
+                self.expired += 1
+                entry = None
+        if entry is None:
+            return None
+        entry.bucket = None
+        return entry
+
+    def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for bucket in self._buckets:
+                bucket.clear()
+
+    def _current_tick(self, now: float) -> int:
+        return int(now // self.resolution)
+
+    def _advance(self, now: float) -> None:
+        tick = self._current_tick(now)
+        if tick <= self._tick:
+            return
+        # Past a full turn every slot has expired; clear each one once
+        steps = min(tick - self._tick, len(self._buckets))
+        for offset in range(1, steps + 1):
+            bucket = self._buckets[(self._tick + offset) % len(self._buckets)]
+            self.expired += self._drop_bucket(bucket)
+        self._tick = tick
+
+    def _drop_bucket(self, bucket: Set[str]) -> int:
+        for state in bucket:
+            del self._entries[state]
+        count = len(bucket)
+        bucket.clear()
+        return count
+
+    def _evict_oldest(self) -> None:
+        for offset in range(1, len(self._buckets) + 1):
+            bucket = self._buckets[(self._tick + offset) % len(self._buckets)]
+            if bucket:
+                self.evicted += self._drop_bucket(bucket)
+                return
+
+    def _remove(self, state: str) -> Optional[PendingAuth]:
+        entry = self._entries.pop(state, None)
+        if entry is not None and entry.bucket is not None:
+            entry.bucket.discard(state)
+        return entry
+
+
+class SQLitePendingAuthStore(PendingAuthStore):
+    """
+    Pending sign-in store in a SQLite database, shared by worker processes.
+
+    The database runs in WAL mode so concurrent workers can read and write
+    without blocking each other. `pop()` deletes the row in the same statement
+    that reads it, so two workers cannot complete the same state. Expired rows
+    are purged in bulk every `purge_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 600.0,
+        purge_interval: float = 60.0,
+        timeout: float = 5.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize the store and create its table if needed.
+
+        Args:
+            path: Database file path, on storage visible to every worker
+            ttl: Seconds a sign-in may take before its state is forgotten
+            purge_interval: Seconds between bulk deletions of expired rows
+            timeout: Seconds to wait for a lock held by another worker
+            clock: Wall-clock time source; must agree across workers
+        """
+        self.path = path
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self.timeout = timeout
+        self._clock = clock
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._next_purge = 0.0
+
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS pending_auth ('
+            'state TEXT PRIMARY KEY, code_verifier TEXT NOT NULL, expires_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS pending_auth_expires_at ON pending_auth (expires_at)')
+
+    def __len__(self) -> int:
+        row = self._connection().execute(
+            'SELECT COUNT(*) FROM pending_auth WHERE expires_at > ?', (self._clock(),)
+        ).fetchone()
+        return row[0]
+
+    def put(self, state: str, code_verifier: str) -> None:
+        now = self._clock()
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO pending_auth (state, code_verifier, expires_at) VALUES (?, ?, ?)',
+            (state, code_verifier, now + self.ttl)
+        )
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            conn.execute('DELETE FROM pending_auth WHERE expires_at <= ?', (now,))
+
+    def pop(self, state: str) -> Optional[PendingAuth]:
+        now = self._clock()
+        conn = self._connection()
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            row = conn.execute(
+                'DELETE FROM pending_auth WHERE state = ? RETURNING code_verifier, expires_at', (state,)
+            ).fetchone()
+        else:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute(
+                    'SELECT code_verifier, expires_at FROM pending_auth WHERE state = ?', (state,)
+                ).fetchone()
+                conn.execute('DELETE FROM pending_auth WHERE state = ?', (state,))
+        if row is None or row[1] <= now:
+            return None
+        return PendingAuth(state, row[0], row[1])
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
@@ -0,0 +1,117 @@
+"""
+Pre-generated PKCE verifiers and state tokens
+"""
+
+import base64
+import hashlib
+import secrets
+import threading
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+# (code_verifier, code_challenge, state)
+PKCETriple = Tuple[str, str, str]
+
+
+def generate_pkce_triple(state_length: int = 32) -> PKCETriple:
+    """
+    Generate a PKCE verifier, its S256 challenge and a state token.
+
+    Args:
+        state_length: Random bytes in the state token
+
+    Returns:
+        Tuple of (code_verifier, code_challenge, state)
+    """
+    verifier = base64.urlsafe_b64encode(secrets.token_bytes(96)).decode('ascii').rstrip('=')
+    digest = hashlib.sha256(verifier.encode('ascii')).digest()
+    challenge = base64.urlsafe_b64encode(digest).decode('ascii').rstrip('=')
+    return verifier, challenge, secrets.token_urlsafe(state_length)
+
+
+class PKCEPool:
+    """
+    Pool of ready-made (code_verifier, code_challenge, state) triples.
+
+    `take()` pops a triple in constant time. A daemon thread tops the pool up
+    whenever it falls below `refill_below`, so the random-number generation and
+    hashing happen off the request path. If a burst drains the pool, `take()`
+    generates a triple in line instead of waiting. Each triple is handed out once.
+
+    One pool can be shared by several clients.
+
+    Example:
+        pool = PKCEPool(size=4096)
+        pool.fill()
+        client = AuthAgentClient(client_id, redirect_uri, pkce_pool=pool)
+        auth_url, code_verifier, state = client.get_authorization_url()
+    """
+
+    def __init__(self, size: int = 1024, refill_below: Optional[int] = None, state_length: int = 32):
+        """
+        Initialize the pool. It is filled by the first take() or by fill().
+
+        Args:
+            size: Number of triples kept ready
+            refill_below: Wake the refill thread when fewer triples remain (default: size // 4)
+            state_length: Random bytes in each state token
+        """
+        if size < 1:
+            raise ValueError('size must be at least 1')
+        self.size = size
+        self.refill_below = refill_below if refill_below is not None else max(1, size // 4)
+        self.state_length = state_length
+        self.misses = 0
+        self._items: Deque[PKCETriple] = deque()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def take(self) -> PKCETriple:
+        """
+        Take one unused triple.
+
+        Returns:
+            Tuple of (code_verifier, code_challenge, state)
+        """
+        try:
+            triple = self._items.popleft()
+        except IndexError:
+            self.misses += 1
+            triple = generate_pkce_triple(self.state_length)
+        if len(self._items) < self.refill_below and not self._closed:
+            self._ensure_thread()
+            self._wake.set()
+        return triple
+
+    def fill(self) -> None:
+        """Fill the pool to `size` in the calling thread, e.g. at startup."""
+        while len(self._items) < self.size and not self._closed:
+            self._items.append(generate_pkce_triple(self.state_length))
+
+    def close(self) -> None:
+        """Stop the refill thread and discard unused triples."""
+        self._closed = True
+        self._wake.set()
+        self._items.clear()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._refill_loop, name='auth-agent-pkce-pool', daemon=True)
+                self._thread.start()
+
+    def _refill_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait()
+            self._wake.clear()
+            self.fill()
@@ -0,0 +1,61 @@
+"""
+Result of a completed sign-in
+"""
+
+from typing import Any, Dict, Optional
+
+
+class SignInResult:
+    """
+    Everything known about a user after the OAuth callback.
+
+    `timings` holds seconds spent per stage: 'exchange', 'userinfo',
+    'introspection' (for the stages that ran) and 'total'. Userinfo and
+    introspection run concurrently, so 'total' is less than the sum.
+    """
+
+    __slots__ = ('tokens', 'userinfo', 'introspection', 'timings')
+
+    def __init__(
+        self,
+        tokens: Dict[str, Any],
+        userinfo: Optional[Dict[str, Any]],
+        introspection: Optional[Dict[str, Any]],
+        timings: Dict[str, float]
+    ):
+        self.tokens = tokens
+        self.userinfo = userinfo
+        self.introspection = introspection
+        self.timings = timings
+
+    @property
+    def access_token(self) -> str:
+        """The issued access token."""
+        return self.tokens['access_token']
+
+    @property
+    def refresh_token(self) -> Optional[str]:
+        """The issued refresh token, if any."""
+        return self.tokens.get('refresh_token')
+
+    @property
+    def sub(self) -> Optional[str]:
+        """Subject (agent id) of the token."""
+        for source in (self.introspection, self.userinfo):
+            if source and source.get('sub'):
+                return source['sub']
+        return None
+
+    @property
+    def model(self) -> Optional[str]:
+        """Model the agent authenticated with, from introspection."""
+        return self.introspection.get('model') if self.introspection else None
+
+    @property
+    def email(self) -> Optional[str]:
+        """User email from userinfo, if the scope allows it."""
+        return self.userinfo.get('email') if self.userinfo else None
+
+    def __repr__(self) -> str:
+        stages = ', '.join(f'{name}={seconds * 1000:.1f}ms' for name, seconds in self.timings.items())
+        return f"SignInResult(sub={self.sub!r}, {stages})"
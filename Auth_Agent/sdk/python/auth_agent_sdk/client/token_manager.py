@@ -0,0 +1,313 @@
+"""
+Token lifecycle management with proactive refresh
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from ..common.errors import AuthAgentError
+from ..common.singleflight import SingleFlight
+
+
+class TokenSet:
+    """One stored token response."""
+
+    __slots__ = ('access_token', 'refresh_token', 'expires_at', 'scope', 'token_type', 'raw')
+
+    def __init__(
+        self,
+        access_token: str,
+        refresh_token: Optional[str],
+        expires_at: float,
+        scope: Optional[str] = None,
+        token_type: str = 'Bearer',
+        raw: Optional[Dict[str, Any]] = None
+    ):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expires_at = expires_at
+        self.scope = scope
+        self.token_type = token_type
+        self.raw = raw or {}
+
+    @classmethod
+    def from_response(
+        cls,
+        data: Dict[str, Any],
+        now: float,
+        previous: Optional['TokenSet'] = None
+    ) -> 'TokenSet':
+        """
+        Build a token set from a /token response.
+
+        Args:
+            data: Token endpoint response
+            now: Wall-clock time the response was received
+            previous: Token set being refreshed; its refresh_token is kept if the
+                response does not rotate it
+
+        Returns:
+            TokenSet
+        """
+        refresh_token = data.get('refresh_token') or (previous.refresh_token if previous else None)
+        return cls(
+            access_token=data['access_token'],
+            refresh_token=refresh_token,
+            expires_at=now + float(data.get('expires_in', 3600)),
+            scope=data.get('scope'),
+            token_type=data.get('token_type', 'Bearer'),
+            raw=data,
+        )
+
+    def __repr__(self) -> str:
+        return f"TokenSet(expires_at={self.expires_at:.0f}, scope={self.scope!r})"
+
+
+class _Entry:
+    __slots__ = ('tokens', 'timer', 'failures', 'last_error', 'dead')
+
+    def __init__(self, tokens: TokenSet):
+        self.tokens = tokens
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.failures = 0
+        self.last_error: Optional[Exception] = None
+        self.dead = False
+
+
+class TokenManager:
+    """
+    Keeps token sets fresh by refreshing them before they expire.
+
+    Each stored token set gets a refresh timer that fires `refresh_margin`
+    seconds before expiry, moved earlier by a random amount of up to
+    `refresh_jitter` seconds so a batch of tokens issued together does not
+    refresh together. The lead never exceeds half the token's remaining
+    lifetime, so short-lived tokens are refreshed halfway through rather than
+    immediately. `get_access_token()` returns the stored token without
+    waiting while it is valid, and only blocks when it is about to expire and
+    no background refresh has succeeded yet. Refreshes of the same key are
+    single-flight.
+
+    Failed refreshes are retried in the background with exponential backoff
+    while the access token is still valid. A rejected refresh token
+    (invalid_grant) is final: the key is kept until its access token expires
+    and then reported as needing a new login.
+
+    Example:
+        manager = TokenManager(client)
+        tokens = await client.exchange_code_for_tokens(code, code_verifier)
+        manager.add(user_id, tokens)
+
+        token = await manager.get_access_token(user_id)
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        refresh_margin: float = 60.0,
+        refresh_jitter: float = 30.0,
+        min_validity: float = 5.0,
+        retry_delay: float = 5.0,
+        clock: Callable[[], float] = time.time,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            client: AuthAgentClient used to refresh tokens
+            refresh_margin: Seconds before expiry a background refresh is scheduled
+            refresh_jitter: Upper bound of the random extra lead time added to each refresh
+            min_validity: get_access_token() refreshes in line when fewer seconds remain
+            retry_delay: First delay before retrying a failed background refresh
+            clock: Wall-clock time source
+            rng: Random source for jitter
+        """
+        self.client = client
+        self.refresh_margin = refresh_margin
+        self.refresh_jitter = refresh_jitter
+        self.min_validity = min_validity
+        self.retry_delay = retry_delay
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._flights = SingleFlight()
+        self._tasks: set = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def add(self, key: Hashable, tokens: Dict[str, Any]) -> TokenSet:
+        """
+        Store a token response and schedule its refresh.
+
+        Call from the event loop thread; without a running loop the refresh is
+        scheduled on the next get_access_token().
+
+        Args:
+            key: Identifier for the token set (e.g. user or session id)
+            tokens: Response from exchange_code_for_tokens() or refresh_tokens()
+
+        Returns:
+            Stored TokenSet
+        """
+        token_set = TokenSet.from_response(tokens, self._clock())
+        self._cancel(key)
+        entry = _Entry(token_set)
+        self._entries[key] = entry
+        self._schedule(key, entry)
+        return token_set
+
+    def get(self, key: Hashable) -> Optional[TokenSet]:
+        """Return the stored token set for a key, if any."""
+        entry = self._entries.get(key)
+        return entry.tokens if entry else None
+
+    def remove(self, key: Hashable) -> Optional[TokenSet]:
+        """
+        Stop managing a token set.
+
+        Returns:
+            The removed TokenSet, if any
+        """
+        entry = self._cancel(key)
+        if entry is None:
+            return None
+        del self._entries[key]
+        return entry.tokens
+
+    async def get_access_token(self, key: Hashable) -> str:
+        """
+        Get a valid access token for a key.
+
+        Args:
+            key: Identifier passed to add()
+
+        Returns:
+            Access token valid for at least `min_validity` seconds
+
+        Raises:
+            KeyError: If no token set is stored for the key
+            AuthAgentError: If the token expired and cannot be refreshed
+        """
+        entry = self._entries[key]
+        if entry.timer is None and not entry.dead:
+            self._schedule(key, entry)
+        if entry.tokens.expires_at - self._clock() > self.min_validity:
+            return entry.tokens.access_token
+        tokens = await self.refresh(key)
+        return tokens.access_token
+
+    async def refresh(self, key: Hashable) -> TokenSet:
+        """
+        Refresh a token set now; concurrent calls for the same key share one request.
+
+        Args:
+            key: Identifier passed to add()
+
+        Returns:
+            The new TokenSet
+
+        Raises:
+            KeyError: If no token set is stored for the key
+            AuthAgentError: If the token set has no usable refresh token
+        """
+        return await self._flights.do(key, lambda: self._refresh(key))
+
+    async def aclose(self) -> None:
+        """Cancel scheduled and running background refreshes."""
+        for key in list(self._entries):
+            self._cancel(key)
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _refresh(self, key: Hashable) -> TokenSet:
+        entry = self._entries[key]
+        if entry.dead or not entry.tokens.refresh_token:
+            raise AuthAgentError('Token set cannot be refreshed; a new login is required', 'LOGIN_REQUIRED')
+
+        try:
+            data = await self.client.refresh_tokens(entry.tokens.refresh_token)
+        except Exception as error:
+            self.refresh_failures += 1
+            entry.failures += 1
+            entry.last_error = error
+            if _oauth_error(error) == 'invalid_grant':
+                entry.dead = True
+            elif self._entries.get(key) is entry:
+                self._schedule_retry(key, entry)
+            raise
+
+        self.refreshes += 1
+        if self._entries.get(key) is not entry:
+            # Removed or replaced while the request was in flight
+            return TokenSet.from_response(data, self._clock(), entry.tokens)
+        entry.tokens = TokenSet.from_response(data, self._clock(), entry.tokens)
+        entry.failures = 0
+        entry.last_error = None
+        self._schedule(key, entry)
+        return entry.tokens
+
+    def _schedule(self, key: Hashable, entry: _Entry) -> None:
+        now = self._clock()
+        lead = self.refresh_margin + self._rng.uniform(0, self.refresh_jitter)
+        # A token living less than the lead would be refreshed at once, and so
+        # would every replacement; refresh short-lived tokens halfway instead
+        lead = min(lead, (entry.tokens.expires_at - now) / 2)
+        self._set_timer(key, entry, entry.tokens.expires_at - lead - now)
+
+    def _schedule_retry(self, key: Hashable, entry: _Entry) -> None:
+        remaining = entry.tokens.expires_at - self._clock()
+        if remaining <= 0:
+            return
+        delay = self.retry_delay * (2 ** (entry.failures - 1))
+        self._set_timer(key, entry, min(delay, remaining / 2))
+
+    def _set_timer(self, key: Hashable, entry: _Entry, delay: float) -> None:
+        if entry.timer is not None:
+            entry.timer.cancel()
+            entry.timer = None
+        if not entry.tokens.refresh_token:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        entry.timer = loop.call_later(max(0.0, delay), self._start_background_refresh, key, entry)
+
+    def _start_background_refresh(self, key: Hashable, entry: _Entry) -> None:
+        if self._entries.get(key) is not entry:
+            return
+        task = asyncio.ensure_future(self.refresh(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: 'asyncio.Future') -> None:
+        self._tasks.discard(task)
+        if not task.cancelled():
+            # Failures are recorded on the entry and retried by _refresh
+            task.exception()
+
+    def _cancel(self, key: Hashable) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.timer is not None:
+            entry.timer.cancel()
+            entry.timer = None
+        return entry
+
+
+def _oauth_error(error: Exception) -> Optional[str]:
+    code = getattr(error, 'oauth_error', None)
+    if code is None and getattr(error, 'original_error', None) is not None:
+        code = getattr(error.original_error, 'oauth_error', None)
+    return code
@@ -0,0 +1,137 @@
+"""
+Local verification of HS256 access tokens
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Callable, Dict, Optional
+
+from ..common.errors import AuthAgentSecurityError
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+class LocalTokenVerifier:
+    """
+    Verifies access tokens signed with the auth server's JWT secret.
+
+    The HMAC key schedule is computed once and copied for each token, and
+    headers already seen are not parsed again, so a verification costs one
+    SHA-256 over the token plus a JSON decode of the claims.
+
+    Local verification cannot see revocations; use introspection when that matters.
+
+    Example:
+        verifier = LocalTokenVerifier(jwt_secret, issuer='https://auth.auth-agent.com',
+                                      client_id='your_client_id')
+        claims = verifier.verify(access_token)
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        issuer: Optional[str] = None,
+        client_id: Optional[str] = None,
+        leeway: float = 30.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize the verifier.
+
+        Args:
+            secret: JWT signing secret shared with the auth server (JWT_SECRET)
+            issuer: Expected `iss` claim (default: not checked)
+            client_id: Expected `aud`, or `client_id` claim when the token has no `aud`
+                (default: not checked)
+            leeway: Clock-skew tolerance in seconds for `exp`, `iat` and `nbf`
+            clock: Wall-clock time source
+        """
+        if not secret:
+            raise ValueError('secret is required')
+        self.issuer = issuer.rstrip('/') if issuer else None
+        self.client_id = client_id
+        self.leeway = leeway
+        self._clock = clock
+        self._mac = hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+        self._accepted_headers: set = set()
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token's signature and claims.
+
+        Args:
+            token: Compact JWT access token
+
+        Returns:
+            Token claims (sub, client_id, model, scope, iss, iat, exp)
+
+        Raises:
+            AuthAgentSecurityError: If the token is malformed, forged, expired or
+                issued for another issuer or client
+        """
+        parts = token.split('.')
+        if len(parts) != 3:
+            raise AuthAgentSecurityError('Invalid access token: malformed JWT')
+        header, payload, signature = parts
+
+        if header not in self._accepted_headers:
+            self._check_header(header)
+
+        mac = self._mac.copy()
+        mac.update(f'{header}.{payload}'.encode('ascii', 'replace'))
+        try:
+            signature_bytes = _b64url_decode(signature)
+        except (ValueError, TypeError):
+            raise AuthAgentSecurityError('Invalid access token: malformed signature')
+        if not hmac.compare_digest(mac.digest(), signature_bytes):
+            raise AuthAgentSecurityError('Invalid access token: signature mismatch')
+
+        try:
+            claims = json.loads(_b64url_decode(payload))
+        except (ValueError, TypeError):
+            raise AuthAgentSecurityError('Invalid access token: malformed claims')
+        if not isinstance(claims, dict):
+            raise AuthAgentSecurityError('Invalid access token: malformed claims')
+
+        self._check_claims(claims)
+        return claims
+
+    def _check_header(self, header: str) -> None:
+        try:
+            decoded = json.loads(_b64url_decode(header))
+        except (ValueError, TypeError):
+            raise AuthAgentSecurityError('Invalid access token: malformed header')
+        if not isinstance(decoded, dict) or decoded.get('alg') != 'HS256':
+            raise AuthAgentSecurityError('Invalid access token: unsupported algorithm')
+        if len(self._accepted_headers) < 16:
+            self._accepted_headers.add(header)
+
+    def _check_claims(self, claims: Dict[str, Any]) -> None:
+        now = self._clock()
+        exp = claims.get('exp')
+        if not isinstance(exp, (int, float)):
+            raise AuthAgentSecurityError('Invalid access token: missing exp')
+        if now > exp + self.leeway:
+            raise AuthAgentSecurityError('Invalid access token: token has expired')
+
+        for name in ('iat', 'nbf'):
+            value = claims.get(name)
+            if value is not None and (not isinstance(value, (int, float)) or value > now + self.leeway):
+                raise AuthAgentSecurityError(f'Invalid access token: {name} is in the future')
+
+        if self.issuer is not None and str(claims.get('iss', '')).rstrip('/') != self.issuer:
+            raise AuthAgentSecurityError('Invalid access token: unexpected issuer')
+
+        if self.client_id is not None:
+            audience = claims.get('aud')
+            if audience is not None:
+                allowed = audience if isinstance(audience, list) else [audience]
+                if self.client_id not in allowed:
+                    raise AuthAgentSecurityError('Invalid access token: unexpected audience')
+            elif claims.get('client_id') != self.client_id:
+                raise AuthAgentSecurityError('Invalid access token: issued to a different client')
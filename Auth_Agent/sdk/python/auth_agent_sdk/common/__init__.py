@@ -8,9 +8,28 @@ from .errors import (
     AuthAgentTimeoutError,
     AuthAgentValidationError,
     AuthAgentSecurityError,
+    AuthAgentRetryBudgetError,
+    AuthAgentCircuitOpenError,
 )
-from .validation import validate_url, validate_redirect_uri
-from .retry import retry_with_backoff, RetryOptions
+from .validation import validate_url, validate_redirect_uri, URLValidator
+from .host_matcher import HostMatcher
+from .retry import (
+    retry_with_backoff,
+    RetryOptions,
+    RetryBudget,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    BackoffStrategy,
+    ExponentialBackoff,
+    FullJitterBackoff,
+    EqualJitterBackoff,
+    DecorrelatedJitterBackoff,
+)
+from .deadline import Deadline
+from .transport import AsyncTransport, SyncTransport, BufferedResponse, PoolOptions
+from .batch import BatchRun, BatchItemResult, BatchStats
+from .singleflight import SingleFlight
+from .stats import percentile
 
 __all__ = [
     'AuthAgentError',
@@ -18,10 +37,32 @@ __all__ = [
     'AuthAgentTimeoutError',
     'AuthAgentValidationError',
     'AuthAgentSecurityError',
+    'AuthAgentRetryBudgetError',
+    'AuthAgentCircuitOpenError',
     'validate_url',
     'validate_redirect_uri',
+    'URLValidator',
+    'HostMatcher',
     'retry_with_backoff',
     'RetryOptions',
+    'RetryBudget',
+    'CircuitBreaker',
+    'CircuitBreakerRegistry',
+    'BackoffStrategy',
+    'ExponentialBackoff',
+    'FullJitterBackoff',
+    'EqualJitterBackoff',
+    'DecorrelatedJitterBackoff',
+    'Deadline',
+    'AsyncTransport',
+    'SyncTransport',
+    'BufferedResponse',
+    'PoolOptions',
+    'BatchRun',
+    'BatchItemResult',
+    'BatchStats',
+    'SingleFlight',
+    'percentile',
 ]
 
 
@@ -0,0 +1,187 @@
+"""
+Bounded-concurrency batch execution with streamed per-item results
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, TypeVar
+
+from .stats import percentile
+
+T = TypeVar('T')
+
+
+class BatchItemResult:
+    """Outcome of one item in a batch."""
+
+    def __init__(
+        self,
+        key: Any,
+        value: Any = None,
+        error: Optional[Exception] = None,
+        elapsed: float = 0.0,
+    ):
+        self.key = key
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        """Whether the item completed without an error."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        state = 'ok' if self.ok else f'error={self.error!r}'
+        return f"BatchItemResult(key={self.key!r}, {state}, elapsed={self.elapsed:.3f}s)"
+
+
+class BatchStats:
+    """Aggregate timing for a batch."""
+
+    def __init__(self, results: List[BatchItemResult], elapsed: float):
+        latencies = sorted(r.elapsed for r in results)
+        self.total = len(results)
+        self.succeeded = sum(1 for r in results if r.ok)
+        self.failed = self.total - self.succeeded
+        self.elapsed = elapsed
+        self.latency_p50 = percentile(latencies, 0.50)
+        self.latency_p95 = percentile(latencies, 0.95)
+        self.latency_p99 = percentile(latencies, 0.99)
+        self.latency_max = latencies[-1] if latencies else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Items completed per second."""
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"BatchStats(total={self.total}, succeeded={self.succeeded}, failed={self.failed}, "
+            f"elapsed={self.elapsed:.3f}s, p50={self.latency_p50:.3f}s, p95={self.latency_p95:.3f}s)"
+        )
+
+
+class BatchRun:
+    """
+    A batch of items processed with at most `concurrency` in flight.
+
+    Iterate with `async for` to receive results as they complete, or await
+    `collect()` to get all of them. A failing item never stops the others;
+    its exception is captured on its BatchItemResult. If the items iterable
+    or the key function raises, items already in flight finish and the error
+    is then raised to the consumer. `stats` is available once the batch has
+    finished.
+
+    Use `async with` (or call `aclose()`) when you may stop iterating early,
+    so in-flight items are cancelled immediately.
+
+    Example:
+        async with BatchRun(tokens, introspect, concurrency=20) as run:
+            async for result in run:
+                print(result.key, result.ok)
+        print(run.stats)
+    """
+
+    def __init__(
+        self,
+        items: Iterable[T],
+        worker: Callable[[T], Awaitable[Any]],
+        concurrency: int = 10,
+        key: Optional[Callable[[T], Any]] = None,
+    ):
+        """
+        Create a batch run. Nothing is sent until the batch is iterated.
+
+        Args:
+            items: Items to process (consumed lazily)
+            worker: Coroutine function called once per item
+            concurrency: Maximum number of items in flight
+            key: Optional function mapping an item to the key reported on its result
+        """
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1')
+        self._items = items
+        self._worker = worker
+        self._key = key or (lambda item: item)
+        self.concurrency = concurrency
+        self.results: List[BatchItemResult] = []
+        self.stats: Optional[BatchStats] = None
+        self._iterator: Optional[AsyncIterator[BatchItemResult]] = None
+
+    async def _run_one(self, item: T) -> BatchItemResult:
+        # A failing key function is a caller bug, not an item failure; let it propagate
+        key = self._key(item)
+        start = time.monotonic()
+        try:
+            value = await self._worker(item)
+            return BatchItemResult(key, value=value, elapsed=time.monotonic() - start)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            return BatchItemResult(key, error=error, elapsed=time.monotonic() - start)
+
+    def __aiter__(self) -> AsyncIterator[BatchItemResult]:
+        if self._iterator is not None:
+            raise RuntimeError('BatchRun can only be iterated once')
+        self._iterator = self._iterate()
+        return self._iterator
+
+    async def _iterate(self) -> AsyncIterator[BatchItemResult]:
+        start = time.monotonic()
+        source = iter(self._items)
+        done: asyncio.Queue = asyncio.Queue()
+        sentinel = object()
+        failures: List[Exception] = []
+
+        async def _drain():
+            # Workers share one iterator, so at most `concurrency` items are in flight
+            try:
+                for item in source:
+                    await done.put(await self._run_one(item))
+            except Exception as error:
+                # The items iterable or the key function raised
+                failures.append(error)
+            finally:
+                # Always signal completion, or the consumer would wait forever
+                done.put_nowait(sentinel)
+
+        workers = [asyncio.ensure_future(_drain()) for _ in range(self.concurrency)]
+        remaining = len(workers)
+        try:
+            while remaining:
+                result = await done.get()
+                if result is sentinel:
+                    remaining -= 1
+                    continue
+                self.results.append(result)
+                yield result
+            if failures:
+                raise failures[0]
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.stats = BatchStats(self.results, time.monotonic() - start)
+
+    async def aclose(self) -> None:
+        """Cancel any items still in flight and finalize `stats`."""
+        if self._iterator is not None:
+            await self._iterator.aclose()
+
+    async def __aenter__(self) -> 'BatchRun':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def collect(self) -> List[BatchItemResult]:
+        """
+        Run the whole batch and return every result in completion order.
+
+        Returns:
+            List of per-item results; aggregate timing is on `stats`
+        """
+        async for _ in self:
+            pass
+        return self.results
@@ -0,0 +1,90 @@
+"""
+Deadlines shared by every step of a multi-request operation
+"""
+
+import time
+from typing import Callable, Optional
+
+from .errors import AuthAgentTimeoutError
+
+
+class Deadline:
+    """
+    A point in time by which an operation must finish.
+
+    Create one per operation and pass it to each step. Every step caps its own
+    timeouts with `remaining()`, so the operation as a whole never runs longer
+    than the original budget, however many requests and retries it makes.
+
+    Example:
+        deadline = Deadline(60.0)
+        request_id = await sdk.extract_request_id_async(url, deadline=deadline)
+        await sdk.authenticate_async(request_id, url, deadline=deadline)
+    """
+
+    __slots__ = ('timeout', 'expires_at', '_clock')
+
+    def __init__(self, timeout: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Start the clock.
+
+        Args:
+            timeout: Seconds from now until the deadline
+            clock: Monotonic time source
+        """
+        self.timeout = timeout
+        self.expires_at = clock() + timeout
+        self._clock = clock
+
+    @classmethod
+    def within(cls, timeout: float, deadline: Optional['Deadline'] = None) -> 'Deadline':
+        """
+        Deadline for one attempt: `timeout` seconds from now, but no later than `deadline`.
+
+        Args:
+            timeout: Per-attempt timeout in seconds
+            deadline: Optional deadline of the enclosing operation
+
+        Returns:
+            New deadline
+        """
+        if deadline is None:
+            return cls(timeout)
+        return cls(deadline.cap(timeout), deadline._clock)
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self._clock() >= self.expires_at
+
+    def cap(self, timeout: float) -> float:
+        """
+        Shorten a timeout so it ends no later than the deadline.
+
+        Args:
+            timeout: Timeout in seconds
+
+        Returns:
+            The smaller of `timeout` and the time remaining
+        """
+        return min(timeout, self.remaining())
+
+    def check(self, operation: str = 'Operation') -> None:
+        """
+        Fail if the deadline has passed.
+
+        Args:
+            operation: Name used in the error message
+
+        Raises:
+            AuthAgentTimeoutError: If no time is left
+        """
+        if self.expired:
+            raise AuthAgentTimeoutError(f"{operation} exceeded its {self.timeout:g}s deadline")
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
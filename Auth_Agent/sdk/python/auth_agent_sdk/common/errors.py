@@ -46,4 +46,20 @@ class AuthAgentSecurityError(AuthAgentError):
         self.name = 'AuthAgentSecurityError'
 
 
+class AuthAgentRetryBudgetError(AuthAgentNetworkError):
+    """A retryable failure that was not retried because the retry budget is spent."""
+    
+    def __init__(self, message: str, original_error: Exception = None):
+        super().__init__(message, original_error)
+        self.code = 'RETRY_BUDGET_EXHAUSTED'
+        self.name = 'AuthAgentRetryBudgetError'
+
 
+class AuthAgentCircuitOpenError(AuthAgentNetworkError):
+    """A request was not sent because the auth server's circuit breaker is open."""
+    
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.code = 'CIRCUIT_OPEN'
+        self.name = 'AuthAgentCircuitOpenError'
+        self.retry_after = retry_after
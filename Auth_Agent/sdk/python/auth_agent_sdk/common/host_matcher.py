@@ -0,0 +1,126 @@
+"""
+Allowed-host matching for SSRF protection
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+from .errors import AuthAgentValidationError
+
+
+class _Node:
+    __slots__ = ('children', 'exact', 'subdomains')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.exact = False
+        self.subdomains = False
+
+
+class HostMatcher:
+    """
+    Allowed hosts compiled into a trie of reversed hostname labels.
+
+    A lookup walks one trie node per label of the hostname, so its cost does
+    not depend on the size of the list. Entries are either plain hostnames
+    (`example.com`) or wildcards (`*.example.com`, subdomains only). Plain
+    entries also allow their subdomains unless `include_subdomains` is False.
+
+    The list can be replaced at any time with `update()`; every SDK or client
+    holding the matcher sees the new list on its next request.
+
+    Example:
+        matcher = HostMatcher(['auth-agent.com', '*.partner.example'])
+        sdk = AuthAgentSDK(agent_id, agent_secret, model, allowed_hosts=matcher)
+        client = AuthAgentClient(client_id, redirect_uri, allowed_hosts=matcher)
+        matcher.update(load_partner_domains())
+    """
+
+    def __init__(self, hosts: Optional[Iterable[str]] = None, include_subdomains: bool = True):
+        """
+        Initialize the matcher.
+
+        Args:
+            hosts: Hostnames or `*.` wildcard patterns
+            include_subdomains: Whether plain entries also allow their subdomains
+
+        Raises:
+            AuthAgentValidationError: If an entry is not a valid host pattern
+        """
+        self.include_subdomains = include_subdomains
+        self.version = 0
+        self._size = 0
+        self._root = _Node()
+        self._lock = threading.Lock()
+        if hosts:
+            self.update(hosts)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, hostname: str) -> bool:
+        return self.matches(hostname)
+
+    def update(self, hosts: Iterable[str]) -> None:
+        """
+        Replace the allowed hosts.
+
+        The new trie is built aside and swapped in, so concurrent lookups see
+        either the old or the new list, never a partial one.
+
+        Args:
+            hosts: Hostnames or `*.` wildcard patterns
+
+        Raises:
+            AuthAgentValidationError: If an entry is not a valid host pattern
+        """
+        root = _Node()
+        size = 0
+        for pattern in hosts:
+            self._insert(root, pattern)
+            size += 1
+        with self._lock:
+            self._root = root
+            self._size = size
+            self.version += 1
+
+    def matches(self, hostname: str) -> bool:
+        """
+        Check whether a hostname is allowed.
+
+        Args:
+            hostname: Hostname to check
+
+        Returns:
+            True if the hostname matches an entry
+        """
+        labels = hostname.lower().rstrip('.').split('.')
+        node = self._root
+        remaining = len(labels)
+        for label in reversed(labels):
+            node = node.children.get(label)
+            if node is None:
+                return False
+            remaining -= 1
+            if remaining and node.subdomains:
+                return True
+        return node.exact
+
+    def _insert(self, root: _Node, pattern: str) -> None:
+        host = pattern.strip().lower().rstrip('.')
+        wildcard = host.startswith('*.')
+        if wildcard:
+            host = host[2:]
+        labels = host.split('.')
+        if not host or any(not label or '*' in label for label in labels):
+            raise AuthAgentValidationError(f"Invalid allowed host pattern: {pattern}")
+
+        node = root
+        for label in reversed(labels):
+            node = node.children.setdefault(label, _Node())
+        if wildcard:
+            node.subdomains = True
+        else:
+            node.exact = True
+            if self.include_subdomains:
+                node.subdomains = True
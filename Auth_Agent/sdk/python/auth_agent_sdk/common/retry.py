@@ -2,14 +2,413 @@
 Retry logic with exponential backoff
 """
 
+import copy
+import math
+import random
+import threading
 import time
 import asyncio
-from typing import Callable, TypeVar, Optional, List
-from .errors import AuthAgentNetworkError, AuthAgentTimeoutError
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Callable, Deque, Dict, TypeVar, Optional, List
+from urllib.parse import urlsplit
+from .deadline import Deadline
+from .errors import (
+    AuthAgentNetworkError,
+    AuthAgentTimeoutError,
+    AuthAgentRetryBudgetError,
+    AuthAgentCircuitOpenError,
+)
+
+try:
+    from aiohttp import ClientConnectionError
+    _CONNECTION_ERRORS = (OSError, ClientConnectionError)
+except ImportError:
+    _CONNECTION_ERRORS = (OSError,)
 
 T = TypeVar('T')
 
 
+class RetryBudget:
+    """
+    Cap on retries as a fraction of successful requests.
+
+    Over a sliding window of `window` seconds, retries are allowed while
+
+        retries < min_retries_per_second * window + ratio * successes
+
+    so a healthy client may retry a small share of its traffic, and a client
+    whose requests mostly fail stops retrying almost entirely instead of
+    multiplying load on a struggling server. The window is kept as `buckets`
+    counters, so recording and checking are constant time.
+
+    One budget is shared by every call made with the same RetryOptions; give
+    each host its own RetryOptions (see HostSettings) for per-host budgets.
+    Thread-safe.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries_per_second: float = 1.0,
+        window: float = 10.0,
+        buckets: int = 10,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio: Retries allowed per successful request in the window
+            min_retries_per_second: Retries always allowed, so low-traffic clients can still retry
+            window: Length of the sliding window in seconds
+            buckets: Number of counters the window is split into
+            clock: Monotonic time source
+        """
+        if ratio < 0 or min_retries_per_second < 0:
+            raise ValueError('ratio and min_retries_per_second must not be negative')
+        if window <= 0 or buckets < 1:
+            raise ValueError('window must be positive and buckets at least 1')
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window = window
+        self.rejected = 0
+        self._reserve = min_retries_per_second * window
+        self._bucket_width = window / buckets
+        self._epochs = [-1] * buckets
+        self._successes = [0] * buckets
+        self._retries = [0] * buckets
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def record_success(self) -> None:
+        """Record a successful request."""
+        with self._lock:
+            index = self._bucket(self._clock())
+            self._successes[index] += 1
+
+    def try_acquire(self) -> bool:
+        """
+        Spend one retry if the budget allows it.
+
+        Returns:
+            True if the caller may retry; False if it should fail instead
+        """
+        with self._lock:
+            index = self._bucket(self._clock())
+            if sum(self._retries) + 1 > self._reserve + self.ratio * sum(self._successes):
+                self.rejected += 1
+                return False
+            self._retries[index] += 1
+            return True
+
+    @property
+    def available(self) -> float:
+        """Retries currently available."""
+        with self._lock:
+            self._bucket(self._clock())
+            return max(0.0, self._reserve + self.ratio * sum(self._successes) - sum(self._retries))
+
+    def _bucket(self, now: float) -> int:
+        # Reset every bucket that belongs to an epoch older than the window
+        epoch = math.floor(now / self._bucket_width)
+        count = len(self._epochs)
+        index = epoch % count
+        if self._epochs[index] != epoch:
+            for offset in range(count):
+                slot = (epoch - offset) % count
+                if self._epochs[slot] != epoch - offset:
+                    self._epochs[slot] = epoch - offset
+                    self._successes[slot] = 0
+                    self._retries[slot] = 0
+        return index
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+StateChangeHook = Callable[[str, str, str], None]
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one auth-server origin.
+
+    While closed, calls go through and their outcomes are recorded. The
+    breaker opens after `failure_threshold` consecutive failures or, when
+    `failure_rate` is set, once that share of the last `window_size` calls
+    failed (with at least `min_calls` recorded). While open, calls are
+    rejected at once with AuthAgentCircuitOpenError. After `reset_timeout`
+    seconds the breaker goes half-open and lets a single probe through: a
+    success closes it, a failure opens it again.
+
+    Connection failures, timeouts and retryable status codes (5xx, 429)
+    count as failures; any other answer shows the server is up.
+
+    Example:
+        breakers = CircuitBreakerRegistry(failure_threshold=5, reset_timeout=30.0)
+        sdk = AuthAgentSDK(agent_id, agent_secret, model, circuit_breakers=breakers)
+    """
+
+    def __init__(
+        self,
+        name: str = '',
+        failure_threshold: int = 5,
+        failure_rate: Optional[float] = None,
+        window_size: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+        on_state_change: Optional[StateChangeHook] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the breaker in the closed state.
+
+        Args:
+            name: Identifies the breaker in errors and callbacks (usually the origin)
+            failure_threshold: Consecutive failures that open the breaker (0 to disable)
+            failure_rate: Optional failure share of recent calls that opens the breaker
+            window_size: Number of recent calls the failure rate is measured over
+            min_calls: Calls needed in the window before the rate is applied
+            reset_timeout: Seconds the breaker stays open before allowing a probe
+            on_state_change: Optional callback receiving (name, old_state, new_state)
+            clock: Monotonic time source
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.on_state_change = on_state_change
+        self.state = CLOSED
+        self.rejected = 0
+        self._clock = clock
+        self._consecutive_failures = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._window_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """
+        Check that a call may be sent; call record_success() or record_failure() after it.
+
+        Raises:
+            AuthAgentCircuitOpenError: If the breaker is open, or half-open with a probe in flight
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = self._clock()
+            if self.state == OPEN and now - self._opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected += 1
+            retry_after = max(0.0, self._opened_at + self.reset_timeout - now)
+        raise AuthAgentCircuitOpenError(
+            f"Circuit open for {self.name or 'auth server'}; not sending request", retry_after
+        )
+
+    def record_success(self) -> None:
+        """Record a call that reached a healthy server."""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._record(False)
+            if self.state != CLOSED:
+                self._probe_in_flight = False
+                self._outcomes.clear()
+                self._window_failures = 0
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a call that failed because the server was unreachable or unhealthy."""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._record(True)
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                self._open()
+            elif self.state == CLOSED and self._should_open():
+                self._open()
+
+    def release(self) -> None:
+        """Give back a half-open probe slot when the call was abandoned (e.g. cancelled)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _record(self, failed: bool) -> None:
+        outcomes = self._outcomes
+        if len(outcomes) == outcomes.maxlen and outcomes[0]:
+            self._window_failures -= 1
+        outcomes.append(failed)
+        if failed:
+            self._window_failures += 1
+
+    def _should_open(self) -> bool:
+        if self.failure_threshold and self._consecutive_failures >= self.failure_threshold:
+            return True
+        if self.failure_rate is not None and len(self._outcomes) >= self.min_calls:
+            return self._window_failures / len(self._outcomes) >= self.failure_rate
+        return False
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        old_state, self.state = self.state, state
+        if self.on_state_change is not None and old_state != state:
+            self.on_state_change(self.name, old_state, state)
+
+    def __repr__(self) -> str:
+        return f"CircuitBreaker(name={self.name!r}, state={self.state!r})"
+
+
+class CircuitBreakerRegistry:
+    """
+    Circuit breakers keyed by origin (scheme://host:port).
+
+    Every breaker is created with the keyword arguments given here. Share one
+    registry between clients and SDK instances so they agree on which auth
+    servers are down.
+    """
+
+    def __init__(self, **breaker_options):
+        """
+        Initialize the registry.
+
+        Args:
+            **breaker_options: Keyword arguments for each CircuitBreaker
+                (failure_threshold, failure_rate, reset_timeout, on_state_change, ...)
+        """
+        self.breaker_options = breaker_options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> CircuitBreaker:
+        """
+        Get the breaker for a URL's origin, creating it on first use.
+
+        Args:
+            url: Any URL on the origin
+
+        Returns:
+            CircuitBreaker for the origin
+        """
+        parts = urlsplit(url)
+        origin = f'{parts.scheme}://{parts.netloc}'.lower()
+        breaker = self._breakers.get(origin)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(origin)
+                if breaker is None:
+                    breaker = CircuitBreaker(origin, **self.breaker_options)
+                    self._breakers[origin] = breaker
+        return breaker
+
+    def __len__(self) -> int:
+        return len(self._breakers)
+
+
+class BackoffStrategy:
+    """
+    Base class for retry delays.
+
+    Strategies read initial_delay, max_delay and backoff_multiplier from the
+    RetryOptions they are used with, so one instance can be shared.
+    """
+
+    def delay(self, attempt: int, previous: float, options: 'RetryOptions') -> float:
+        """
+        Delay before the next attempt.
+
+        Args:
+            attempt: Number of failed attempts so far, minus one (0 after the first failure)
+            previous: Delay used before the previous retry (initial_delay before the first)
+            options: Retry options in effect
+
+        Returns:
+            Delay in seconds, at most options.max_delay
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _exponential(attempt: int, options: 'RetryOptions') -> float:
+        try:
+            grown = options.initial_delay * options.backoff_multiplier ** attempt
+        except OverflowError:
+            grown = options.max_delay
+        return min(grown, options.max_delay)
+
+
+class ExponentialBackoff(BackoffStrategy):
+    """Deterministic exponential delay: initial_delay * backoff_multiplier ** attempt."""
+
+    def delay(self, attempt: int, previous: float, options: 'RetryOptions') -> float:
+        return self._exponential(attempt, options)
+
+
+class FullJitterBackoff(BackoffStrategy):
+    """Uniformly random delay between 0 and the exponential delay."""
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt: int, previous: float, options: 'RetryOptions') -> float:
+        return self._rng.uniform(0, self._exponential(attempt, options))
+
+
+class EqualJitterBackoff(BackoffStrategy):
+    """Half the exponential delay, plus a random amount up to the other half."""
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt: int, previous: float, options: 'RetryOptions') -> float:
+        half = self._exponential(attempt, options) / 2
+        return half + self._rng.uniform(0, half)
+
+
+class DecorrelatedJitterBackoff(BackoffStrategy):
+    """Random delay between initial_delay and three times the previous delay."""
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt: int, previous: float, options: 'RetryOptions') -> float:
+        upper = max(options.initial_delay, previous * 3)
+        return min(options.max_delay, self._rng.uniform(options.initial_delay, upper))
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+        now: Current Unix time (default: time.time())
+
+    Returns:
+        Seconds to wait (never negative), or None if the header is absent or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None or when.tzinfo is None:
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
 class RetryOptions:
     """Options for retry logic."""
     
@@ -21,6 +420,8 @@ class RetryOptions:
         backoff_multiplier: float = 2.0,
         retryable_status_codes: Optional[List[int]] = None,
         timeout: float = 30.0,
+        retry_budget: Optional[RetryBudget] = None,
+        backoff: Optional[BackoffStrategy] = None,
     ):
         self.max_retries = max_retries
         self.initial_delay = initial_delay
@@ -28,6 +429,24 @@ class RetryOptions:
         self.backoff_multiplier = backoff_multiplier
         self.retryable_status_codes = retryable_status_codes or [408, 429, 500, 502, 503, 504]
         self.timeout = timeout
+        # Shared by every call made with these options; None retries without a budget
+        self.retry_budget = retry_budget
+        # Jittered strategies keep clients that failed together from retrying together
+        self.backoff = backoff or ExponentialBackoff()
+
+    def with_retry_budget(self, retry_budget: Optional[RetryBudget]) -> 'RetryOptions':
+        """
+        Return a copy of these options that spends retries from retry_budget.
+
+        Args:
+            retry_budget: Budget shared by every call made with the copy
+
+        Returns:
+            New RetryOptions; these options are left unchanged
+        """
+        options = copy.copy(self)
+        options.retry_budget = retry_budget
+        return options
 
 
 def is_retryable_error(error: Exception, retryable_status_codes: List[int]) -> bool:
@@ -47,41 +466,103 @@ def is_retryable_error(error: Exception, retryable_status_codes: List[int]) -> b
     return False
 
 
+def _next_delay(opts: RetryOptions, attempt: int, previous: float, error: Exception) -> float:
+    # A server-provided Retry-After wins over the computed delay, within max_delay
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is not None:
+        return min(max(0.0, retry_after), opts.max_delay)
+    backoff = getattr(opts, 'backoff', None) or ExponentialBackoff()
+    return min(backoff.delay(attempt, previous, opts), opts.max_delay)
+
+
+def _record_success(opts: RetryOptions, breaker: Optional[CircuitBreaker] = None) -> None:
+    budget = getattr(opts, 'retry_budget', None)
+    if budget is not None:
+        budget.record_success()
+    if breaker is not None:
+        breaker.record_success()
+
+
+def _record_outcome(opts: RetryOptions, breaker: Optional[CircuitBreaker], error: Exception) -> None:
+    if breaker is None:
+        return
+    if isinstance(error, _CONNECTION_ERRORS) or is_retryable_error(error, opts.retryable_status_codes):
+        breaker.record_failure()
+    else:
+        # The server answered; a client error says nothing about its health
+        breaker.record_success()
+
+
+def _spend_retry(opts: RetryOptions, error: Exception) -> None:
+    budget = getattr(opts, 'retry_budget', None)
+    if budget is not None and not budget.try_acquire():
+        raise AuthAgentRetryBudgetError(f"Retry budget exhausted, not retrying: {error}", error)
+
+
 def retry_with_backoff(
     fn: Callable[[], T],
-    options: Optional[RetryOptions] = None
+    options: Optional[RetryOptions] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    deadline: Optional[Deadline] = None
 ) -> T:
     """
     Retry a function with exponential backoff (sync version).
     
+    A blocking call cannot be interrupted from outside, so `fn` should bound
+    each attempt itself, e.g. by sending through SyncTransport.request() with
+    Deadline.within(options.timeout, deadline).
+    
     Args:
         fn: Function to retry
         options: Retry options
+        breaker: Optional circuit breaker consulted before every attempt
+        deadline: Optional deadline; no attempt starts, and no retry is
+            scheduled, that could not begin before it
         
     Returns:
         Result of the function
         
     Raises:
         AuthAgentNetworkError: If all retries fail
-        AuthAgentTimeoutError: If request times out
+        AuthAgentRetryBudgetError: If a retry was needed but the retry budget is spent
+        AuthAgentCircuitOpenError: If the circuit breaker is open
+        AuthAgentTimeoutError: If request times out or the deadline passes
     """
     opts = options or RetryOptions()
     last_error = None
     delay = opts.initial_delay
     
     for attempt in range(opts.max_retries + 1):
+        timeout = opts.timeout
+        if deadline is not None:
+            deadline.check('Request')
+            timeout = deadline.cap(timeout)
+        if breaker is not None:
+            breaker.before_call()
         try:
             # Create timeout
             start_time = time.time()
             result = fn()
             
-            # Check if we exceeded timeout (for sync functions, this is approximate)
+            # Backstop for callables that do not enforce their own timeout; the
+            # SDK's requests go through SyncTransport.request, which does
             if time.time() - start_time > opts.timeout:
                 raise AuthAgentTimeoutError(f"Request timeout after {opts.timeout}s")
             
+            _record_success(opts, breaker)
             return result
         except Exception as error:
+            if (
+                isinstance(error, (AuthAgentTimeoutError, TimeoutError))
+                and timeout < opts.timeout
+                and deadline.expired
+            ):
+                # Cut short by the deadline, which says nothing about the server
+                if breaker is not None:
+                    breaker.release()
+                raise AuthAgentTimeoutError(f"Request did not finish before its {deadline.timeout:g}s deadline")
             last_error = error
+            _record_outcome(opts, breaker, error)
             
             # Don't retry on last attempt
             if attempt >= opts.max_retries:
@@ -92,22 +573,30 @@ def retry_with_backoff(
                 raise error
             
             # Wait before retrying with exponential backoff
-            time.sleep(min(delay, opts.max_delay))
-            delay *= opts.backoff_multiplier
+            delay = _next_delay(opts, attempt, delay, error)
+            
+            # Don't retry if the next attempt could not start before the deadline
+            if deadline is not None and delay >= deadline.remaining():
+                break
+            
+            _spend_retry(opts, error)
+            time.sleep(delay)
     
     # If we get here, all retries failed
     if isinstance(last_error, AuthAgentTimeoutError):
         raise last_error
     
     raise AuthAgentNetworkError(
-        f"Request failed after {opts.max_retries + 1} attempts: {str(last_error)}",
+        f"Request failed after {attempt + 1} attempts: {str(last_error)}",
         last_error
     )
 
 
 async def retry_with_backoff_async(
     fn: Callable[[], T],
-    options: Optional[RetryOptions] = None
+    options: Optional[RetryOptions] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    deadline: Optional[Deadline] = None
 ) -> T:
     """
     Retry an async function with exponential backoff (async version).
@@ -115,27 +604,52 @@ async def retry_with_backoff_async(
     Args:
         fn: Async function (coroutine) to retry
         options: Retry options
+        breaker: Optional circuit breaker consulted before every attempt
+        deadline: Optional deadline; each attempt's timeout is cut to the time
+            remaining, and retries that could not start before it are skipped
         
     Returns:
         Result of the function
         
     Raises:
         AuthAgentNetworkError: If all retries fail
-        AuthAgentTimeoutError: If request times out
+        AuthAgentRetryBudgetError: If a retry was needed but the retry budget is spent
+        AuthAgentCircuitOpenError: If the circuit breaker is open
+        AuthAgentTimeoutError: If request times out or the deadline passes
     """
     opts = options or RetryOptions()
     last_error = None
     delay = opts.initial_delay
     
     for attempt in range(opts.max_retries + 1):
+        timeout = opts.timeout
+        if deadline is not None:
+            deadline.check('Request')
+            timeout = deadline.cap(timeout)
+        if breaker is not None:
+            breaker.before_call()
         try:
             # Create timeout - fn() returns a coroutine, await it with timeout
-            result = await asyncio.wait_for(fn(), timeout=opts.timeout)
+            result = await asyncio.wait_for(fn(), timeout=timeout)
+            _record_success(opts, breaker)
             return result
         except asyncio.TimeoutError:
+            if timeout < opts.timeout:
+                # Cut short by the deadline, which says nothing about the server
+                if breaker is not None:
+                    breaker.release()
+                raise AuthAgentTimeoutError(f"Request did not finish before its {deadline.timeout:g}s deadline")
+            if breaker is not None:
+                breaker.record_failure()
             raise AuthAgentTimeoutError(f"Request timeout after {opts.timeout}s")
+        except asyncio.CancelledError:
+            if breaker is not None:
+                # Release a half-open probe slot without judging the server
+                breaker.release()
+            raise
         except Exception as error:
             last_error = error
+            _record_outcome(opts, breaker, error)
             
             # Don't retry on last attempt
             if attempt >= opts.max_retries:
@@ -146,15 +660,21 @@ async def retry_with_backoff_async(
                 raise error
             
             # Wait before retrying with exponential backoff
-            await asyncio.sleep(min(delay, opts.max_delay))
-            delay *= opts.backoff_multiplier
+            delay = _next_delay(opts, attempt, delay, error)
+            
+            # Don't retry if the next attempt could not start before the deadline
+            if deadline is not None and delay >= deadline.remaining():
+                break
+            
+            _spend_retry(opts, error)
+            await asyncio.sleep(delay)
     
     # If we get here, all retries failed
     if isinstance(last_error, AuthAgentTimeoutError):
         raise last_error
     
     raise AuthAgentNetworkError(
-        f"Request failed after {opts.max_retries + 1} attempts: {str(last_error)}",
+        f"Request failed after {attempt + 1} attempts: {str(last_error)}",
         last_error
     )
 
@@ -0,0 +1,62 @@
+"""
+Single-flight deduplication of concurrent identical requests
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """
+    Share one in-flight call among concurrent callers with the same key.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs await the same task and receive the same result or
+    exception. Each caller awaits through `asyncio.shield`, so cancelling one
+    waiter never cancels the shared call for the others. The key is forgotten
+    as soon as the call finishes, so later callers start a fresh request.
+
+    Example:
+        flights = SingleFlight()
+        result = await flights.do(('introspect', token), lambda: fetch(token))
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, 'asyncio.Task[Any]'] = {}
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `call`, or join an identical call already in flight.
+
+        Args:
+            key: Identity of the request; include everything that affects the result
+            call: Zero-argument coroutine function performing the request
+
+        Returns:
+            Result of the shared call
+        """
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: 'asyncio.Task[Any]') -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,385 @@
+"""
+Pooled HTTP transport shared across SDK calls
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, Iterator, Mapping, Optional
+
+from .deadline import Deadline
+from .errors import AuthAgentTimeoutError
+
+try:
+    import aiohttp
+    ASYNC_AVAILABLE = True
+except ImportError:
+    ASYNC_AVAILABLE = False
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.exceptions import HTTPError as URLLib3Error
+    from urllib3.util import Timeout
+    SYNC_AVAILABLE = True
+except ImportError:
+    SYNC_AVAILABLE = False
+
+# Bytes read per chunk when a sync response body is read under a deadline
+BODY_CHUNK_SIZE = 16 * 1024
+
+
+class PoolOptions:
+    """
+    Options for connection pooling.
+
+    Args:
+        limit: Total simultaneous connections (async transport)
+        limit_per_host: Connections kept per host (both transports)
+        keepalive_timeout: Seconds an idle connection is kept open (async transport)
+        dns_cache_ttl: Seconds resolved addresses are cached (async transport)
+        max_hosts: Number of per-host pools kept alive (sync transport)
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        max_hosts: int = 10,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.max_hosts = max_hosts
+
+
+class AsyncTransport:
+    """
+    Long-lived aiohttp session backed by a keep-alive connection pool.
+
+    The session is created lazily on first use because aiohttp binds it to the
+    running event loop. If the transport is later used from a different loop, a
+    fresh session is created for that loop and the previous one is closed.
+
+    Example:
+        async with AsyncTransport() as transport:
+            session = await transport.get_session()
+            async with session.get(url) as response:
+                ...
+    """
+
+    def __init__(self, pool_options: Optional[PoolOptions] = None):
+        """
+        Initialize the transport.
+
+        Args:
+            pool_options: Optional connection pool configuration
+        """
+        self.pool_options = pool_options or PoolOptions()
+        self._session: Optional['aiohttp.ClientSession'] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def closed(self) -> bool:
+        """Whether there is currently no open session."""
+        return self._session is None or self._session.closed
+
+    async def get_session(self) -> 'aiohttp.ClientSession':
+        """
+        Get the pooled session, creating it on first use.
+
+        Returns:
+            aiohttp.ClientSession bound to the running event loop
+
+        Raises:
+            RuntimeError: If aiohttp is not installed
+        """
+        if not ASYNC_AVAILABLE:
+            raise RuntimeError("aiohttp is required for async methods. Install with: pip install aiohttp")
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            stale, stale_loop = self._session, self._loop
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_options.limit,
+                limit_per_host=self.pool_options.limit_per_host,
+                keepalive_timeout=self.pool_options.keepalive_timeout,
+                ttl_dns_cache=self.pool_options.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+            if stale is not None and not stale.closed:
+                await _close_stale_session(stale, stale_loop)
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the pooled session and all keep-alive connections."""
+        session, loop = self._session, self._loop
+        self._session = None
+        self._loop = None
+        if session is None or session.closed:
+            return
+        if loop is asyncio.get_running_loop():
+            await session.close()
+        else:
+            await _close_stale_session(session, loop)
+
+    async def __aenter__(self) -> 'AsyncTransport':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+
+async def _close_stale_session(
+    session: 'aiohttp.ClientSession',
+    loop: Optional[asyncio.AbstractEventLoop]
+) -> None:
+    # A loop still running in another thread must close its own session;
+    # otherwise (e.g. after asyncio.run() returned) close it from here
+    if loop is not None and loop.is_running():
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+        return
+    try:
+        await session.close()
+    except RuntimeError:
+        # The old loop is closed and could not schedule the connection teardown
+        pass
+
+
+class SyncTransport:
+    """
+    Persistent requests transport backed by a shared urllib3 connection pool.
+
+    requests.Session is not safe to share between threads, so each thread gets
+    its own lightweight Session. All of them mount the same HTTPAdapter, whose
+    urllib3 pool manager is thread-safe, so keep-alive connections are shared
+    across threads.
+
+    Example:
+        with SyncTransport() as transport:
+            response = transport.get_session().get(url, timeout=10)
+    """
+
+    def __init__(self, pool_options: Optional[PoolOptions] = None):
+        """
+        Initialize the transport.
+
+        Args:
+            pool_options: Optional connection pool configuration
+        """
+        self.pool_options = pool_options or PoolOptions()
+        self._adapter: Optional['HTTPAdapter'] = None
+        self._generation = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def closed(self) -> bool:
+        """Whether there is currently no open connection pool."""
+        return self._adapter is None
+
+    def _get_adapter(self) -> 'HTTPAdapter':
+        with self._lock:
+            if self._adapter is None:
+                self._adapter = HTTPAdapter(
+                    pool_connections=self.pool_options.max_hosts,
+                    pool_maxsize=self.pool_options.limit_per_host,
+                    max_retries=0,
+                )
+                self._generation += 1
+            return self._adapter
+
+    def get_session(self) -> 'requests.Session':
+        """
+        Get the calling thread's session, creating it on first use.
+
+        Returns:
+            requests.Session mounted on the shared connection pool
+
+        Raises:
+            RuntimeError: If requests is not installed
+        """
+        if not SYNC_AVAILABLE:
+            raise RuntimeError("requests is required for sync methods. Install with: pip install requests")
+
+        adapter = self._get_adapter()
+        session = getattr(self._local, 'session', None)
+        if session is None or getattr(self._local, 'generation', None) != self._generation:
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+            self._local.generation = self._generation
+        return session
+
+    def stream(
+        self,
+        method: str,
+        url: str,
+        deadline: Deadline,
+        **kwargs: Any
+    ) -> 'requests.Response':
+        """
+        Send a request and return once the headers arrive, leaving the body unread.
+
+        Connecting and waiting for the headers share one urllib3 total timeout
+        set to the time remaining. Read the body with iter_body() under the
+        same deadline, and close the response when done.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            deadline: Deadline for the whole request, body included
+            **kwargs: Passed to requests.Session.request (json, params, headers, ...)
+
+        Returns:
+            The streamed response
+
+        Raises:
+            AuthAgentTimeoutError: If the deadline passes before the headers arrive
+            RuntimeError: If requests is not installed
+        """
+        session = self.get_session()
+        deadline.check('Request')
+        try:
+            return session.request(
+                method, url, timeout=Timeout(total=deadline.remaining()), stream=True, **kwargs
+            )
+        except requests.Timeout:
+            raise AuthAgentTimeoutError(f"Request did not finish before its {deadline.timeout:g}s deadline")
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        deadline: Deadline,
+        **kwargs: Any
+    ) -> 'BufferedResponse':
+        """
+        Send a request that is abandoned as soon as `deadline` passes.
+
+        A urllib3 total timeout only bounds each socket operation, so the body
+        is read with iter_body(), which cuts the socket timeout to whatever is
+        left before each read. A server that stalls or trickles bytes cannot
+        hold the calling thread past the deadline. An abandoned response's
+        connection is closed rather than returned to the pool. No extra
+        threads are involved.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            deadline: Deadline for the whole request, body included
+            **kwargs: Passed to requests.Session.request (json, params, headers, ...)
+
+        Returns:
+            BufferedResponse holding the status, headers and body
+
+        Raises:
+            AuthAgentTimeoutError: If the deadline passes before the response is read
+            RuntimeError: If requests is not installed
+        """
+        response = self.stream(method, url, deadline, **kwargs)
+        with response:
+            body = b''.join(iter_body(response, deadline))
+        return BufferedResponse(response.status_code, response.reason, response.headers, body)
+
+    def close(self) -> None:
+        """Close the shared connection pool and all keep-alive connections."""
+        with self._lock:
+            adapter = self._adapter
+            self._adapter = None
+        if adapter is not None:
+            adapter.close()
+
+    def __enter__(self) -> 'SyncTransport':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class BufferedResponse:
+    """Status, headers and body of a response read by SyncTransport.request()."""
+
+    __slots__ = ('status_code', 'reason', 'headers', 'content')
+
+    def __init__(self, status_code: int, reason: str, headers: Mapping[str, str], content: bytes):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        """Whether the status code is below 400."""
+        return self.status_code < 400
+
+    def json(self) -> Any:
+        """
+        Decode the body as JSON.
+
+        Raises:
+            ValueError: If the body is not valid JSON
+        """
+        return json.loads(self.content)
+
+    def __repr__(self) -> str:
+        return f"<BufferedResponse [{self.status_code}]>"
+
+
+def iter_body(
+    response: 'requests.Response',
+    deadline: Deadline,
+    chunk_size: int = BODY_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Read a streamed requests response body without running past a deadline.
+
+    Each read returns whatever a single socket receive delivers, with the
+    socket timeout first cut to the time remaining, so a server trickling
+    bytes is noticed between receives. When the deadline passes the response
+    is closed, which drops its connection, and AuthAgentTimeoutError is raised.
+
+    Args:
+        response: Response sent with stream=True
+        deadline: Deadline for the whole request
+        chunk_size: Bytes per read
+
+    Yields:
+        Body chunks
+    """
+    raw = response.raw
+    # read() loops until `chunk_size` bytes arrive; read1() (urllib3 2) returns after one receive
+    read1 = getattr(raw, 'read1', None)
+    try:
+        while True:
+            deadline.check('Request')
+            _cap_read_timeout(response, deadline)
+            try:
+                if read1 is not None:
+                    chunk = read1(chunk_size, decode_content=True)
+                else:
+                    chunk = raw.read(chunk_size, decode_content=True)
+            except (URLLib3Error, OSError) as error:
+                if deadline.expired:
+                    raise AuthAgentTimeoutError(f"Request did not finish before its {deadline.timeout:g}s deadline")
+                raise requests.ConnectionError(error)
+            if not chunk:
+                return
+            yield chunk
+    except BaseException:
+        response.close()
+        raise
+
+
+def _cap_read_timeout(response: 'requests.Response', deadline: Deadline) -> None:
+    # Best effort: the socket is only reachable while urllib3 still holds the connection
+    connection = getattr(response.raw, 'connection', None)
+    sock = getattr(connection, 'sock', None)
+    if sock is not None:
+        # A zero timeout would make the socket non-blocking
+        sock.settimeout(max(deadline.remaining(), 0.001))
@@ -2,118 +2,232 @@
 URL validation and SSRF protection utilities
 """
 
-from urllib.parse import urlparse
-from typing import Optional, List
+import ipaddress
+import re
+import socket
+from functools import lru_cache
+from urllib.parse import urlparse, ParseResult
+from typing import Optional, List, Sequence, Tuple, Type, Union
 from .errors import AuthAgentValidationError, AuthAgentSecurityError
+from .host_matcher import HostMatcher
 
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
 
-def validate_url(url: str, allowed_hosts: Optional[List[str]] = None) -> urlparse:
+# Address ranges that must never be reached from the SDK (SSRF protection)
+BLOCKED_NETWORKS: Tuple[IPNetwork, ...] = tuple(ipaddress.ip_network(network) for network in (
+    '0.0.0.0/8',        # "this network"
+    '10.0.0.0/8',       # private
+    '100.64.0.0/10',    # carrier-grade NAT
+    '127.0.0.0/8',      # loopback
+    '169.254.0.0/16',   # link-local (cloud metadata endpoints)
+    '172.16.0.0/12',    # private
+    '192.168.0.0/16',   # private
+    '::/128',           # unspecified
+    '::1/128',          # loopback
+    'fc00::/7',         # unique local
+    'fe80::/10',        # link-local
+))
+
+BLOCKED_HOSTNAMES = frozenset(('localhost',))
+BLOCKED_SUFFIXES = ('.localhost', '.local', '.internal')
+
+# Hostnames inet_aton may read as IPv4 shorthand (e.g. 2130706433, 0x7f.1)
+_NUMERIC_HOST_PATTERN = re.compile(r'^(0x[0-9a-f]+|[0-9]+)(\.(0x[0-9a-f]+|[0-9]+)){0,3}$')
+
+Verdict = Optional[Tuple[Type[Exception], str]]
+
+
+def _parse_ip(hostname: str) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+    try:
+        address = ipaddress.ip_address(hostname)
+    except ValueError:
+        if not _NUMERIC_HOST_PATTERN.match(hostname):
+            return None
+        try:
+            address = ipaddress.IPv4Address(socket.inet_aton(hostname))
+        except OSError:
+            return None
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped is not None:
+        return address.ipv4_mapped
+    return address
+
+
+class URLValidator:
+    """
+    URL validator compiled once from an SSRF policy.
+
+    Blocked ranges are checked with `ipaddress` networks, and the verdict for
+    each hostname is kept in a bounded LRU cache, so repeated validation of the
+    same host only costs a URL parse and a cache lookup.
+
+    Allowed hosts are matched with a HostMatcher. When a shared matcher is
+    reloaded, verdicts cached for the previous list are no longer used.
+
+    Example:
+        validator = URLValidator(allowed_hosts=['auth.auth-agent.com'])
+        parsed = validator.validate('https://auth.auth-agent.com/authorize')
+    """
+
+    def __init__(
+        self,
+        allowed_hosts: Optional[Union[Sequence[str], HostMatcher]] = None,
+        blocked_networks: Sequence[IPNetwork] = BLOCKED_NETWORKS,
+        cache_size: int = 1024
+    ):
+        """
+        Initialize the validator.
+
+        Args:
+            allowed_hosts: Optional whitelist of allowed hosts (subdomains included), or a
+                HostMatcher shared with other validators
+            blocked_networks: Address ranges to reject
+            cache_size: Number of hostname verdicts kept
+        """
+        if isinstance(allowed_hosts, HostMatcher):
+            self.host_matcher: Optional[HostMatcher] = allowed_hosts
+        else:
+            self.host_matcher = HostMatcher(allowed_hosts) if allowed_hosts else None
+        self.blocked_networks = tuple(blocked_networks)
+        self._check_host = lru_cache(maxsize=cache_size)(self._evaluate_host)
+
+    def validate(self, url: str) -> ParseResult:
+        """
+        Validate URL format and prevent SSRF attacks.
+
+        Args:
+            url: URL to validate
+
+        Returns:
+            Parsed URL object
+
+        Raises:
+            AuthAgentSecurityError: If URL is blocked for security reasons
+            AuthAgentValidationError: If URL format is invalid
+        """
+        try:
+            parsed = urlparse(url)
+            hostname = parsed.hostname
+        except Exception as e:
+            raise AuthAgentValidationError(f"Invalid URL format: {url}") from e
+
+        if not parsed.scheme and not parsed.netloc:
+            raise AuthAgentValidationError(f"Invalid URL format: {url}")
+
+        # Only allow http and https
+        if parsed.scheme not in ('http', 'https'):
+            raise AuthAgentSecurityError(
+                f"Invalid protocol: {parsed.scheme}. Only http and https are allowed."
+            )
+
+        if not hostname:
+            raise AuthAgentValidationError(f"Invalid URL format: {url}")
+
+        self.check_hostname(hostname)
+        return parsed
+
+    def check_hostname(self, hostname: str) -> None:
+        """
+        Check a bare hostname against the policy.
+
+        Args:
+            hostname: Lowercase hostname or IP literal
+
+        Raises:
+            AuthAgentSecurityError: If the hostname is blocked or not allowed
+        """
+        verdict = self._check_host(hostname, self.policy_version)
+        if verdict is not None:
+            error_type, message = verdict
+            raise error_type(message)
+
+    @property
+    def policy_version(self) -> int:
+        """Changes whenever the allowed hosts are reloaded."""
+        return self.host_matcher.version if self.host_matcher is not None else 0
+
+    def cache_info(self):
+        """Hit/miss statistics of the hostname verdict cache."""
+        return self._check_host.cache_info()
+
+    def clear_cache(self) -> None:
+        """Forget all cached hostname verdicts."""
+        self._check_host.cache_clear()
+
+    def _evaluate_host(self, hostname: str, policy_version: int) -> Verdict:
+        name = hostname.rstrip('.')
+
+        # Block localhost and internal domains (SSRF protection)
+        if name in BLOCKED_HOSTNAMES:
+            return AuthAgentSecurityError, (
+                f"SSRF protection: Blocked access to localhost/internal hostname: {hostname}"
+            )
+
+        address = _parse_ip(name)
+        if address is not None:
+            for network in self.blocked_networks:
+                if address.version == network.version and address in network:
+                    return AuthAgentSecurityError, (
+                        f"SSRF protection: Blocked access to private IP range: {hostname}"
+                    )
+        elif name.endswith(BLOCKED_SUFFIXES):
+            return AuthAgentSecurityError, (
+                f"SSRF protection: Blocked access to internal domain: {hostname}"
+            )
+
+        # If allowed_hosts is provided, check against whitelist
+        if self.host_matcher is not None and not self.host_matcher.matches(name):
+            return AuthAgentSecurityError, f"Hostname {hostname} is not in the allowed hosts list"
+
+        return None
+
+
+@lru_cache(maxsize=32)
+def _validator_for(allowed_hosts: Union[Tuple[str, ...], HostMatcher]) -> URLValidator:
+    return URLValidator(allowed_hosts)
+
+
+def validate_url(url: str, allowed_hosts: Optional[Union[List[str], HostMatcher]] = None) -> ParseResult:
     """
     Validate URL format and prevent SSRF attacks.
-    
+
+    Prefer holding a URLValidator on hot paths; this function looks up a shared
+    validator for the given allowed_hosts.
+
     Args:
         url: URL to validate
-        allowed_hosts: Optional whitelist of allowed hosts
-        
+        allowed_hosts: Optional whitelist of allowed hosts, or a HostMatcher
+
     Returns:
         Parsed URL object
-        
+
     Raises:
         AuthAgentSecurityError: If URL is blocked for security reasons
         AuthAgentValidationError: If URL format is invalid
     """
-    try:
-        parsed = urlparse(url)
-        
-        # Only allow http and https
-        if parsed.scheme not in ('http', 'https'):
-            raise AuthAgentSecurityError(
-                f"Invalid protocol: {parsed.scheme}. Only http and https are allowed."
-            )
-        
-        # Block private/internal IPs and localhost (SSRF protection)
-        hostname = parsed.hostname.lower() if parsed.hostname else ''
-        
-        # Check for localhost
-        if hostname in ('localhost', '127.0.0.1', '0.0.0.0', '::1', '[::1]'):
-            raise AuthAgentSecurityError(
-                f"SSRF protection: Blocked access to localhost/internal hostname: {hostname}"
-            )
-        
-        # Check for private IP ranges
-        if hostname:
-            parts = hostname.split('.')
-            if len(parts) == 4:
-                try:
-                    # IPv4 address
-                    octets = [int(p) for p in parts]
-                    
-                    # Check for private ranges
-                    # 192.168.0.0/16
-                    if octets[0] == 192 and octets[1] == 168:
-                        raise AuthAgentSecurityError(
-                            f"SSRF protection: Blocked access to private IP range: {hostname}"
-                        )
-                    # 10.0.0.0/8
-                    if octets[0] == 10:
-                        raise AuthAgentSecurityError(
-                            f"SSRF protection: Blocked access to private IP range: {hostname}"
-                        )
-                    # 172.16.0.0/12
-                    if octets[0] == 172 and 16 <= octets[1] <= 31:
-                        raise AuthAgentSecurityError(
-                            f"SSRF protection: Blocked access to private IP range: {hostname}"
-                        )
-                except ValueError:
-                    # Not an IP address, continue
-                    pass
-            
-            # Check for .local and .internal domains
-            if hostname.endswith('.local') or hostname.endswith('.internal'):
-                raise AuthAgentSecurityError(
-                    f"SSRF protection: Blocked access to internal domain: {hostname}"
-                )
-        
-        # If allowedHosts is provided, check against whitelist
-        if allowed_hosts and len(allowed_hosts) > 0:
-            is_allowed = False
-            for allowed in allowed_hosts:
-                allowed_lower = allowed.lower()
-                if hostname == allowed_lower or hostname.endswith('.' + allowed_lower):
-                    is_allowed = True
-                    break
-            
-            if not is_allowed:
-                raise AuthAgentSecurityError(
-                    f"Hostname {hostname} is not in the allowed hosts list"
-                )
-        
-        return parsed
-    except (AuthAgentSecurityError, AuthAgentValidationError):
-        raise
-    except Exception as e:
-        raise AuthAgentValidationError(f"Invalid URL format: {url}") from e
+    if not isinstance(allowed_hosts, HostMatcher):
+        allowed_hosts = tuple(allowed_hosts) if allowed_hosts else ()
+    return _validator_for(allowed_hosts).validate(url)
 
 
 def validate_redirect_uri(redirect_uri: str) -> None:
     """
     Validate redirect URI format.
-    
+
     Args:
         redirect_uri: Redirect URI to validate
-        
+
     Raises:
         AuthAgentValidationError: If redirect URI is invalid
     """
     try:
         parsed = urlparse(redirect_uri)
-        
+
         # Only allow http and https
         if parsed.scheme not in ('http', 'https'):
             raise AuthAgentValidationError(
                 f"Redirect URI must use http or https protocol, got: {parsed.scheme}"
             )
-        
+
         # In production, should require https (except localhost)
         hostname = parsed.hostname.lower() if parsed.hostname else ''
         if parsed.scheme == 'http' and 'localhost' not in hostname and '127.0.0.1' not in hostname:
@@ -124,6 +238,3 @@ def validate_redirect_uri(redirect_uri: str) -> None:
         raise
     except Exception as e:
         raise AuthAgentValidationError(f"Invalid redirect URI format: {redirect_uri}") from e
-
-
-
@@ -0,0 +1,27 @@
+"""
+Testing utilities for Auth Agent SDK
+"""
+
+from .server import (
+    StandInServer,
+    StandInConfig,
+    ServerStats,
+    encode_jwt,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+    DEFAULT_JWT_SECRET,
+)
+
+__all__ = [
+    'StandInServer',
+    'StandInConfig',
+    'ServerStats',
+    'encode_jwt',
+    'DEFAULT_CLIENT_ID',
+    'DEFAULT_CLIENT_SECRET',
+    'DEFAULT_AGENT_ID',
+    'DEFAULT_AGENT_SECRET',
+    'DEFAULT_JWT_SECRET',
+]
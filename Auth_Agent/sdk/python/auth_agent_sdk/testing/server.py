@@ -0,0 +1,541 @@
+"""
+In-process stand-in for the Auth Agent server
+
+Implements the endpoints the SDK talks to with in-memory state, so flows can be
+tested and benchmarked without reaching auth.auth-agent.com. Responses follow
+the production worker (Auth_Agent/workers/src/index.ts); latency, injected
+errors and the delay before a request completes are configurable.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import random
+import secrets
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+try:
+    from aiohttp import web
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+DEFAULT_CLIENT_ID = 'client_stand_in'
+DEFAULT_CLIENT_SECRET = 'stand-in-client-secret'
+DEFAULT_AGENT_ID = 'agent_stand_in'
+DEFAULT_AGENT_SECRET = 'stand-in-agent-secret'
+DEFAULT_JWT_SECRET = 'stand-in-jwt-secret'
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def encode_jwt(claims: Dict[str, Any], secret: str) -> str:
+    """
+    Sign claims as an HS256 JWT, the way the production server issues access tokens.
+
+    Args:
+        claims: JWT payload
+        secret: HMAC secret
+
+    Returns:
+        Compact JWT
+    """
+    header = _b64url(json.dumps({'alg': 'HS256'}, separators=(',', ':')).encode())
+    payload = _b64url(json.dumps(claims, separators=(',', ':')).encode())
+    signing_input = f'{header}.{payload}'.encode('ascii')
+    signature = hmac.new(secret.encode('utf-8'), signing_input, hashlib.sha256).digest()
+    return f'{header}.{payload}.{_b64url(signature)}'
+
+
+class StandInConfig:
+    """Behaviour knobs for the stand-in server."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        error_paths: Optional[Set[str]] = None,
+        completion_delay: float = 0.0,
+        access_token_ttl: int = 3600,
+        jwt_secret: str = DEFAULT_JWT_SECRET,
+        page_padding: int = 6 * 1024,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize stand-in configuration.
+
+        Args:
+            latency: Seconds added to every response
+            latency_jitter: Extra random latency, uniform in [0, latency_jitter]
+            error_rate: Fraction of requests answered with error_status
+            error_status: HTTP status of injected errors (default: 503)
+            error_paths: Paths errors are injected on (default: all)
+            completion_delay: Seconds between agent authentication and check-status
+                reporting the request as authenticated
+            access_token_ttl: Access token lifetime in seconds
+            jwt_secret: Secret used to sign access tokens
+            page_padding: Bytes of markup before window.authRequest on the spinning page
+            seed: Seed for latency jitter and error injection
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.error_paths = error_paths
+        self.completion_delay = completion_delay
+        self.access_token_ttl = access_token_ttl
+        self.jwt_secret = jwt_secret
+        self.page_padding = page_padding
+        self.seed = seed
+
+
+class ServerStats:
+    """Traffic counters, reset with StandInServer.reset_stats()."""
+
+    def __init__(self):
+        self.requests: Dict[str, int] = {}
+        self.errors_injected = 0
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self._peers: Set[Tuple[Any, ...]] = set()
+
+    @property
+    def total_requests(self) -> int:
+        """Requests served across all paths."""
+        return sum(self.requests.values())
+
+    @property
+    def connections(self) -> int:
+        """Distinct client sockets seen."""
+        return len(self._peers)
+
+    def __repr__(self) -> str:
+        return (
+            f"ServerStats(requests={self.total_requests}, connections={self.connections}, "
+            f"bytes_received={self.bytes_received}, bytes_sent={self.bytes_sent})"
+        )
+
+
+class _AuthRequest:
+    __slots__ = ('client_id', 'redirect_uri', 'state', 'code_challenge', 'scope', 'code', 'completes_at')
+
+    def __init__(self, client_id: str, redirect_uri: str, state: str, code_challenge: str, scope: str):
+        self.client_id = client_id
+        self.redirect_uri = redirect_uri
+        self.state = state
+        self.code_challenge = code_challenge
+        self.scope = scope
+        self.code: Optional[str] = None
+        self.completes_at = 0.0
+
+
+class StandInServer:
+    """
+    Local Auth Agent server on 127.0.0.1.
+
+    One client and one agent are registered by default (see DEFAULT_CLIENT_ID
+    and DEFAULT_AGENT_ID). The SDK blocks loopback addresses, so pass a
+    URLValidator without blocked networks to reach it.
+
+    Example:
+        async with StandInServer(StandInConfig(latency=0.005)) as server:
+            local = URLValidator(blocked_networks=())
+            client = AuthAgentClient(DEFAULT_CLIENT_ID, 'http://localhost:3000/callback',
+                                     DEFAULT_CLIENT_SECRET, server.url, url_validator=local)
+            sdk = AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=local)
+            url, verifier, state = client.get_authorization_url()
+            status = await sdk.complete_authentication_flow_async(url)
+    """
+
+    def __init__(self, config: Optional[StandInConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        Initialize the server. Nothing listens until start() is awaited.
+
+        Args:
+            config: Behaviour configuration
+            host: Interface to bind (default: 127.0.0.1)
+            port: Port to bind (default: any free port)
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError('aiohttp is required for StandInServer. Install it with: pip install aiohttp')
+        self.config = config or StandInConfig()
+        self.host = host
+        self.port = port
+        self.stats = ServerStats()
+        self.clients: Dict[str, str] = {}
+        self.agents: Dict[str, Dict[str, str]] = {}
+        self.register_client(DEFAULT_CLIENT_ID, DEFAULT_CLIENT_SECRET)
+        self.register_agent(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET)
+
+        self._rng = random.Random(self.config.seed)
+        self._requests: Dict[str, _AuthRequest] = {}
+        self._codes: Dict[str, Dict[str, Any]] = {}
+        self._tokens: Dict[str, Dict[str, Any]] = {}
+        self._refresh_tokens: Dict[str, Dict[str, Any]] = {}
+        self._runner: Optional['web.AppRunner'] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        return f'http://{self.host}:{self.port}'
+
+    def register_client(self, client_id: str, client_secret: str) -> None:
+        """Register an OAuth client."""
+        self.clients[client_id] = client_secret
+
+    def register_agent(
+        self,
+        agent_id: str,
+        agent_secret: str,
+        email: str = 'agent-user@example.com',
+        name: str = 'Agent User'
+    ) -> None:
+        """Register an agent and the user it acts for."""
+        self.agents[agent_id] = {'secret': agent_secret, 'email': email, 'name': name}
+
+    def reset_stats(self) -> ServerStats:
+        """
+        Start counting traffic from zero.
+
+        Returns:
+            The counters collected so far
+        """
+        stats, self.stats = self.stats, ServerStats()
+        return stats
+
+    async def start(self) -> 'StandInServer':
+        """Bind the socket and start serving."""
+        @web.middleware
+        async def middleware(request: 'web.Request', handler) -> 'web.StreamResponse':
+            return await self._serve(request, handler)
+
+        app = web.Application(middlewares=[middleware])
+        app.router.add_get('/authorize', self._authorize)
+        app.router.add_post('/token', self._token)
+        app.router.add_post('/introspect', self._introspect)
+        app.router.add_get('/userinfo', self._userinfo)
+        app.router.add_post('/revoke', self._revoke)
+        app.router.add_post('/api/agent/authenticate', self._agent_authenticate)
+        app.router.add_get('/api/check-status', self._check_status)
+        app.router.add_get('/.well-known/oauth-authorization-server', self._metadata)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self) -> None:
+        """Stop serving and drop open connections."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'StandInServer':
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _serve(self, request: 'web.Request', handler) -> 'web.StreamResponse':
+        stats = self.stats
+        stats.requests[request.path] = stats.requests.get(request.path, 0) + 1
+        peer = request.transport.get_extra_info('peername') if request.transport else None
+        if peer is not None:
+            stats._peers.add(tuple(peer))
+        body = await request.read()
+        stats.bytes_received += _head_size(request.method, request.path_qs, request.headers) + len(body)
+
+        config = self.config
+        delay = config.latency
+        if config.latency_jitter:
+            delay += self._rng.uniform(0, config.latency_jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if config.error_rate and (config.error_paths is None or request.path in config.error_paths) \
+                and self._rng.random() < config.error_rate:
+            stats.errors_injected += 1
+            response = web.json_response(
+                {'error': 'server_error', 'error_description': 'Injected failure'},
+                status=config.error_status
+            )
+        else:
+            response = await handler(request)
+
+        stats.bytes_sent += _head_size('HTTP/1.1', str(response.status), response.headers) + len(response.body or b'')
+        return response
+
+    async def _authorize(self, request: 'web.Request') -> 'web.Response':
+        query = request.query
+        for name in ('client_id', 'redirect_uri', 'state', 'code_challenge', 'code_challenge_method'):
+            if not query.get(name):
+                return web.Response(text=f'Missing {name} parameter', status=400, content_type='text/html')
+        if query.get('response_type') != 'code':
+            return web.Response(text='Only "code" response type is supported', status=400, content_type='text/html')
+        if query['code_challenge_method'] != 'S256':
+            return web.Response(text='Only S256 is supported', status=400, content_type='text/html')
+        if query['client_id'] not in self.clients:
+            return web.Response(text='Client not found', status=400, content_type='text/html')
+
+        request_id = f'req_{secrets.token_hex(16)}'
+        self._requests[request_id] = _AuthRequest(
+            query['client_id'], query['redirect_uri'], query['state'], query['code_challenge'],
+            query.get('scope') or 'openid profile'
+        )
+        return web.Response(text=self._spinning_page(request_id), content_type='text/html')
+
+    def _spinning_page(self, request_id: str) -> str:
+        padding = '.p{margin:0}' * (self.config.page_padding // 12)
+        return (
+            '<!DOCTYPE html><html><head><title>Auth Agent</title>'
+            f'<style>{padding}</style></head><body>'
+            '<div class="status">Waiting for agent authentication</div>'
+            '<script>\n'
+            '    window.authRequest = {\n'
+            f"      request_id: '{request_id}',\n"
+            f'      timestamp: {int(time.time() * 1000)}\n'
+            '    };\n'
+            f"    const requestId = '{request_id}';\n"
+            f"    const checkUrl = '{self.url}/api/check-status?request_id=' + requestId;\n"
+            '</script></body></html>'
+        )
+
+    async def _agent_authenticate(self, request: 'web.Request') -> 'web.Response':
+        body = await _json_body(request)
+        request_id = body.get('request_id')
+        agent_id = body.get('agent_id')
+        if not request_id or not agent_id or not body.get('agent_secret') or not body.get('model'):
+            return web.json_response({
+                'success': False,
+                'error': 'invalid_request',
+                'error_description': 'Missing required fields: request_id, agent_id, agent_secret, model',
+            }, status=400)
+
+        agent = self.agents.get(agent_id)
+        if agent is None:
+            return web.json_response(
+                {'success': False, 'error': 'invalid_agent', 'error_description': 'Agent not found'}, status=401
+            )
+        if not hmac.compare_digest(agent['secret'], body['agent_secret']):
+            return web.json_response({
+                'success': False, 'error': 'invalid_credentials', 'error_description': 'Invalid agent credentials',
+            }, status=401)
+
+        auth_request = self._requests.get(request_id)
+        if auth_request is None:
+            return web.json_response({
+                'success': False,
+                'error': 'invalid_request',
+                'error_description': 'Authorization request not found or expired',
+            }, status=404)
+
+        code = f'ac_{secrets.token_hex(32)}'
+        self._codes[code] = {
+            'client_id': auth_request.client_id,
+            'agent_id': agent_id,
+            'redirect_uri': auth_request.redirect_uri,
+            'code_challenge': auth_request.code_challenge,
+            'model': body['model'],
+            'scope': auth_request.scope,
+        }
+        auth_request.code = code
+        auth_request.completes_at = time.monotonic() + self.config.completion_delay
+        return web.json_response({'success': True, 'message': 'Agent authenticated successfully'})
+
+    async def _check_status(self, request: 'web.Request') -> 'web.Response':
+        request_id = request.query.get('request_id')
+        if not request_id:
+            return web.json_response(
+                {'error': 'invalid_request', 'error_description': 'Missing request_id parameter'}, status=400
+            )
+        auth_request = self._requests.get(request_id)
+        if auth_request is None:
+            return web.json_response({'status': 'error', 'error': 'Request not found or expired'})
+        if auth_request.code and time.monotonic() >= auth_request.completes_at:
+            return web.json_response({
+                'status': 'authenticated',
+                'code': auth_request.code,
+                'state': auth_request.state,
+                'redirect_uri': auth_request.redirect_uri,
+            })
+        return web.json_response({'status': 'pending'})
+
+    async def _token(self, request: 'web.Request') -> 'web.Response':
+        body = await _json_body(request)
+        grant_type = body.get('grant_type')
+        if grant_type not in ('authorization_code', 'refresh_token'):
+            return _oauth_error(
+                'unsupported_grant_type', 'Only authorization_code and refresh_token grants are supported'
+            )
+        client_id = body.get('client_id')
+        client_secret = body.get('client_secret')
+        if not client_id or not client_secret:
+            return _oauth_error('invalid_request', 'Missing client_id or client_secret')
+        if client_id not in self.clients:
+            return _oauth_error('invalid_client', 'Client not found', 401)
+        if not hmac.compare_digest(self.clients[client_id], client_secret):
+            return _oauth_error('invalid_client', 'Invalid client credentials', 401)
+
+        if grant_type == 'authorization_code':
+            code = body.get('code')
+            code_verifier = body.get('code_verifier')
+            if not code or not code_verifier or not body.get('redirect_uri'):
+                return _oauth_error('invalid_request', 'Missing required parameters: code, code_verifier, redirect_uri')
+            grant = self._codes.get(code)
+            if grant is None:
+                return _oauth_error('invalid_grant', 'Invalid or expired authorization code')
+            if grant['client_id'] != client_id:
+                return _oauth_error('invalid_grant', 'Authorization code was issued to a different client')
+            challenge = _b64url(hashlib.sha256(code_verifier.encode('ascii')).digest())
+            if not hmac.compare_digest(challenge, grant['code_challenge']):
+                return _oauth_error('invalid_grant', 'Invalid code_verifier')
+            if grant['redirect_uri'] != body['redirect_uri']:
+                return _oauth_error('invalid_grant', 'redirect_uri mismatch')
+            del self._codes[code]
+        else:
+            refresh_token = body.get('refresh_token')
+            if not refresh_token:
+                return _oauth_error('invalid_request', 'Missing required parameter: refresh_token')
+            grant = self._refresh_tokens.get(refresh_token)
+            if grant is None:
+                return _oauth_error('invalid_grant', 'Invalid or expired refresh token')
+            if grant['client_id'] != client_id:
+                return _oauth_error('invalid_grant', 'Refresh token does not belong to this client')
+            # Rotation: the old pair stops working
+            self._revoke_pair(grant)
+
+        return web.json_response(self._issue_tokens(grant['agent_id'], client_id, grant['model'], grant['scope']))
+
+    def _issue_tokens(self, agent_id: str, client_id: str, model: str, scope: str) -> Dict[str, Any]:
+        now = int(time.time())
+        ttl = self.config.access_token_ttl
+        access_token = encode_jwt({
+            'sub': agent_id,
+            'client_id': client_id,
+            'model': model,
+            'scope': scope,
+            'iss': self.url,
+            'iat': now,
+            'exp': now + ttl,
+            # Keeps tokens minted in the same second distinct
+            'jti': secrets.token_hex(8),
+        }, self.config.jwt_secret)
+        refresh_token = f'rt_{secrets.token_hex(32)}'
+        record = {
+            'agent_id': agent_id,
+            'client_id': client_id,
+            'model': model,
+            'scope': scope,
+            'exp': now + ttl,
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+        }
+        self._tokens[access_token] = record
+        self._refresh_tokens[refresh_token] = record
+        return {
+            'access_token': access_token,
+            'token_type': 'Bearer',
+            'expires_in': ttl,
+            'refresh_token': refresh_token,
+            'scope': scope,
+        }
+
+    def _revoke_pair(self, record: Dict[str, Any]) -> None:
+        self._tokens.pop(record['access_token'], None)
+        self._refresh_tokens.pop(record['refresh_token'], None)
+
+    def _active_token(self, token: Optional[str]) -> Optional[Dict[str, Any]]:
+        record = self._tokens.get(token) if token else None
+        if record is None or record['exp'] <= time.time():
+            return None
+        return record
+
+    async def _introspect(self, request: 'web.Request') -> 'web.Response':
+        body = await _json_body(request)
+        client_id = body.get('client_id')
+        client_secret = body.get('client_secret')
+        if client_id and client_secret:
+            expected = self.clients.get(client_id)
+            if expected is None or not hmac.compare_digest(expected, client_secret):
+                return web.json_response({'active': False})
+
+        record = self._active_token(body.get('token'))
+        if record is None:
+            return web.json_response({'active': False})
+        return web.json_response({
+            'active': True,
+            'sub': record['agent_id'],
+            'client_id': record['client_id'],
+            'model': record['model'],
+            'scope': record['scope'],
+            'exp': record['exp'],
+        })
+
+    async def _userinfo(self, request: 'web.Request') -> 'web.Response':
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return _oauth_error('invalid_request', 'Missing or invalid Authorization header', 401)
+        record = self._active_token(header[7:])
+        if record is None:
+            return _oauth_error('invalid_token', 'Invalid or expired access token', 401)
+
+        response: Dict[str, Any] = {'sub': record['agent_id']}
+        scopes = record['scope'].split(' ')
+        agent = self.agents.get(record['agent_id'])
+        if agent and ('email' in scopes or 'openid' in scopes):
+            response['email'] = agent['email']
+            if agent['name'].strip():
+                response['name'] = agent['name']
+        return web.json_response(response)
+
+    async def _revoke(self, request: 'web.Request') -> 'web.Response':
+        body = await _json_body(request)
+        token = body.get('token')
+        record = (self._tokens.get(token) or self._refresh_tokens.get(token)) if token else None
+        if record is not None:
+            self._revoke_pair(record)
+        # Always 200 per RFC 7009
+        return web.json_response({})
+
+    async def _metadata(self, request: 'web.Request') -> 'web.Response':
+        base_url = self.url
+        return web.json_response({
+            'issuer': base_url,
+            'authorization_endpoint': f'{base_url}/authorize',
+            'token_endpoint': f'{base_url}/token',
+            'introspection_endpoint': f'{base_url}/introspect',
+            'revocation_endpoint': f'{base_url}/revoke',
+            'userinfo_endpoint': f'{base_url}/userinfo',
+            'jwks_uri': f'{base_url}/.well-known/jwks.json',
+            'response_types_supported': ['code'],
+            'grant_types_supported': ['authorization_code', 'refresh_token'],
+            'code_challenge_methods_supported': ['S256'],
+            'token_endpoint_auth_methods_supported': ['client_secret_post'],
+            'scopes_supported': ['openid', 'profile', 'email'],
+        })
+
+
+async def _json_body(request: 'web.Request') -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _oauth_error(error: str, description: str, status: int = 400) -> 'web.Response':
+    return web.json_response({'error': error, 'error_description': description}, status=status)
+
+
+def _head_size(first: str, second: str, headers: Any) -> int:
+    # Request/status line plus headers as they appear on the wire
+    return len(first) + len(second) + 12 + sum(len(k) + len(v) + 4 for k, v in headers.items()) + 2
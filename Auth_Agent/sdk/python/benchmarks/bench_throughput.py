@@ -0,0 +1,158 @@
+"""
+End-to-end throughput benchmarks against the in-process stand-in server
+
+Measures complete_authentication_flow_async (authorize page, agent login and
+status polling) and AuthAgentClient.exchange_code_for_tokens at several
+concurrency levels, and reports flows/sec, latency percentiles and the sockets
+and bytes the server saw.
+
+Usage:
+    python benchmarks/bench_throughput.py
+    python benchmarks/bench_throughput.py --flows 500 --concurrency 1,10,50,100 --latency 0.005
+    python benchmarks/bench_throughput.py --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from auth_agent_sdk.agent import AuthAgentSDK, FastThenSlowPoll  # noqa: E402
+from auth_agent_sdk.client import AuthAgentClient  # noqa: E402
+from auth_agent_sdk.common.batch import BatchRun  # noqa: E402
+from auth_agent_sdk.common.transport import PoolOptions  # noqa: E402
+from auth_agent_sdk.common.validation import URLValidator  # noqa: E402
+from auth_agent_sdk.testing import (  # noqa: E402
+    StandInServer,
+    StandInConfig,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+)
+
+REDIRECT_URI = 'http://localhost:3000/callback'
+
+
+async def _agent_flows(server: StandInServer, flows: int, concurrency: int) -> Dict[str, Any]:
+    local = URLValidator(blocked_networks=())
+    pool = PoolOptions(limit_per_host=concurrency)
+    strategy = FastThenSlowPoll(fast_interval=0.01)
+    async with AuthAgentClient(
+        DEFAULT_CLIENT_ID, REDIRECT_URI, DEFAULT_CLIENT_SECRET, server.url, url_validator=local
+    ) as client, AuthAgentSDK(
+        DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=local, pool_options=pool
+    ) as sdk:
+        async def _flow(_: int) -> Dict[str, Any]:
+            url, _, _ = client.get_authorization_url()
+            return await sdk.complete_authentication_flow_async(url, poll_strategy=strategy)
+
+        server.reset_stats()
+        run = BatchRun(range(flows), _flow, concurrency=concurrency)
+        await run.collect()
+        return _report('agent_flow', concurrency, run, server)
+
+
+async def _token_exchanges(server: StandInServer, flows: int, concurrency: int) -> Dict[str, Any]:
+    local = URLValidator(blocked_networks=())
+    pool = PoolOptions(limit_per_host=concurrency)
+    strategy = FastThenSlowPoll(fast_interval=0.01)
+    async with AuthAgentClient(
+        DEFAULT_CLIENT_ID, REDIRECT_URI, DEFAULT_CLIENT_SECRET, server.url,
+        url_validator=local, pool_options=pool
+    ) as client, AuthAgentSDK(
+        DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=local, pool_options=pool
+    ) as sdk:
+        async def _code(_: int):
+            url, verifier, _ = client.get_authorization_url()
+            status = await sdk.complete_authentication_flow_async(url, poll_strategy=strategy)
+            return status['code'], verifier
+
+        # Authorization codes are minted outside the measured window
+        grants = [result.value for result in await BatchRun(range(flows), _code, concurrency).collect()]
+
+        server.reset_stats()
+        run = BatchRun(grants, lambda grant: client.exchange_code_for_tokens(*grant), concurrency=concurrency)
+        await run.collect()
+        return _report('token_exchange', concurrency, run, server)
+
+
+def _report(scenario: str, concurrency: int, run: BatchRun, server: StandInServer) -> Dict[str, Any]:
+    stats = run.stats
+    traffic = server.stats
+    errors = sorted({repr(result.error) for result in run.results if not result.ok})
+    return {
+        'scenario': scenario,
+        'concurrency': concurrency,
+        'flows': stats.total,
+        'failed': stats.failed,
+        'flows_per_sec': round(stats.throughput, 1),
+        'p50_ms': round(stats.latency_p50 * 1000, 2),
+        'p95_ms': round(stats.latency_p95 * 1000, 2),
+        'p99_ms': round(stats.latency_p99 * 1000, 2),
+        'requests': traffic.total_requests,
+        'sockets_opened': traffic.connections,
+        'bytes_received': traffic.bytes_received,
+        'bytes_sent': traffic.bytes_sent,
+        'errors': errors[:3],
+    }
+
+
+def _print_table(rows: List[Dict[str, Any]]) -> None:
+    columns = [
+        ('scenario', 15), ('concurrency', 11), ('flows', 6), ('failed', 6), ('flows_per_sec', 13),
+        ('p50_ms', 8), ('p95_ms', 8), ('p99_ms', 8), ('requests', 8), ('sockets_opened', 14),
+        ('bytes_received', 14), ('bytes_sent', 12),
+    ]
+    print(' '.join(name.rjust(width) for name, width in columns))
+    for row in rows:
+        print(' '.join(str(row[name]).rjust(width) for name, width in columns))
+        for error in row['errors']:
+            print(f'    error: {error}')
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    config = StandInConfig(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        completion_delay=args.completion_delay,
+        seed=args.seed,
+    )
+    rows = []
+    async with StandInServer(config) as server:
+        for concurrency in args.concurrency:
+            if 'agent_flow' in args.scenarios:
+                rows.append(await _agent_flows(server, args.flows, concurrency))
+            if 'token_exchange' in args.scenarios:
+                rows.append(await _token_exchanges(server, args.flows, concurrency))
+    return rows
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--flows', type=int, default=200, help='flows per scenario and concurrency level')
+    parser.add_argument('--concurrency', type=lambda value: [int(v) for v in value.split(',')],
+                        default=[1, 10, 50], help='comma-separated concurrency levels')
+    parser.add_argument('--scenarios', type=lambda value: value.split(','),
+                        default=['agent_flow', 'token_exchange'], help='comma-separated scenarios')
+    parser.add_argument('--latency', type=float, default=0.0, help='server latency per request (s)')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='extra random latency (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of injected 503s')
+    parser.add_argument('--completion-delay', type=float, default=0.0,
+                        help='delay before check-status reports success (s)')
+    parser.add_argument('--seed', type=int, default=None, help='seed for jitter and error injection')
+    parser.add_argument('--json', metavar='PATH', help='also write results as JSON')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    arguments = _parse_args(sys.argv[1:])
+    results = asyncio.run(main(arguments))
+    _print_table(results)
+    if arguments.json:
+        Path(arguments.json).write_text(json.dumps(results, indent=2))
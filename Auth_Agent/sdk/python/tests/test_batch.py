@@ -0,0 +1,243 @@
+"""
+Tests for bounded-concurrency batch execution
+"""
+
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from auth_agent_sdk.agent import AuthAgentSDK, FixedPoll
+from auth_agent_sdk.client import AuthAgentClient, IntrospectionCache
+from auth_agent_sdk.common.batch import BatchRun
+from auth_agent_sdk.common.validation import URLValidator
+from auth_agent_sdk.testing import (
+    StandInServer,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+)
+
+
+@pytest.mark.asyncio
+async def test_batch_respects_concurrency():
+    """Test no more than `concurrency` items run at once."""
+    in_flight = [0]
+    peak = [0]
+
+    async def worker(item):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        return item * 2
+
+    run = BatchRun(range(20), worker, concurrency=4)
+    results = await run.collect()
+
+    assert len(results) == 20
+    assert peak[0] == 4
+    assert sorted(r.value for r in results) == [i * 2 for i in range(20)]
+    assert run.stats.total == 20
+    assert run.stats.succeeded == 20
+
+
+@pytest.mark.asyncio
+async def test_batch_captures_failures():
+    """Test one failing item does not stop the others."""
+    async def worker(item):
+        if item == 3:
+            raise ValueError('boom')
+        return item
+
+    run = BatchRun(range(5), worker, concurrency=2)
+    results = {r.key: r for r in await run.collect()}
+
+    assert not results[3].ok
+    assert isinstance(results[3].error, ValueError)
+    assert all(results[i].ok for i in (0, 1, 2, 4))
+    assert run.stats.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_streams_in_completion_order():
+    """Test results are yielded as soon as they complete."""
+    async def worker(delay):
+        await asyncio.sleep(delay)
+        return delay
+
+    keys = [r.key async for r in BatchRun([0.05, 0.01], worker, concurrency=2)]
+    assert keys == [0.01, 0.05]
+
+
+@pytest.mark.asyncio
+async def test_batch_early_exit_cancels_workers():
+    """Test breaking out of the iteration cancels outstanding work."""
+    started = []
+
+    async def worker(item):
+        started.append(item)
+        await asyncio.sleep(0.01 if item == 0 else 10)
+        return item
+
+    async with BatchRun(range(100), worker, concurrency=3) as run:
+        async for result in run:
+            break
+
+    assert len(started) <= 4
+    assert run.stats.total == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_raises_iterator_and_key_errors():
+    """Test a failing items iterable or key function surfaces instead of hanging."""
+    async def worker(item):
+        await asyncio.sleep(0)
+        return item
+
+    def items():
+        yield 1
+        raise ValueError('bad source')
+
+    run = BatchRun(items(), worker, concurrency=3)
+    with pytest.raises(ValueError, match='bad source'):
+        await asyncio.wait_for(run.collect(), timeout=2)
+    assert [result.value for result in run.results] == [1]
+    assert run.stats is not None
+
+    def bad_key(item):
+        raise KeyError(item)
+
+    with pytest.raises(KeyError):
+        await asyncio.wait_for(BatchRun([1, 2], worker, key=bad_key).collect(), timeout=2)
+
+
+def test_batch_rejects_invalid_concurrency():
+    """Test concurrency must be positive."""
+    with pytest.raises(ValueError):
+        BatchRun([], lambda item: item, concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_authenticate_many_async():
+    """Test bulk authentication yields per-request outcomes."""
+    async def authenticate(request):
+        body = await request.json()
+        if body['request_id'] == 'req_bad':
+            return web.json_response({'error': 'invalid_request'}, status=404)
+        return web.json_response({'success': True})
+
+    async def check_status(request):
+        return web.json_response({'status': 'authenticated', 'code': f"ac_{request.query['request_id']}"})
+
+    app = web.Application()
+    app.router.add_post('/api/agent/authenticate', authenticate)
+    app.router.add_get('/api/check-status', check_status)
+    server = TestServer(app)
+    await server.start_server()
+    base_url = str(server.make_url('')).rstrip('/')
+
+    try:
+        async with AuthAgentSDK(agent_id='agent_123', agent_secret='secret_123', model='gpt-4') as sdk:
+            sdk._extract_auth_server_url = lambda authorization_url: base_url
+            items = [(f'req_{i}', base_url) for i in range(10)] + [('req_bad', base_url)]
+            run = sdk.authenticate_many_async(items, concurrency=4)
+            results = {r.key: r for r in await run.collect()}
+    finally:
+        await server.close()
+
+    assert results['req_3'].value['code'] == 'ac_req_3'
+    assert not results['req_bad'].ok
+    assert run.stats.succeeded == 10
+    assert run.stats.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_introspect_and_revoke_many():
+    """Test bulk introspection and revocation against the stand-in server."""
+    local = URLValidator(blocked_networks=())
+    async with StandInServer() as server:
+        async with AuthAgentClient(
+            DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+            url_validator=local
+        ) as client, AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=local) as sdk:
+            tokens = []
+            for _ in range(5):
+                url, verifier, _ = client.get_authorization_url()
+                status = await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.01))
+                tokens.append((await client.exchange_code_for_tokens(status['code'], verifier))['access_token'])
+
+            run = client.introspect_many(tokens + ['unknown'], concurrency=3)
+            results = {r.key: r for r in await run.collect()}
+            assert all(results[token].value['active'] for token in tokens)
+            assert results['unknown'].value['active'] is False
+            assert run.stats.total == 6
+
+            run = client.revoke_many(tokens, concurrency=3)
+            streamed = [result async for result in run]
+            assert all(result.ok for result in streamed)
+            assert run.stats.succeeded == 5
+            assert server.stats.requests['/revoke'] == 5
+
+            results = await client.introspect_many(tokens).collect()
+            assert not any(result.value['active'] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_revoke_drops_result_of_overlapping_introspection():
+    """Test an introspection in flight during a revoke does not cache the token as active."""
+    async def introspect(request):
+        await asyncio.sleep(0.2)
+        return web.json_response({'active': True, 'sub': 'agent_1', 'exp': 4102444800})
+
+    async def revoke(request):
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_post('/introspect', introspect)
+    app.router.add_post('/revoke', revoke)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        cache = IntrospectionCache()
+        async with AuthAgentClient(
+            'client_1', 'http://localhost:3000/callback', 'secret', str(server.make_url('')).rstrip('/'),
+            url_validator=URLValidator(blocked_networks=()), introspection_cache=cache
+        ) as client:
+            pending = asyncio.ensure_future(client.introspect_token('at_1'))
+            await asyncio.sleep(0.05)
+            await client.revoke_token('at_1')
+            assert (await pending)['active'] is True
+            assert cache.get('at_1') is None
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_revoke_drops_result_of_overlapping_sync_introspection():
+    """Test a sync introspection in flight during a revoke does not cache the token as active."""
+    async def introspect(request):
+        await asyncio.sleep(0.2)
+        return web.json_response({'active': True, 'sub': 'agent_1', 'exp': 4102444800})
+
+    async def revoke(request):
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_post('/introspect', introspect)
+    app.router.add_post('/revoke', revoke)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        cache = IntrospectionCache()
+        async with AuthAgentClient(
+            'client_1', 'http://localhost:3000/callback', 'secret', str(server.make_url('')).rstrip('/'),
+            url_validator=URLValidator(blocked_networks=()), introspection_cache=cache
+        ) as client:
+            pending = asyncio.get_running_loop().run_in_executor(None, client.introspect_token_sync, 'at_1')
+            await asyncio.sleep(0.05)
+            await client.revoke_token('at_1')
+            assert (await pending)['active'] is True
+            assert cache.get('at_1') is None
+    finally:
+        await server.close()
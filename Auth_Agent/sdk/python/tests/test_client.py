@@ -3,8 +3,18 @@ Tests for Auth Agent Client SDK
 """
 
 import pytest
+from auth_agent_sdk.agent import AuthAgentSDK, FixedPoll
 from auth_agent_sdk.client import AuthAgentClient
-from auth_agent_sdk.common.errors import AuthAgentValidationError, AuthAgentSecurityError
+from auth_agent_sdk.common.errors import AuthAgentValidationError, AuthAgentSecurityError, AuthAgentNetworkError
+from auth_agent_sdk.common.validation import URLValidator
+from auth_agent_sdk.testing import (
+    StandInServer,
+    StandInConfig,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+)
 
 
 def test_client_creation():
@@ -103,4 +113,29 @@ def test_get_authorization_url():
     assert len(state) > 20
 
 
-
+@pytest.mark.asyncio
+async def test_complete_sign_in():
+    """Test that sign-in completion returns tokens, userinfo and token details with timings."""
+    local = URLValidator(blocked_networks=())
+    async with StandInServer(StandInConfig(latency=0.02)) as server:
+        async with AuthAgentClient(
+            DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+            url_validator=local
+        ) as client, AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=local) as sdk:
+            url, verifier, _ = client.get_authorization_url()
+            status = await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.01))
+
+            result = await client.complete_sign_in(status['code'], verifier)
+            assert result.access_token
+            assert result.sub == DEFAULT_AGENT_ID
+            assert result.model == 'gpt-4'
+            assert result.userinfo['sub'] == DEFAULT_AGENT_ID
+            assert result.introspection['active'] is True
+            assert set(result.timings) == {'exchange', 'userinfo', 'introspection', 'total'}
+            # The follow-up requests overlap instead of running back to back
+            follow_up = result.timings['total'] - result.timings['exchange']
+            assert follow_up < result.timings['userinfo'] + result.timings['introspection']
+            assert server.stats.requests['/userinfo'] == 1
+
+            with pytest.raises(AuthAgentNetworkError):
+                await client.get_userinfo('invalid')
@@ -0,0 +1,163 @@
+"""
+Tests for deadlines shared across a multi-request flow
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from auth_agent_sdk.agent import AuthAgentSDK
+from auth_agent_sdk.client import AuthAgentClient
+from auth_agent_sdk.common.deadline import Deadline
+from auth_agent_sdk.common.errors import AuthAgentNetworkError, AuthAgentTimeoutError
+from auth_agent_sdk.common.retry import (
+    retry_with_backoff,
+    retry_with_backoff_async,
+    RetryOptions,
+    CircuitBreaker,
+)
+from auth_agent_sdk.common.validation import URLValidator
+from auth_agent_sdk.testing import (
+    StandInServer,
+    StandInConfig,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+)
+
+LOCAL = URLValidator(blocked_networks=())
+
+
+class Unavailable(Exception):
+    status_code = 503
+
+
+def test_deadline_remaining_and_cap():
+    """Test that a deadline counts down and caps timeouts to the time left."""
+    now = [100.0]
+    deadline = Deadline(10.0, clock=lambda: now[0])
+    assert deadline.remaining() == 10.0
+    assert deadline.cap(30.0) == 10.0
+    assert deadline.cap(2.0) == 2.0
+
+    now[0] = 107.5
+    assert deadline.remaining() == 2.5
+    assert not deadline.expired
+    deadline.check()
+
+    now[0] = 111.0
+    assert deadline.remaining() == 0.0
+    assert deadline.expired
+    with pytest.raises(AuthAgentTimeoutError, match='10s deadline'):
+        deadline.check('Login')
+
+
+def test_retry_skipped_when_it_cannot_start_before_deadline():
+    """Test that a retry whose backoff outlasts the deadline is not attempted."""
+    calls = [0]
+
+    def fn():
+        calls[0] += 1
+        raise Unavailable('busy')
+
+    options = RetryOptions(max_retries=5, initial_delay=1.0)
+    start = time.perf_counter()
+    with pytest.raises(AuthAgentNetworkError, match='after 1 attempts'):
+        retry_with_backoff(fn, options, deadline=Deadline(0.5))
+    assert calls[0] == 1
+    assert time.perf_counter() - start < 0.5
+
+
+def test_expired_deadline_prevents_first_attempt():
+    """Test that nothing is sent once the deadline has passed."""
+    calls = [0]
+
+    def fn():
+        calls[0] += 1
+
+    with pytest.raises(AuthAgentTimeoutError):
+        retry_with_backoff(fn, deadline=Deadline(0.0))
+    assert calls[0] == 0
+
+
+@pytest.mark.asyncio
+async def test_async_attempt_cut_to_deadline():
+    """Test that an attempt's timeout shrinks to the deadline without tripping the breaker."""
+    breaker = CircuitBreaker('slow', failure_threshold=1)
+
+    async def fn():
+        await asyncio.sleep(5)
+
+    start = time.perf_counter()
+    with pytest.raises(AuthAgentTimeoutError, match='deadline'):
+        await retry_with_backoff_async(fn, RetryOptions(timeout=30.0), breaker, Deadline(0.1))
+    assert time.perf_counter() - start < 1.0
+    assert breaker.state == 'closed'
+
+
+def test_sync_attempt_cut_to_deadline():
+    """Test that a sync attempt ended by the caller's deadline does not trip the breaker."""
+    breaker = CircuitBreaker('slow', failure_threshold=1)
+    deadline = Deadline(0.1)
+
+    def fn():
+        # What SyncTransport.request does when Deadline.within(...) runs out
+        time.sleep(deadline.remaining())
+        raise AuthAgentTimeoutError('Request did not finish before its deadline')
+
+    with pytest.raises(AuthAgentTimeoutError, match='deadline'):
+        retry_with_backoff(fn, RetryOptions(timeout=30.0), breaker, deadline)
+    assert breaker.state == 'closed'
+
+
+def test_sync_timeout_without_deadline_counts_as_failure():
+    """Test that a timeout the caller's deadline did not cause still trips the breaker."""
+    breaker = CircuitBreaker('slow', failure_threshold=1)
+
+    def fn():
+        raise AuthAgentTimeoutError('Request timeout after 30s')
+
+    with pytest.raises(AuthAgentTimeoutError):
+        retry_with_backoff(fn, RetryOptions(max_retries=0), breaker, Deadline(60.0))
+    assert breaker.state == 'open'
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+@pytest.mark.asyncio
+async def test_deadline_cut_probe_is_released(mode):
+    """Test that both paths hand back a half-open probe slot when the deadline ends it."""
+    breaker = CircuitBreaker('slow', failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    deadline = Deadline(0.1)
+
+    def slow():
+        time.sleep(deadline.remaining())
+        raise AuthAgentTimeoutError('Request did not finish before its deadline')
+
+    async def slow_async():
+        await asyncio.sleep(5)
+
+    with pytest.raises(AuthAgentTimeoutError, match='deadline'):
+        if mode == 'sync':
+            retry_with_backoff(slow, RetryOptions(timeout=30.0), breaker, deadline)
+        else:
+            await retry_with_backoff_async(slow_async, RetryOptions(timeout=30.0), breaker, deadline)
+    assert breaker.state == 'half_open'
+    # The probe slot is free again, so the next call may probe the server
+    breaker.before_call()
+
+
+@pytest.mark.asyncio
+async def test_flow_timeout_bounds_every_step():
+    """Test that complete_authentication_flow_async's timeout covers the requests, not just polling."""
+    async with StandInServer(StandInConfig(latency=0.3, completion_delay=10.0)) as server:
+        client = AuthAgentClient(DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET,
+                                 server.url, url_validator=LOCAL)
+        url, _, _ = client.get_authorization_url()
+        async with AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=LOCAL) as sdk:
+            start = time.perf_counter()
+            with pytest.raises((TimeoutError, AuthAgentTimeoutError, RuntimeError)):
+                await sdk.complete_authentication_flow_async(url, timeout=0.5)
+            assert time.perf_counter() - start < 1.0
@@ -0,0 +1,223 @@
+"""
+Tests for cached authorization-server metadata discovery
+"""
+
+import asyncio
+
+import pytest
+
+from auth_agent_sdk.agent import AuthAgentSDK, FixedPoll
+from auth_agent_sdk.client import AuthAgentClient, MetadataCache
+from auth_agent_sdk.common.errors import AuthAgentSecurityError
+from auth_agent_sdk.common.validation import URLValidator
+from auth_agent_sdk.testing import (
+    StandInServer,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+)
+
+ISSUER = 'https://auth.auth-agent.com'
+LOCAL = URLValidator(blocked_networks=())
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Fetcher:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError('down')
+        return {'issuer': ISSUER, 'token_endpoint': f'{ISSUER}/oauth/token', 'version': self.calls}
+
+
+@pytest.mark.asyncio
+async def test_fetched_once_per_issuer():
+    """Test that concurrent and repeated lookups share one fetch."""
+    cache = MetadataCache()
+    fetch = Fetcher()
+    results = await asyncio.gather(*(cache.get(ISSUER, fetch) for _ in range(5)))
+    assert fetch.calls == 1
+    assert all(result.endpoint('token_endpoint') == f'{ISSUER}/oauth/token' for result in results)
+    assert results[0].endpoint('userinfo_endpoint') is None
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_before_expiry():
+    """Test that an ageing document is served while a new one is fetched."""
+    clock = FakeClock()
+    cache = MetadataCache(ttl=100, refresh_margin=10, clock=clock)
+    fetch = Fetcher()
+    await cache.get(ISSUER, fetch)
+
+    clock.now += 95
+    stale = await cache.get(ISSUER, fetch)
+    assert stale.document['version'] == 1
+    await asyncio.sleep(0.01)
+    assert fetch.calls == 2
+    assert cache.peek(ISSUER).document['version'] == 2
+    await cache.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stale_document_served_when_refresh_fails():
+    """Test serve-stale on fetch failure after expiry."""
+    clock = FakeClock()
+    cache = MetadataCache(ttl=100, clock=clock)
+    await cache.get(ISSUER, Fetcher())
+    clock.now += 200
+    result = await cache.get(ISSUER, Fetcher(fail=True))
+    assert result.document['version'] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_document_served_without_waiting_on_refresh():
+    """Test that an expired document is returned at once while a slow, failing refresh runs."""
+    clock = FakeClock()
+    cache = MetadataCache(ttl=100, failure_ttl=30, clock=clock)
+    await cache.get(ISSUER, Fetcher())
+    clock.now += 200
+
+    calls = [0]
+
+    async def slow_failure():
+        calls[0] += 1
+        # Stands in for a fetch spending its retries and backoff
+        await asyncio.sleep(0.3)
+        raise ConnectionError('down')
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    result = await cache.get(ISSUER, slow_failure)
+    assert loop.time() - start < 0.1
+    assert result.document['version'] == 1
+
+    await asyncio.sleep(0.4)
+    assert (await cache.get(ISSUER, slow_failure)).document['version'] == 1
+    await asyncio.sleep(0)
+    # The failure is remembered, so no new refresh starts
+    assert calls[0] == 1
+    await cache.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_discovery_remembered():
+    """Test that a server without a document is not asked again on every lookup."""
+    clock = FakeClock()
+    cache = MetadataCache(failure_ttl=30, clock=clock)
+    fetch = Fetcher(fail=True)
+    for _ in range(5):
+        with pytest.raises(ConnectionError):
+            await cache.get(ISSUER, fetch)
+    assert fetch.calls == 1
+
+    clock.now += 31
+    fetch.fail = False
+    result = await cache.get(ISSUER, fetch)
+    assert fetch.calls == 2
+    assert result.endpoint('token_endpoint') == f'{ISSUER}/oauth/token'
+
+
+@pytest.mark.asyncio
+async def test_client_falls_back_without_refetching():
+    """Test that endpoint lookups on a server without discovery make one failed fetch."""
+    fetch = Fetcher(fail=True)
+    client = AuthAgentClient('client_1', 'https://app.example.com/callback', 'secret',
+                             metadata_cache=MetadataCache())
+    client._fetch_metadata = fetch
+    for _ in range(5):
+        assert await client._endpoint('introspection_endpoint') == f'{ISSUER}/introspect'
+    assert fetch.calls == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_disk_persistence(tmp_path):
+    """Test that a cold start reads the document from disk without fetching."""
+    await MetadataCache(cache_dir=str(tmp_path)).get(ISSUER, Fetcher())
+
+    fetch = Fetcher()
+    cold = MetadataCache(cache_dir=str(tmp_path))
+    result = await cold.get(ISSUER, fetch)
+    assert fetch.calls == 0
+    assert result.endpoint('token_endpoint') == f'{ISSUER}/oauth/token'
+
+    cold.invalidate(ISSUER)
+    assert MetadataCache(cache_dir=str(tmp_path)).peek(ISSUER) is None
+
+
+@pytest.mark.asyncio
+async def test_discovered_endpoints_respect_url_policy():
+    """Test that a metadata document cannot point the client at a blocked address."""
+    cache = MetadataCache()
+
+    async def evil():
+        return {'issuer': ISSUER, 'token_endpoint': 'http://169.254.169.254/latest'}
+
+    await cache.get(ISSUER, evil)
+    client = AuthAgentClient('client_1', 'https://app.example.com/callback', 'secret', metadata_cache=cache)
+    with pytest.raises(AuthAgentSecurityError):
+        await client.exchange_code_for_tokens('code', 'verifier')
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_document_for_another_issuer_rejected():
+    """Test that a document whose issuer differs from the requested one is not used."""
+    cache = MetadataCache()
+
+    async def evil():
+        return {'issuer': 'https://evil.example.net', 'token_endpoint': 'https://evil.example.net/token'}
+
+    with pytest.raises(AuthAgentSecurityError):
+        await cache.get(ISSUER, evil)
+    assert cache.peek(ISSUER) is None
+
+    client = AuthAgentClient('client_1', 'https://app.example.com/callback', 'secret', metadata_cache=cache)
+    client._fetch_metadata = evil
+    assert await client._endpoint('token_endpoint') == f'{ISSUER}/token'
+    await client.aclose()
+
+    async def trailing_slash():
+        return {'issuer': f'{ISSUER}/', 'token_endpoint': f'{ISSUER}/oauth/token'}
+
+    result = await MetadataCache().get(ISSUER, trailing_slash)
+    assert result.endpoint('token_endpoint') == f'{ISSUER}/oauth/token'
+
+
+@pytest.mark.asyncio
+async def test_clients_share_discovery_against_stand_in():
+    """Test that clients sharing a cache discover once and use the document's endpoints."""
+    cache = MetadataCache()
+    async with StandInServer() as server:
+        clients = [
+            AuthAgentClient(
+                DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+                url_validator=LOCAL, metadata_cache=cache
+            )
+            for _ in range(2)
+        ]
+        async with AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=LOCAL) as sdk:
+            for client in clients:
+                await client.discover()
+                url, verifier, _ = client.get_authorization_url()
+                assert url.startswith(f'{server.url}/authorize?')
+                status = await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.01))
+                tokens = await client.exchange_code_for_tokens(status['code'], verifier)
+                assert (await client.introspect_token(tokens['access_token']))['active'] is True
+
+        assert server.stats.requests['/.well-known/oauth-authorization-server'] == 1
+        for client in clients:
+            await client.aclose()
@@ -9,6 +9,7 @@ from auth_agent_sdk.common.errors import (
     AuthAgentTimeoutError,
     AuthAgentValidationError,
     AuthAgentSecurityError,
+    AuthAgentRetryBudgetError,
 )
 
 
@@ -74,4 +75,11 @@ def test_auth_agent_security_error():
     assert error.name == 'AuthAgentSecurityError'
 
 
-
+def test_auth_agent_retry_budget_error():
+    """Test AuthAgentRetryBudgetError."""
+    original_error = ConnectionError('down')
+    error = AuthAgentRetryBudgetError('Retry budget exhausted', original_error)
+    assert isinstance(error, AuthAgentNetworkError)
+    assert error.code == 'RETRY_BUDGET_EXHAUSTED'
+    assert error.original_error is original_error
+    assert error.name == 'AuthAgentRetryBudgetError'
@@ -0,0 +1,94 @@
+"""
+Tests for streaming request_id extraction
+"""
+
+import asyncio
+import time
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from auth_agent_sdk.agent import AuthAgentSDK
+from auth_agent_sdk.agent.extraction import RequestIdScanner, find_request_id
+from auth_agent_sdk.common.errors import AuthAgentValidationError
+
+SPINNING_PAGE_HEAD = b"""<!DOCTYPE html><html><head><script>
+    window.authRequest = {
+        request_id: 'req_abc123',
+        timestamp: 1700000000000
+    };
+</script>"""
+
+
+def test_scanner_stops_at_window_auth_request():
+    """Test the scanner returns as soon as window.authRequest is complete."""
+    scanner = RequestIdScanner()
+    assert scanner.feed(SPINNING_PAGE_HEAD) == 'req_abc123'
+    assert scanner.bytes_read == len(SPINNING_PAGE_HEAD)
+
+
+def test_scanner_handles_split_chunks():
+    """Test a match spanning several chunks is found."""
+    scanner = RequestIdScanner()
+    found = [scanner.feed(SPINNING_PAGE_HEAD[i:i + 7]) for i in range(0, len(SPINNING_PAGE_HEAD), 7)]
+    assert 'req_abc123' in found
+
+
+def test_scanner_falls_back_on_finish():
+    """Test fallback patterns run once the body ends."""
+    scanner = RequestIdScanner()
+    assert scanner.feed(b"<script>var x = { request_id = \"req_fallback\" }</script>") is None
+    assert scanner.finish() == 'req_fallback'
+
+
+def test_find_request_id_json_style_script():
+    """Test the script fallback reads a JSON-style key, not the separator after it."""
+    assert find_request_id('<script>var x = {"request_id": "abc123"};</script>') == 'abc123'
+    assert find_request_id("<script>var x = {'request_id' : 'abc456'};</script>") == 'abc456'
+
+
+def test_scanner_respects_max_bytes():
+    """Test the byte cap stops scanning."""
+    scanner = RequestIdScanner(max_bytes=100)
+    scanner.feed(b' ' * 80)
+    scanner.feed(b' ' * 80 + SPINNING_PAGE_HEAD)
+    assert scanner.exhausted
+    assert scanner.bytes_read == 100
+    with pytest.raises(AuthAgentValidationError, match='100 bytes'):
+        scanner.finish()
+
+
+def test_find_request_id_pathological_page_is_fast():
+    """Test pages with many scripts and no request_id do not backtrack."""
+    html = '<script>var a = 1;</script>' * 20000 + 'request_id'
+    start = time.monotonic()
+    assert find_request_id(html) is None
+    assert time.monotonic() - start < 1.0
+
+
+@pytest.mark.asyncio
+async def test_extract_request_id_async_stops_reading_early():
+    """Test the async extractor returns without waiting for the rest of the page."""
+    async def authorize(request):
+        response = web.StreamResponse(headers={'Content-Type': 'text/html'})
+        await response.prepare(request)
+        await response.write(SPINNING_PAGE_HEAD)
+        # The rest of the page would take far longer than the test allows
+        await asyncio.sleep(5)
+        await response.write(b'</html>')
+        return response
+
+    app = web.Application()
+    app.router.add_get('/authorize', authorize)
+    server = TestServer(app)
+    await server.start_server()
+    url = str(server.make_url('/authorize'))
+
+    try:
+        async with AuthAgentSDK(agent_id='agent_123', agent_secret='secret_123', model='gpt-4') as sdk:
+            sdk._extract_auth_server_url = lambda authorization_url: url.rsplit('/', 1)[0]
+            start = time.monotonic()
+            request_id = await sdk.extract_request_id_async(url)
+            assert request_id == 'req_abc123'
+            assert time.monotonic() - start < 2.0
+    finally:
+        await server.close()
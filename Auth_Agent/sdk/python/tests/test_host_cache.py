@@ -0,0 +1,156 @@
+"""
+Tests for the per-host resolution cache
+"""
+
+import asyncio
+import pytest
+from auth_agent_sdk.agent import AuthAgentSDK
+from auth_agent_sdk.agent.host_cache import HostCache, HostEntry, HostSettings, origin_of
+from auth_agent_sdk.common.errors import AuthAgentSecurityError
+from auth_agent_sdk.common.retry import RetryOptions
+from auth_agent_sdk.common.transport import AsyncTransport, SyncTransport, PoolOptions
+
+
+def make_sdk(**kwargs):
+    return AuthAgentSDK(agent_id='agent_123', agent_secret='secret_123', model='gpt-4', **kwargs)
+
+
+def test_origin_of():
+    """Test origin extraction ignores path, query and fragment."""
+    assert origin_of('https://Auth.Example.com/authorize?x=1') == 'https://auth.example.com'
+    assert origin_of('https://auth.example.com:8443#frag') == 'https://auth.example.com:8443'
+    assert origin_of('https://auth.example.com?x=/y') == 'https://auth.example.com'
+
+
+def test_sdk_serves_multiple_hosts():
+    """Test one SDK resolves several deployments independently."""
+    sdk = make_sdk()
+    assert sdk._get_auth_server_url('https://a.example.com/authorize?x=1') == 'https://a.example.com'
+    assert sdk._get_auth_server_url('https://b.example.com/authorize?x=1') == 'https://b.example.com'
+    assert sdk._get_auth_server_url('https://a.example.com/other') == 'https://a.example.com'
+    assert len(sdk.hosts) == 2
+
+
+def test_sdk_validates_once_per_origin():
+    """Test URL validation does not re-run for cached origins."""
+    sdk = make_sdk()
+    calls = []
+    original = sdk._extract_auth_server_url
+    sdk._extract_auth_server_url = lambda url: calls.append(url) or original(url)
+
+    for i in range(10):
+        sdk._get_host(f'https://auth.example.com/api/check-status?request_id={i}')
+    assert len(calls) == 1
+
+
+def test_sdk_rejects_blocked_hosts_without_caching():
+    """Test invalid origins raise and are not cached."""
+    sdk = make_sdk()
+    with pytest.raises(AuthAgentSecurityError):
+        sdk._get_host('http://localhost:3000/authorize')
+    assert len(sdk.hosts) == 0
+
+
+def test_host_settings_override():
+    """Test per-host retry options and dedicated pools."""
+    retry = RetryOptions(max_retries=0)
+    sdk = make_sdk(host_settings={
+        'b.example.com': HostSettings(retry_options=retry, pool_options=PoolOptions(limit_per_host=2)),
+    })
+    a = sdk._get_host('https://a.example.com/authorize')
+    b = sdk._get_host('https://b.example.com/authorize')
+
+    assert a.retry_options is sdk.retry_options
+    assert a.transport is sdk.transport
+    assert b.retry_options is retry
+    assert b.transport is not sdk.transport
+    assert b.transport.pool_options.limit_per_host == 2
+
+
+def test_host_cache_evicts_least_recently_used():
+    """Test LRU eviction keeps recently used origins."""
+    def factory(url):
+        return HostEntry(origin_of(url), RetryOptions(), AsyncTransport(), SyncTransport())
+
+    cache = HostCache(factory, max_hosts=2)
+    cache.get('https://a.example.com')
+    cache.get('https://b.example.com')
+    cache.get('https://a.example.com')
+    cache.get('https://c.example.com')
+
+    assert 'https://a.example.com/x' in cache
+    assert 'https://b.example.com/x' not in cache
+    assert len(cache) == 2
+
+
+def test_host_cache_closes_dedicated_pools_on_eviction():
+    """Test evicted hosts release their dedicated sync pools."""
+    sync_transports = []
+
+    def factory(url):
+        sync_transport = SyncTransport()
+        sync_transport.get_session()
+        sync_transports.append(sync_transport)
+        return HostEntry(origin_of(url), RetryOptions(), AsyncTransport(), sync_transport, owns_transports=True)
+
+    cache = HostCache(factory, max_hosts=1)
+    cache.get('https://a.example.com')
+    cache.get('https://b.example.com')
+
+    assert sync_transports[0].closed
+    assert not sync_transports[1].closed
+
+
+def _dedicated_factory(entries):
+    def factory(url):
+        entry = HostEntry(origin_of(url), RetryOptions(), AsyncTransport(), SyncTransport(), owns_transports=True)
+        entries.append(entry)
+        return entry
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_host_cache_aclose_waits_for_evicted_pools():
+    """Test aclose() drains the tasks closing evicted async pools."""
+    entries = []
+    cache = HostCache(_dedicated_factory(entries), max_hosts=1)
+    await cache.get('https://a.example.com').transport.get_session()
+    await cache.get('https://b.example.com').transport.get_session()
+    assert len(cache._closing) == 1
+
+    await cache.aclose()
+    assert not cache._closing
+    assert all(entry.transport.closed for entry in entries)
+    assert len(cache) == 0
+
+
+def test_host_cache_close_closes_async_pools_outside_a_loop():
+    """Test sync close() closes the async pools of cached and evicted entries."""
+    entries = []
+    cache = HostCache(_dedicated_factory(entries), max_hosts=2)
+
+    async def open_sessions():
+        for url in ('https://a.example.com', 'https://b.example.com'):
+            await cache.get(url).transport.get_session()
+
+    asyncio.run(open_sessions())
+    # Evicted with no loop running, so its async pool waits for close()
+    cache.get('https://c.example.com')
+    sessions = [entry.transport._session for entry in entries[:2]]
+    assert not any(session.closed for session in sessions)
+
+    cache.close()
+    assert all(session.closed for session in sessions)
+    assert all(entry.sync_transport.closed for entry in entries)
+
+
+@pytest.mark.asyncio
+async def test_host_cache_close_warns_inside_a_loop():
+    """Test sync close() from a running loop warns about async pools it cannot close."""
+    entries = []
+    cache = HostCache(_dedicated_factory(entries), max_hosts=2)
+    await cache.get('https://a.example.com').transport.get_session()
+
+    with pytest.warns(ResourceWarning, match='await aclose'):
+        cache.close()
+    await entries[0].transport.aclose()
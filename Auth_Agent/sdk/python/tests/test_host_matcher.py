@@ -0,0 +1,79 @@
+"""
+Tests for the allowed-host trie
+"""
+
+import pytest
+
+from auth_agent_sdk.agent import AuthAgentSDK
+from auth_agent_sdk.common.errors import AuthAgentSecurityError, AuthAgentValidationError
+from auth_agent_sdk.common.host_matcher import HostMatcher
+from auth_agent_sdk.common.validation import URLValidator
+
+
+def test_plain_entry_matches_host_and_subdomains():
+    """Test that plain entries keep the legacy subdomain behaviour."""
+    matcher = HostMatcher(['auth-agent.com'])
+    assert matcher.matches('auth-agent.com')
+    assert matcher.matches('api.auth-agent.com')
+    assert matcher.matches('API.Auth-Agent.com.')
+    assert not matcher.matches('evilauth-agent.com')
+    assert not matcher.matches('auth-agent.com.evil.com')
+
+
+def test_wildcard_entry_matches_subdomains_only():
+    """Test that *.example.com does not match the apex."""
+    matcher = HostMatcher(['*.partner.example'])
+    assert matcher.matches('a.partner.example')
+    assert matcher.matches('a.b.partner.example')
+    assert not matcher.matches('partner.example')
+
+
+def test_exact_entries_without_subdomains():
+    """Test exact-only matching."""
+    matcher = HostMatcher(['auth-agent.com', '*.partner.example'], include_subdomains=False)
+    assert matcher.matches('auth-agent.com')
+    assert not matcher.matches('api.auth-agent.com')
+    assert matcher.matches('a.partner.example')
+
+
+def test_large_list():
+    """Test matching against thousands of entries."""
+    matcher = HostMatcher(f'partner{i}.example.com' for i in range(5000))
+    assert len(matcher) == 5000
+    assert matcher.matches('login.partner4999.example.com')
+    assert not matcher.matches('partner5000.example.com')
+    assert not matcher.matches('example.com')
+
+
+@pytest.mark.parametrize('pattern', ['', '*', '*.', 'a..com', 'a.*.com'])
+def test_invalid_patterns(pattern):
+    """Test rejection of malformed patterns."""
+    with pytest.raises(AuthAgentValidationError):
+        HostMatcher([pattern])
+
+
+def test_hot_reload_invalidates_verdicts():
+    """Test that a shared validator sees reloaded hosts despite its verdict cache."""
+    matcher = HostMatcher(['auth-agent.com'])
+    validator = URLValidator(matcher)
+    validator.validate('https://auth-agent.com/authorize')
+
+    matcher.update(['other.example'])
+    with pytest.raises(AuthAgentSecurityError):
+        validator.validate('https://auth-agent.com/authorize')
+    validator.validate('https://other.example/authorize')
+
+
+def test_sdk_revalidates_cached_hosts_after_reload():
+    """Test that origins in the SDK host cache are rechecked after a reload."""
+    matcher = HostMatcher(['auth-agent.com'])
+    sdk = AuthAgentSDK('agent', 'secret', 'gpt-4', allowed_hosts=matcher)
+    assert sdk._get_auth_server_url('https://api.auth-agent.com/authorize') == 'https://api.auth-agent.com'
+
+    matcher.update(['other.example'])
+    with pytest.raises(AuthAgentSecurityError):
+        sdk._get_auth_server_url('https://api.auth-agent.com/authorize')
+
+    matcher.update(['auth-agent.com'])
+    assert sdk._get_auth_server_url('https://api.auth-agent.com/authorize') == 'https://api.auth-agent.com'
+    sdk.close()
@@ -0,0 +1,108 @@
+"""
+Tests for the introspection result cache
+"""
+
+import pytest
+
+from auth_agent_sdk.agent import AuthAgentSDK, FixedPoll
+from auth_agent_sdk.client import AuthAgentClient, IntrospectionCache
+from auth_agent_sdk.common.validation import URLValidator
+from auth_agent_sdk.testing import (
+    StandInServer,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_active_ttl_bounded_by_max_ttl():
+    """Test that active results expire after max_ttl."""
+    clock = FakeClock()
+    cache = IntrospectionCache(max_ttl=30.0, clock=clock)
+    cache.put('tok', {'active': True, 'exp': clock.now + 3600})
+
+    clock.now += 29
+    assert cache.get('tok')['active'] is True
+    clock.now += 2
+    assert cache.get('tok') is None
+
+
+def test_active_ttl_bounded_by_exp():
+    """Test that results never outlive the token."""
+    clock = FakeClock()
+    cache = IntrospectionCache(max_ttl=60.0, clock=clock)
+    cache.put('tok', {'active': True, 'exp': clock.now + 5})
+    clock.now += 6
+    assert cache.get('tok') is None
+
+    cache.put('expired', {'active': True, 'exp': clock.now - 1})
+    assert len(cache) == 0
+
+
+def test_negative_caching():
+    """Test that inactive results are cached briefly."""
+    clock = FakeClock()
+    cache = IntrospectionCache(negative_ttl=2.0, clock=clock)
+    cache.put('bad', {'active': False})
+    assert cache.get('bad') == {'active': False}
+    clock.now += 3
+    assert cache.get('bad') is None
+
+    disabled = IntrospectionCache(negative_ttl=0, clock=clock)
+    disabled.put('bad', {'active': False})
+    assert disabled.get('bad') is None
+
+
+def test_lru_eviction_and_invalidate():
+    """Test the entry bound, invalidation and that results are copies."""
+    cache = IntrospectionCache(max_entries=2)
+    for token in ('a', 'b', 'c'):
+        cache.put(token, {'active': True})
+    assert cache.get('a') is None
+    assert len(cache) == 2
+
+    cache.get('b')['active'] = False
+    assert cache.get('b')['active'] is True
+
+    assert cache.invalidate('b') is True
+    assert cache.invalidate('b') is False
+    assert cache.get('b') is None
+
+
+@pytest.mark.asyncio
+async def test_client_serves_repeated_tokens_from_cache():
+    """Test that only the first introspection of a token reaches the server."""
+    local = URLValidator(blocked_networks=())
+    async with StandInServer() as server:
+        async with AuthAgentClient(
+            DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+            url_validator=local, introspection_cache=IntrospectionCache()
+        ) as client, AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=local) as sdk:
+            url, verifier, _ = client.get_authorization_url()
+            status = await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.01))
+            tokens = await client.exchange_code_for_tokens(status['code'], verifier)
+            token = tokens['access_token']
+
+            for _ in range(5):
+                assert (await client.introspect_token(token))['active'] is True
+            assert server.stats.requests['/introspect'] == 1
+
+            for _ in range(3):
+                assert (await client.introspect_token('unknown'))['active'] is False
+            assert server.stats.requests['/introspect'] == 2
+
+            await client.introspect_token(token, use_cache=False)
+            assert server.stats.requests['/introspect'] == 3
+
+            client.invalidate_token(token)
+            await client.introspect_token(token)
+            assert server.stats.requests['/introspect'] == 4
@@ -0,0 +1,239 @@
+"""
+Tests for the ASGI and WSGI bearer-token middleware
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from auth_agent_sdk.agent import AuthAgentSDK, FixedPoll
+from auth_agent_sdk.client import AuthAgentClient, AuthAgentASGIMiddleware, AuthAgentWSGIMiddleware, IntrospectionCache
+from auth_agent_sdk.client.middleware import bearer_token
+from auth_agent_sdk.common.retry import RetryOptions
+from auth_agent_sdk.common.validation import URLValidator
+from auth_agent_sdk.testing import (
+    StandInServer,
+    encode_jwt,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+)
+
+LOCAL = URLValidator(blocked_networks=())
+ISSUER = 'https://auth.auth-agent.com'
+SECRET = 'test-secret'
+
+
+def _token(**overrides):
+    now = int(time.time())
+    claims = {
+        'sub': 'agent_1',
+        'client_id': 'client_1',
+        'model': 'gpt-4',
+        'scope': 'openid profile',
+        'iss': ISSUER,
+        'iat': now,
+        'exp': now + 3600,
+    }
+    claims.update(overrides)
+    return encode_jwt(claims, SECRET)
+
+
+def _local_client():
+    return AuthAgentClient('client_1', 'https://example.com/callback', jwt_secret=SECRET)
+
+
+async def _asgi_app(scope, receive, send):
+    body = json.dumps(scope.get('auth_agent')).encode()
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _call_asgi(app, path='/', authorization=None):
+    headers = [(b'authorization', authorization.encode())] if authorization else []
+    scope = {'type': 'http', 'path': path, 'headers': headers}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start, body = messages
+    return start['status'], dict(start['headers']), json.loads(body['body'])
+
+
+def _wsgi_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'application/json')])
+    return [json.dumps(environ.get('auth_agent')).encode()]
+
+
+def _call_wsgi(app, path='/', authorization=None):
+    environ = {'PATH_INFO': path}
+    if authorization:
+        environ['HTTP_AUTHORIZATION'] = authorization
+    status = []
+    body = b''.join(app(environ, lambda s, headers: status.append((s, dict(headers)))))
+    return status[0][0], status[0][1], json.loads(body)
+
+
+@pytest.mark.parametrize('header,expected', [
+    ('Bearer abc', 'abc'),
+    ('bearer   abc ', 'abc'),
+    ('Basic abc', None),
+    ('Bearer', None),
+    (None, None),
+])
+def test_bearer_token(header, expected):
+    """Test Authorization header parsing."""
+    assert bearer_token(header) == expected
+
+
+def test_middleware_uses_client_cache():
+    """Test that the client's (still empty) introspection cache is shared."""
+    cache = IntrospectionCache()
+    client = AuthAgentClient('client_1', 'https://example.com/callback', introspection_cache=cache)
+    app = AuthAgentASGIMiddleware(_asgi_app, client)
+    assert app._auth.cache is cache
+
+
+@pytest.mark.asyncio
+async def test_asgi_attaches_principal():
+    """Test that a valid token reaches the app as a principal."""
+    timings = []
+    app = AuthAgentASGIMiddleware(_asgi_app, _local_client(), on_timing=lambda s, o: timings.append(o))
+    status, _, principal = await _call_asgi(app, authorization=f'Bearer {_token()}')
+    assert status == 200
+    assert principal['sub'] == principal['agent_id'] == 'agent_1'
+    assert principal['model'] == 'gpt-4'
+    assert timings == ['authenticated']
+    assert app.timings.count == 1
+
+
+@pytest.mark.asyncio
+async def test_asgi_rejects_missing_and_invalid_tokens():
+    """Test 401 responses and their WWW-Authenticate challenges."""
+    app = AuthAgentASGIMiddleware(_asgi_app, _local_client())
+    status, headers, body = await _call_asgi(app)
+    assert status == 401
+    assert headers[b'www-authenticate'] == b'Bearer'
+    assert body['error'] == 'invalid_request'
+
+    status, headers, body = await _call_asgi(app, authorization=f'Bearer {_token(exp=1)}')
+    assert status == 401
+    assert headers[b'www-authenticate'] == b'Bearer error="invalid_token"'
+    assert app.timings.outcomes == {'rejected': 2}
+
+
+@pytest.mark.asyncio
+async def test_asgi_optional_and_excluded_paths():
+    """Test that optional auth passes None and excluded paths skip checks."""
+    app = AuthAgentASGIMiddleware(_asgi_app, _local_client(), required=False, exclude_paths=['/health'])
+    assert await _call_asgi(app) == (200, {}, None)
+    status, _, _ = await _call_asgi(app, path='/health')
+    assert status == 200
+    assert app.timings.outcomes == {'rejected': 1, 'excluded': 1}
+
+
+@pytest.mark.asyncio
+async def test_asgi_unreachable_server_returns_503():
+    """Test that a failed introspection is reported as unavailable, not unauthorized."""
+    client = AuthAgentClient(
+        'client_1', 'https://example.com/callback', auth_server_url='http://127.0.0.1:9',
+        url_validator=LOCAL, retry_options=RetryOptions(max_retries=0)
+    )
+    async with client:
+        app = AuthAgentASGIMiddleware(_asgi_app, client)
+        status, _, body = await _call_asgi(app, authorization='Bearer opaque')
+    assert status == 503
+    assert body['error'] == 'temporarily_unavailable'
+    assert app.timings.outcomes == {'error': 1}
+
+
+def test_wsgi_attaches_principal_and_rejects():
+    """Test the WSGI middleware with local verification."""
+    app = AuthAgentWSGIMiddleware(_wsgi_app, _local_client())
+    status, _, principal = _call_wsgi(app, authorization=f'Bearer {_token()}')
+    assert status == '200 OK'
+    assert principal['agent_id'] == 'agent_1'
+
+    status, headers, body = _call_wsgi(app, authorization='Bearer not-a-jwt')
+    assert status == '401 Unauthorized'
+    assert headers['WWW-Authenticate'] == 'Bearer error="invalid_token"'
+    assert body['error'] == 'invalid_token'
+
+
+@pytest.mark.asyncio
+async def test_introspection_results_are_cached():
+    """Test that repeated requests with one token introspect once, for ASGI and WSGI."""
+    async with StandInServer() as server:
+        async with AuthAgentClient(
+            DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+            url_validator=LOCAL
+        ) as client, AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=LOCAL) as sdk:
+            url, verifier, _ = client.get_authorization_url()
+            status = await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.01))
+            token = (await client.exchange_code_for_tokens(status['code'], verifier))['access_token']
+
+            asgi = AuthAgentASGIMiddleware(_asgi_app, client)
+            for _ in range(5):
+                code, _, principal = await _call_asgi(asgi, authorization=f'Bearer {token}')
+                assert code == 200
+                assert principal['sub'] == DEFAULT_AGENT_ID
+            assert server.stats.requests['/introspect'] == 1
+
+            wsgi = AuthAgentWSGIMiddleware(_wsgi_app, client)
+            for _ in range(3):
+                code, _, principal = await asyncio.to_thread(_call_wsgi, wsgi, '/', f'Bearer {token}')
+                assert code == '200 OK'
+                assert principal['client_id'] == DEFAULT_CLIENT_ID
+            assert server.stats.requests['/introspect'] == 2
+
+
+@pytest.mark.asyncio
+async def test_excluded_paths_match_on_segment_boundaries():
+    """Test that an excluded prefix covers its subpaths but not longer names."""
+    app = AuthAgentASGIMiddleware(_asgi_app, _local_client(), exclude_paths=['/health', '/static/'])
+    for path in ('/health', '/health/live', '/static', '/static/app.js'):
+        status, _, _ = await _call_asgi(app, path=path)
+        assert status == 200, path
+    for path in ('/healthz', '/health-admin', '/staticfiles'):
+        status, _, _ = await _call_asgi(app, path=path)
+        assert status == 401, path
+
+
+@pytest.mark.asyncio
+async def test_check_revocation_bypasses_cache():
+    """Test that check_revocation asks the server every time and sees revocations made elsewhere."""
+    async with StandInServer() as server:
+        async with AuthAgentClient(
+            DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+            url_validator=LOCAL, introspection_cache=IntrospectionCache()
+        ) as client, AuthAgentClient(
+            DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+            url_validator=LOCAL
+        ) as other, AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=LOCAL) as sdk:
+            url, verifier, _ = client.get_authorization_url()
+            status = await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.01))
+            token = (await client.exchange_code_for_tokens(status['code'], verifier))['access_token']
+
+            asgi = AuthAgentASGIMiddleware(_asgi_app, client, check_revocation=True)
+            for _ in range(3):
+                code, _, _ = await _call_asgi(asgi, authorization=f'Bearer {token}')
+                assert code == 200
+            assert server.stats.requests['/introspect'] == 3
+
+            # Revoked through another client, so this client's cache still holds the token
+            await other.revoke_token(token)
+            code, _, body = await _call_asgi(asgi, authorization=f'Bearer {token}')
+            assert code == 401
+            assert body['error'] == 'invalid_token'
+
+            wsgi = AuthAgentWSGIMiddleware(_wsgi_app, client, check_revocation=True)
+            code, _, _ = await asyncio.to_thread(_call_wsgi, wsgi, '/', f'Bearer {token}')
+            assert code == '401 Unauthorized'
@@ -0,0 +1,170 @@
+"""
+Tests for pending sign-in storage and complete_callback
+"""
+
+import threading
+
+import pytest
+
+from auth_agent_sdk.agent import AuthAgentSDK, FixedPoll
+from auth_agent_sdk.client import AuthAgentClient, MemoryPendingAuthStore, SQLitePendingAuthStore
+from auth_agent_sdk.common.errors import AuthAgentSecurityError, AuthAgentValidationError
+from auth_agent_sdk.common.validation import URLValidator
+from auth_agent_sdk.testing import (
+    StandInServer,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+)
+
+LOCAL = URLValidator(blocked_networks=())
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_store_pop_is_single_use():
+    """Test that a state can be completed only once."""
+    store = MemoryPendingAuthStore()
+    store.put('state_1', 'verifier_1')
+    assert store.pop('state_1').code_verifier == 'verifier_1'
+    assert store.pop('state_1') is None
+    assert store.pop('unknown') is None
+    assert len(store) == 0
+
+
+def test_memory_store_expires_entries():
+    """Test that the time wheel drops entries once their TTL has passed."""
+    clock = FakeClock()
+    store = MemoryPendingAuthStore(ttl=10.0, resolution=1.0, clock=clock)
+    store.put('old', 'v_old')
+    clock.now += 5.0
+    store.put('new', 'v_new')
+
+    clock.now += 5.5
+    assert store.pop('old') is None
+    assert len(store) == 1
+    assert store.expired == 1
+
+    clock.now += 5.0
+    store.put('other', 'v_other')
+    assert store.pop('new') is None
+    assert store.expired == 2
+
+
+def test_memory_store_never_expires_early():
+    """Test that entries survive until just before their TTL."""
+    clock = FakeClock(now=1_000_000.9)
+    store = MemoryPendingAuthStore(ttl=10.0, resolution=1.0, clock=clock)
+    store.put('state', 'verifier')
+    clock.now += 9.9
+    assert store.pop('state').code_verifier == 'verifier'
+
+
+def test_memory_store_long_idle_clears_everything():
+    """Test that advancing past a full wheel turn expires all entries."""
+    clock = FakeClock()
+    store = MemoryPendingAuthStore(ttl=5.0, clock=clock)
+    for i in range(100):
+        store.put(f'state_{i}', 'verifier')
+    clock.now += 3600.0
+    store.put('fresh', 'verifier')
+    assert len(store) == 1
+    assert store.expired == 100
+
+
+def test_memory_store_is_bounded():
+    """Test that a full store evicts the entries closest to expiry."""
+    clock = FakeClock()
+    store = MemoryPendingAuthStore(ttl=60.0, max_entries=3, clock=clock)
+    store.put('a', '1')
+    clock.now += 2.0
+    store.put('b', '2')
+    store.put('c', '3')
+    store.put('d', '4')
+    assert len(store) == 3
+    assert store.evicted == 1
+    assert store.pop('a') is None
+    assert store.pop('d').code_verifier == '4'
+
+
+def test_sqlite_store_round_trip(tmp_path):
+    """Test put, pop and expiry in the SQLite store."""
+    clock = FakeClock()
+    store = SQLitePendingAuthStore(str(tmp_path / 'pending.db'), ttl=10.0, clock=clock)
+    try:
+        store.put('state_1', 'verifier_1')
+        store.put('state_2', 'verifier_2')
+        assert len(store) == 2
+        assert store.pop('state_1').code_verifier == 'verifier_1'
+        assert store.pop('state_1') is None
+
+        clock.now += 11.0
+        assert store.pop('state_2') is None
+    finally:
+        store.close()
+
+
+def test_sqlite_store_shared_between_instances(tmp_path):
+    """Test that stores opened on one file see each other's entries exactly once."""
+    path = str(tmp_path / 'pending.db')
+    writer = SQLitePendingAuthStore(path)
+    reader = SQLitePendingAuthStore(path)
+    try:
+        for i in range(50):
+            writer.put(f'state_{i}', f'verifier_{i}')
+
+        results = []
+
+        def consume(store):
+            for i in range(50):
+                pending = store.pop(f'state_{i}')
+                if pending is not None:
+                    results.append(pending.code_verifier)
+
+        threads = [threading.Thread(target=consume, args=(store,)) for store in (writer, reader, reader)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(results) == sorted(f'verifier_{i}' for i in range(50))
+    finally:
+        writer.close()
+        reader.close()
+
+
+@pytest.mark.asyncio
+async def test_complete_callback_requires_store():
+    """Test that complete_callback needs a configured store."""
+    client = AuthAgentClient('test_client', 'https://example.com/callback')
+    with pytest.raises(AuthAgentValidationError):
+        await client.complete_callback('state', 'code')
+
+
+@pytest.mark.asyncio
+async def test_complete_callback_against_stand_in():
+    """Test a full sign-in completed by state, and that replays are rejected."""
+    store = MemoryPendingAuthStore()
+    async with StandInServer() as server:
+        async with AuthAgentClient(
+            DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+            url_validator=LOCAL, pending_auth_store=store
+        ) as client, AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=LOCAL) as sdk:
+            url, _, state = client.get_authorization_url()
+            assert len(store) == 1
+            status = await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.01))
+            assert status['state'] == state
+
+            tokens = await client.complete_callback(state, status['code'])
+            assert 'access_token' in tokens
+            assert len(store) == 0
+
+            with pytest.raises(AuthAgentSecurityError):
+                await client.complete_callback(state, status['code'])
+            assert server.stats.requests['/token'] == 1
@@ -0,0 +1,112 @@
+"""
+Tests for the pre-generated PKCE pool
+"""
+
+import base64
+import hashlib
+import time
+from urllib.parse import parse_qs, urlparse
+
+from auth_agent_sdk.client import AuthAgentClient, PKCEPool
+from auth_agent_sdk.client.pkce_pool import generate_pkce_triple
+
+
+def _challenge(verifier):
+    digest = hashlib.sha256(verifier.encode('ascii')).digest()
+    return base64.urlsafe_b64encode(digest).decode('ascii').rstrip('=')
+
+
+def test_generate_triple_is_valid_s256():
+    """Test that generated triples carry a matching S256 challenge."""
+    verifier, challenge, state = generate_pkce_triple()
+    assert 43 <= len(verifier) <= 128
+    assert challenge == _challenge(verifier)
+    assert len(state) > 20
+
+
+def test_pool_hands_out_each_triple_once():
+    """Test that triples taken from the pool are unique."""
+    pool = PKCEPool(size=64)
+    pool.fill()
+    assert len(pool) == 64
+    try:
+        triples = [pool.take() for _ in range(200)]
+    finally:
+        pool.close()
+    assert len({t[0] for t in triples}) == 200
+    assert len({t[2] for t in triples}) == 200
+
+
+def test_pool_falls_back_when_empty():
+    """Test that an empty pool generates in line and counts a miss."""
+    pool = PKCEPool(size=8)
+    try:
+        verifier, challenge, _ = pool.take()
+    finally:
+        pool.close()
+    assert pool.misses == 1
+    assert challenge == _challenge(verifier)
+
+
+def test_pool_refills_in_background():
+    """Test that the refill thread tops the pool up after it runs low."""
+    pool = PKCEPool(size=32, refill_below=16)
+    pool.fill()
+    try:
+        for _ in range(20):
+            pool.take()
+        deadline = time.monotonic() + 5.0
+        while len(pool) < 32 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(pool) == 32
+    finally:
+        pool.close()
+    assert len(pool) == 0
+
+
+def test_client_uses_pool():
+    """Test that get_authorization_url takes its verifier and state from the pool."""
+    pool = PKCEPool(size=4)
+    pool.fill()
+    client = AuthAgentClient(
+        client_id='test_client',
+        redirect_uri='https://example.com/callback',
+        pkce_pool=pool
+    )
+    try:
+        auth_url, code_verifier, state = client.get_authorization_url()
+    finally:
+        pool.close()
+
+    assert pool.misses == 0
+    query = parse_qs(urlparse(auth_url).query)
+    assert query['client_id'] == ['test_client']
+    assert query['redirect_uri'] == ['https://example.com/callback']
+    assert query['response_type'] == ['code']
+    assert query['code_challenge_method'] == ['S256']
+    assert query['state'] == [state]
+    assert query['code_challenge'] == [_challenge(code_verifier)]
+
+
+def test_authorization_url_quotes_caller_state():
+    """Test that a caller-supplied state is URL-encoded and returned unchanged."""
+    client = AuthAgentClient(
+        client_id='test_client',
+        redirect_uri='https://example.com/callback'
+    )
+    auth_url, _, state = client.get_authorization_url(state='a b&c=d')
+    assert state == 'a b&c=d'
+    assert parse_qs(urlparse(auth_url).query)['state'] == ['a b&c=d']
+
+
+def test_authorization_url_prefix_follows_redirect_uri():
+    """Test that changing redirect_uri rebuilds the cached URL prefix."""
+    client = AuthAgentClient(
+        client_id='test_client',
+        redirect_uri='https://example.com/callback'
+    )
+    first, _, _ = client.get_authorization_url()
+    client.redirect_uri = 'https://example.com/other'
+    second, _, _ = client.get_authorization_url()
+    assert parse_qs(urlparse(first).query)['redirect_uri'] == ['https://example.com/callback']
+    assert parse_qs(urlparse(second).query)['redirect_uri'] == ['https://example.com/other']
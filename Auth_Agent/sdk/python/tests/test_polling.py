@@ -0,0 +1,96 @@
+"""
+Tests for polling schedules
+"""
+
+import random
+import time
+import pytest
+from auth_agent_sdk.agent import AuthAgentSDK
+from auth_agent_sdk.agent.polling import (
+    FixedPoll,
+    ExponentialPoll,
+    JitteredPoll,
+    FastThenSlowPoll,
+)
+
+
+def test_fixed_poll():
+    """Test fixed interval."""
+    strategy = FixedPoll(0.5)
+    assert [strategy.delay(i) for i in range(3)] == [0.5, 0.5, 0.5]
+
+
+def test_exponential_poll_capped():
+    """Test exponential growth stops at the cap."""
+    strategy = ExponentialPoll(initial=0.1, multiplier=2.0, max_interval=0.5)
+    assert [strategy.delay(i) for i in range(5)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+    assert strategy.delay(10_000) == 0.5
+
+
+def test_jittered_poll_within_bounds():
+    """Test jitter stays within the configured fraction."""
+    strategy = JitteredPoll(FixedPoll(1.0), jitter=0.2, rng=random.Random(42))
+    delays = [strategy.delay(0) for _ in range(100)]
+    assert all(0.8 <= d <= 1.2 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_fast_then_slow_poll():
+    """Test fast polls first, then exponential back-off."""
+    strategy = FastThenSlowPoll(fast_interval=0.05, fast_polls=3, slow_interval=0.25, max_interval=1.0)
+    delays = [strategy.delay(i) for i in range(7)]
+    assert delays == [0.05, 0.05, 0.05, 0.25, 0.5, 1.0, 1.0]
+
+
+def test_next_delay_clamped_to_deadline():
+    """Test the final sleep never exceeds the remaining time."""
+    strategy = FixedPoll(5.0)
+    assert strategy.next_delay(0, 0.2) == 0.2
+    assert strategy.next_delay(0, -1.0) == 0.0
+
+
+def test_wait_for_authentication_does_not_overshoot():
+    """Test the sync wait honors the deadline even with a long interval."""
+    sdk = AuthAgentSDK(agent_id='agent_123', agent_secret='secret_123', model='gpt-4')
+    calls = []
+    sdk.check_status = lambda request_id, url, deadline=None: calls.append(1) or {'status': 'pending'}
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        sdk.wait_for_authentication('req_1', 'https://auth.example.com', poll_interval=10.0, timeout=0.2)
+    assert time.monotonic() - start < 1.0
+    # One poll up front and a final poll at the deadline
+    assert len(calls) == 2
+
+
+def test_wait_for_authentication_with_strategy():
+    """Test a custom strategy drives the sync wait."""
+    sdk = AuthAgentSDK(agent_id='agent_123', agent_secret='secret_123', model='gpt-4')
+    statuses = iter([{'status': 'pending'}] * 3 + [{'status': 'authenticated', 'code': 'ac_1'}])
+    sdk.check_status = lambda request_id, url, deadline=None: next(statuses)
+
+    start = time.monotonic()
+    status = sdk.wait_for_authentication(
+        'req_1', 'https://auth.example.com', poll_strategy=FastThenSlowPoll(fast_interval=0.01)
+    )
+    assert status['code'] == 'ac_1'
+    assert time.monotonic() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_wait_for_authentication_async_does_not_overshoot():
+    """Test the async wait honors the deadline even with a long interval."""
+    calls = []
+
+    async def check_status(request_id, url, deadline=None):
+        calls.append(1)
+        return {'status': 'pending'}
+
+    async with AuthAgentSDK(agent_id='agent_123', agent_secret='secret_123', model='gpt-4') as sdk:
+        sdk.check_status_async = check_status
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            await sdk.wait_for_authentication_async(
+                'req_1', 'https://auth.example.com', poll_interval=10.0, timeout=0.2
+            )
+        assert time.monotonic() - start < 1.0
@@ -5,9 +5,32 @@ No mocks - testing real behavior
 
 import pytest
 import asyncio
+import random
 import time
-from auth_agent_sdk.common.retry import retry_with_backoff, retry_with_backoff_async, RetryOptions
-from auth_agent_sdk.common.errors import AuthAgentTimeoutError, AuthAgentNetworkError
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from auth_agent_sdk.agent import AuthAgentSDK
+from auth_agent_sdk.client import AuthAgentClient
+from auth_agent_sdk.common.retry import (
+    retry_with_backoff,
+    retry_with_backoff_async,
+    RetryOptions,
+    RetryBudget,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    ExponentialBackoff,
+    FullJitterBackoff,
+    EqualJitterBackoff,
+    DecorrelatedJitterBackoff,
+    parse_retry_after,
+)
+from auth_agent_sdk.common.errors import (
+    AuthAgentTimeoutError,
+    AuthAgentNetworkError,
+    AuthAgentRetryBudgetError,
+    AuthAgentCircuitOpenError,
+)
+from auth_agent_sdk.common.validation import URLValidator
 
 
 def test_retry_success_first_attempt():
@@ -157,3 +180,405 @@ async def test_retry_async_timeout():
     with pytest.raises(AuthAgentTimeoutError):
         await retry_with_backoff_async(fn, RetryOptions(timeout=0.1, max_retries=0))
 
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_retry_budget_reserve_and_ratio():
+    """Test that retries are capped by the reserve plus a share of successes."""
+    clock = FakeClock()
+    budget = RetryBudget(ratio=0.5, min_retries_per_second=0.2, window=10.0, clock=clock)
+    assert [budget.try_acquire() for _ in range(3)] == [True, True, False]
+    for _ in range(4):
+        budget.record_success()
+    assert [budget.try_acquire() for _ in range(3)] == [True, True, False]
+    assert budget.rejected == 2
+
+
+def test_retry_budget_window_slides():
+    """Test that old retries stop counting once they leave the window."""
+    clock = FakeClock()
+    budget = RetryBudget(ratio=0.0, min_retries_per_second=0.1, window=10.0, clock=clock)
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+    clock.now += 5.0
+    assert not budget.try_acquire()
+    clock.now += 5.5
+    assert budget.try_acquire()
+    clock.now += 100.0
+    assert budget.available == 1.0
+
+
+def test_retry_options_have_no_budget_by_default():
+    """Test that retries are unbudgeted unless a budget is passed in."""
+    assert RetryOptions().retry_budget is None
+    calls = [0]
+
+    def fn():
+        calls[0] += 1
+        raise ConnectionError('server down')
+
+    with pytest.raises(AuthAgentNetworkError) as excinfo:
+        retry_with_backoff(fn, RetryOptions(max_retries=3, initial_delay=0.001))
+    assert not isinstance(excinfo.value, AuthAgentRetryBudgetError)
+    assert calls[0] == 4
+
+
+def test_sdk_and_client_opt_in_to_budget():
+    """Test that retry_budget attaches to a copy of the caller's options."""
+    budget = RetryBudget()
+    options = RetryOptions(max_retries=5)
+    sdk = AuthAgentSDK('agent', 'secret', 'gpt-4', retry_options=options, retry_budget=budget)
+    client = AuthAgentClient('client', 'https://app.example.com/callback', retry_options=options,
+                             retry_budget=budget)
+    try:
+        assert sdk.retry_options.retry_budget is budget
+        assert client.retry_options.retry_budget is budget
+        assert sdk.retry_options.max_retries == 5
+        assert options.retry_budget is None
+    finally:
+        sdk.close()
+        client.close()
+
+
+def test_retry_budget_fails_fast():
+    """Test that an exhausted budget raises instead of sleeping."""
+    budget = RetryBudget(ratio=0.0, min_retries_per_second=0.1, window=10.0)
+    opts = RetryOptions(max_retries=3, initial_delay=10.0, retry_budget=budget)
+    budget.try_acquire()
+
+    def fn():
+        raise ConnectionError('server down')
+
+    start = time.time()
+    with pytest.raises(AuthAgentRetryBudgetError) as excinfo:
+        retry_with_backoff(fn, opts)
+    assert time.time() - start < 1.0
+    assert isinstance(excinfo.value, AuthAgentNetworkError)
+    assert excinfo.value.code == 'RETRY_BUDGET_EXHAUSTED'
+    assert isinstance(excinfo.value.original_error, ConnectionError)
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_shared_across_async_calls():
+    """Test that concurrent calls sharing options share one budget."""
+    budget = RetryBudget(ratio=0.0, min_retries_per_second=0.2, window=10.0)
+    opts = RetryOptions(max_retries=5, initial_delay=0.001, retry_budget=budget)
+    attempts = [0]
+
+    async def fn():
+        attempts[0] += 1
+        raise ConnectionError('server down')
+
+    results = await asyncio.gather(*(retry_with_backoff_async(fn, opts) for _ in range(10)), return_exceptions=True)
+    assert all(isinstance(r, AuthAgentNetworkError) for r in results)
+    # 10 first attempts plus the 2 retries the budget allows
+    assert attempts[0] == 12
+    assert sum(isinstance(r, AuthAgentRetryBudgetError) for r in results) == 10
+
+
+def test_successful_calls_refill_budget():
+    """Test that successful calls earn retries back."""
+    budget = RetryBudget(ratio=1.0, min_retries_per_second=0.0, window=10.0)
+    opts = RetryOptions(max_retries=1, initial_delay=0.001, retry_budget=budget)
+    calls = [0]
+
+    def flaky():
+        calls[0] += 1
+        if calls[0] % 2 == 0:
+            raise ConnectionError('blip')
+        return 'ok'
+
+    assert retry_with_backoff(flaky, opts) == 'ok'
+    assert retry_with_backoff(flaky, opts) == 'ok'
+    assert budget.rejected == 0
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    """Test closed -> open -> half-open -> closed with one probe."""
+    clock = FakeClock()
+    changes = []
+    breaker = CircuitBreaker(
+        'https://auth.example.com', failure_threshold=3, reset_timeout=30.0,
+        on_state_change=lambda name, old, new: changes.append((old, new)), clock=clock
+    )
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(AuthAgentCircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == 30.0
+
+    clock.now += 30.0
+    breaker.before_call()
+    assert breaker.state == 'half_open'
+    # Only one probe while half-open
+    with pytest.raises(AuthAgentCircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert changes == [('closed', 'open'), ('open', 'half_open'), ('half_open', 'closed')]
+
+
+def test_circuit_breaker_failed_probe_reopens():
+    """Test that a failing half-open probe opens the breaker again."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5.0, clock=clock)
+    breaker.record_failure()
+    clock.now += 5.0
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    clock.now += 4.0
+    with pytest.raises(AuthAgentCircuitOpenError):
+        breaker.before_call()
+
+
+def test_circuit_breaker_failure_rate():
+    """Test that a failure share over the window opens the breaker."""
+    breaker = CircuitBreaker(failure_threshold=0, failure_rate=0.5, window_size=10, min_calls=10)
+    for i in range(9):
+        breaker.record_failure() if i % 2 else breaker.record_success()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+
+def test_retry_stops_when_breaker_opens():
+    """Test that retries fail fast once the breaker opens mid-call."""
+    breaker = CircuitBreaker(failure_threshold=2)
+    calls = [0]
+
+    def fn():
+        calls[0] += 1
+        raise ConnectionError('down')
+
+    with pytest.raises(AuthAgentCircuitOpenError):
+        retry_with_backoff(fn, RetryOptions(max_retries=5, initial_delay=0.001), breaker)
+    assert calls[0] == 2
+
+    start = time.perf_counter()
+    with pytest.raises(AuthAgentCircuitOpenError):
+        retry_with_backoff(fn, RetryOptions(max_retries=5, initial_delay=1.0), breaker)
+    assert time.perf_counter() - start < 0.1
+    assert calls[0] == 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_trip_breaker():
+    """Test that non-retryable answers count as the server being up."""
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    class BadRequest(Exception):
+        status_code = 400
+
+    async def fn():
+        raise BadRequest()
+
+    for _ in range(3):
+        with pytest.raises(BadRequest):
+            await retry_with_backoff_async(fn, RetryOptions(max_retries=2), breaker)
+    assert breaker.state == 'closed'
+
+
+def test_registry_keys_by_origin():
+    """Test that URLs on one origin share a breaker."""
+    registry = CircuitBreakerRegistry(failure_threshold=2)
+    breaker = registry.get('https://Auth.example.com/token')
+    assert registry.get('https://auth.example.com/introspect') is breaker
+    assert registry.get('https://other.example.com/token') is not breaker
+    assert breaker.failure_threshold == 2
+    assert len(registry) == 2
+
+
+@pytest.mark.asyncio
+async def test_sdk_fails_fast_when_server_is_down():
+    """Test that an unreachable auth server opens the SDK's breaker for that origin."""
+    local = URLValidator(blocked_networks=())
+    breakers = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=60.0)
+    async with AuthAgentSDK(
+        'agent_1', 'secret_1', 'gpt-4', url_validator=local, circuit_breakers=breakers,
+        retry_options=RetryOptions(max_retries=0)
+    ) as sdk:
+        url = 'http://127.0.0.1:9/authorize'
+        for _ in range(2):
+            with pytest.raises(Exception):
+                await sdk.check_status_async('req_1', url)
+        assert breakers.get(url).state == 'open'
+
+        start = time.perf_counter()
+        with pytest.raises(AuthAgentCircuitOpenError):
+            await sdk.check_status_async('req_1', url)
+        assert time.perf_counter() - start < 0.05
+
+
+@pytest.mark.asyncio
+async def test_introspection_outage_opens_breaker():
+    """Test that 503s from the introspection endpoint count as failures and open the breaker."""
+    calls = [0]
+
+    async def introspect(request):
+        calls[0] += 1
+        return web.Response(text='<html>busy</html>', status=503, content_type='text/html')
+
+    app = web.Application()
+    app.router.add_post('/introspect', introspect)
+    server = TestServer(app)
+    await server.start_server()
+    base_url = str(server.make_url('')).rstrip('/')
+    breakers = CircuitBreakerRegistry(failure_threshold=3, reset_timeout=60.0)
+    try:
+        async with AuthAgentClient(
+            'client_1', 'http://localhost:3000/callback', 'secret', base_url,
+            url_validator=URLValidator(blocked_networks=()), circuit_breakers=breakers,
+            retry_options=RetryOptions(max_retries=0)
+        ) as client:
+            for _ in range(3):
+                with pytest.raises(AuthAgentNetworkError) as info:
+                    await client.introspect_token('at_1')
+                assert info.value.original_error.status_code == 503
+            assert breakers.get(base_url).state == 'open'
+            with pytest.raises(AuthAgentCircuitOpenError):
+                await client.introspect_token('at_1')
+    finally:
+        await server.close()
+
+    assert calls[0] == 3
+
+
+@pytest.mark.parametrize('strategy,low,high', [
+    (ExponentialBackoff(), 4.0, 4.0),
+    (FullJitterBackoff(random.Random(1)), 0.0, 4.0),
+    (EqualJitterBackoff(random.Random(1)), 2.0, 4.0),
+])
+def test_backoff_strategy_bounds(strategy, low, high):
+    """Test that each strategy stays within its range for the third retry."""
+    opts = RetryOptions(initial_delay=1.0, backoff_multiplier=2.0, max_delay=10.0)
+    delays = [strategy.delay(2, 2.0, opts) for _ in range(200)]
+    assert all(low <= d <= high for d in delays)
+
+
+def test_jittered_backoff_spreads_delays():
+    """Test that clients failing together do not retry together."""
+    opts = RetryOptions(initial_delay=1.0, max_delay=30.0)
+    for strategy in (FullJitterBackoff(random.Random(2)), DecorrelatedJitterBackoff(random.Random(2))):
+        delays = {round(strategy.delay(1, 1.0, opts), 3) for _ in range(100)}
+        assert len(delays) > 90
+
+
+def test_decorrelated_jitter_capped():
+    """Test that decorrelated jitter grows from the previous delay and respects max_delay."""
+    opts = RetryOptions(initial_delay=0.5, max_delay=5.0)
+    strategy = DecorrelatedJitterBackoff(random.Random(3))
+    previous = opts.initial_delay
+    for attempt in range(20):
+        delay = strategy.delay(attempt, previous, opts)
+        assert opts.initial_delay <= delay <= min(opts.max_delay, previous * 3)
+        previous = delay
+
+
+def test_parse_retry_after():
+    """Test delay-seconds and HTTP-date forms of Retry-After."""
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    now = 1_700_000_000.0
+    assert parse_retry_after('Tue, 14 Nov 2023 22:13:40 GMT', now=now) == 20.0
+    assert parse_retry_after('Tue, 14 Nov 2023 22:13:00 GMT', now=now) == 0.0
+
+
+def test_retry_after_overrides_backoff():
+    """Test that Retry-After replaces the computed delay, capped by max_delay."""
+    class RateLimited(Exception):
+        status_code = 429
+
+        def __init__(self, retry_after):
+            super().__init__('slow down')
+            self.retry_after = retry_after
+
+    calls = [0]
+
+    def fn():
+        calls[0] += 1
+        if calls[0] == 1:
+            raise RateLimited(0.0)
+        if calls[0] == 2:
+            raise RateLimited(3600.0)
+        return 'ok'
+
+    start = time.perf_counter()
+    assert retry_with_backoff(fn, RetryOptions(max_retries=2, initial_delay=5.0, max_delay=0.05)) == 'ok'
+    assert time.perf_counter() - start < 1.0
+
+
+@pytest.mark.asyncio
+async def test_check_status_honours_retry_after():
+    """Test that a 503 with Retry-After from check-status is retried after the server's delay."""
+    calls = []
+
+    async def check_status(request):
+        calls.append(time.perf_counter())
+        if len(calls) == 1:
+            return web.json_response({'error': 'busy'}, status=503, headers={'Retry-After': '0'})
+        return web.json_response({'status': 'pending'})
+
+    app = web.Application()
+    app.router.add_get('/api/check-status', check_status)
+    server = TestServer(app)
+    await server.start_server()
+    base_url = str(server.make_url('')).rstrip('/')
+    try:
+        async with AuthAgentSDK(
+            'agent_1', 'secret_1', 'gpt-4', url_validator=URLValidator(blocked_networks=()),
+            retry_options=RetryOptions(max_retries=2, initial_delay=5.0)
+        ) as sdk:
+            status = await sdk.check_status_async('req_1', f'{base_url}/authorize')
+    finally:
+        await server.close()
+
+    assert status['status'] == 'pending'
+    assert len(calls) == 2
+    assert calls[1] - calls[0] < 1.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('path', ['/introspect', '/token'])
+async def test_client_honours_retry_after(path):
+    """Test that introspection and the async token exchange retry a 503 after its Retry-After."""
+    calls = []
+
+    async def handler(request):
+        calls.append(time.perf_counter())
+        if len(calls) == 1:
+            return web.json_response({'error': 'busy'}, status=503, headers={'Retry-After': '1'})
+        return web.json_response({'active': True, 'access_token': 'at_1', 'token_type': 'Bearer'})
+
+    app = web.Application()
+    app.router.add_post(path, handler)
+    server = TestServer(app)
+    await server.start_server()
+    base_url = str(server.make_url('')).rstrip('/')
+    try:
+        async with AuthAgentClient(
+            'client_1', 'http://localhost:3000/callback', 'secret', base_url,
+            url_validator=URLValidator(blocked_networks=()),
+            retry_options=RetryOptions(max_retries=2, initial_delay=0.01)
+        ) as client:
+            if path == '/introspect':
+                result = await client.introspect_token('at_1')
+                assert result['active'] is True
+            else:
+                result = await client.exchange_code_for_tokens('code_1', 'verifier')
+                assert result['access_token'] == 'at_1'
+    finally:
+        await server.close()
+
+    assert len(calls) == 2
+    assert 0.9 <= calls[1] - calls[0] < 2.0
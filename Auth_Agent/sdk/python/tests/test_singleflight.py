@@ -0,0 +1,92 @@
+"""
+Tests for single-flight request deduplication
+"""
+
+import asyncio
+
+import pytest
+
+from auth_agent_sdk.agent import AuthAgentSDK
+from auth_agent_sdk.client import AuthAgentClient
+from auth_agent_sdk.common.singleflight import SingleFlight
+from auth_agent_sdk.common.validation import URLValidator
+from auth_agent_sdk.testing import (
+    StandInServer,
+    StandInConfig,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    """Test that identical keys run the call once and everyone gets the result."""
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {'value': 42}
+
+    results = await asyncio.gather(*(flights.do('key', fetch) for _ in range(10)))
+    assert len(calls) == 1
+    assert all(result == {'value': 42} for result in results)
+    assert flights.shared == 9
+    assert len(flights) == 0
+
+    await flights.do('key', fetch)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_exceptions_are_shared():
+    """Test that every waiter receives the shared exception."""
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError('boom')
+
+    results = await asyncio.gather(*(flights.do('key', fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_keeps_the_call():
+    """Test that a cancelled waiter does not cancel the shared request."""
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return 'done'
+
+    first = asyncio.ensure_future(flights.do('key', fetch))
+    second = asyncio.ensure_future(flights.do('key', fetch))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == 'done'
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_client_and_sdk_deduplicate_requests():
+    """Test that concurrent introspections and status checks hit the server once."""
+    local = URLValidator(blocked_networks=())
+    async with StandInServer(StandInConfig(latency=0.02)) as server:
+        async with AuthAgentClient(
+            DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+            url_validator=local
+        ) as client, AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=local) as sdk:
+            results = await asyncio.gather(*(client.introspect_token('tok') for _ in range(8)))
+            assert all(result == {'active': False} for result in results)
+            assert server.stats.requests['/introspect'] == 1
+
+            url, _, _ = client.get_authorization_url()
+            request_id = await sdk.extract_request_id_async(url)
+            statuses = await asyncio.gather(*(sdk.check_status_async(request_id, url) for _ in range(8)))
+            assert all(status['status'] == 'pending' for status in statuses)
+            assert server.stats.requests['/api/check-status'] == 1
@@ -0,0 +1,100 @@
+"""
+Tests for the in-process stand-in server
+"""
+
+import pytest
+
+from auth_agent_sdk.agent import AuthAgentSDK
+from auth_agent_sdk.agent.polling import FixedPoll
+from auth_agent_sdk.client import AuthAgentClient
+from auth_agent_sdk.common.retry import RetryOptions, CircuitBreakerRegistry
+from auth_agent_sdk.common.validation import URLValidator
+from auth_agent_sdk.testing import (
+    StandInServer,
+    StandInConfig,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+)
+
+REDIRECT_URI = 'http://localhost:3000/callback'
+LOCAL = URLValidator(blocked_networks=())
+
+
+def _client(server):
+    return AuthAgentClient(
+        DEFAULT_CLIENT_ID, REDIRECT_URI, DEFAULT_CLIENT_SECRET, server.url, url_validator=LOCAL
+    )
+
+
+def _sdk(**kwargs):
+    return AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=LOCAL, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_full_flow_against_stand_in():
+    """Test authorize, agent login, polling, token exchange and introspection end to end."""
+    async with StandInServer(StandInConfig(completion_delay=0.05)) as server:
+        async with _client(server) as client, _sdk() as sdk:
+            url, verifier, state = client.get_authorization_url()
+            status = await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.02))
+            assert status['state'] == state
+            assert status['redirect_uri'] == REDIRECT_URI
+
+            tokens = await client.exchange_code_for_tokens(status['code'], verifier)
+            assert tokens['token_type'] == 'Bearer'
+            assert tokens['access_token'].count('.') == 2
+
+            info = await client.introspect_token(tokens['access_token'])
+            assert info['active'] is True
+            assert info['sub'] == DEFAULT_AGENT_ID
+            assert info['model'] == 'gpt-4'
+
+            # Codes are single use
+            with pytest.raises(Exception):
+                await client.exchange_code_for_tokens(status['code'], verifier)
+
+        assert server.stats.requests['/api/check-status'] >= 2
+        assert server.stats.connections >= 1
+        assert server.stats.bytes_sent > server.stats.bytes_received > 0
+
+
+@pytest.mark.asyncio
+async def test_wrong_verifier_rejected():
+    """Test that PKCE is enforced."""
+    async with StandInServer() as server:
+        async with _client(server) as client, _sdk() as sdk:
+            url, verifier, _ = client.get_authorization_url()
+            status = await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.01))
+            with pytest.raises(Exception):
+                await client.exchange_code_for_tokens(status['code'], verifier[::-1])
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_retried():
+    """Test error injection and that the SDK retries injected 503s."""
+    config = StandInConfig(error_rate=0.5, error_paths={'/api/agent/authenticate'}, seed=7)
+    retry = RetryOptions(max_retries=10, initial_delay=0.001, max_delay=0.001)
+    # Runs of injected failures would otherwise open the circuit breaker
+    breakers = CircuitBreakerRegistry(failure_threshold=0)
+    async with StandInServer(config) as server:
+        async with _client(server) as client, _sdk(retry_options=retry, circuit_breakers=breakers) as sdk:
+            for _ in range(5):
+                url, _, _ = client.get_authorization_url()
+                await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.01))
+        assert server.stats.errors_injected > 0
+        assert server.stats.requests['/api/agent/authenticate'] == 5 + server.stats.errors_injected
+
+
+@pytest.mark.asyncio
+async def test_bad_agent_secret():
+    """Test that unknown credentials are rejected like production."""
+    async with StandInServer() as server:
+        async with _client(server) as client:
+            sdk = AuthAgentSDK(DEFAULT_AGENT_ID, 'wrong', 'gpt-4', url_validator=LOCAL)
+            url, _, _ = client.get_authorization_url()
+            request_id = await sdk.extract_request_id_async(url)
+            result = await sdk.authenticate_async(request_id, url)
+            assert result['success'] is False
+            await sdk.aclose()
@@ -0,0 +1,219 @@
+"""
+Tests for the multiplexed status poller
+"""
+
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from auth_agent_sdk.agent import AuthAgentSDK, StatusPoller
+from auth_agent_sdk.common.validation import URLValidator
+
+
+class FakeStatusServer:
+    """Serves pending statuses until a request_id is marked complete."""
+
+    def __init__(self):
+        self.calls = []
+        self.completed = {}
+
+    async def check_status(self, request_id, authorization_url, deadline=None):
+        self.calls.append(request_id)
+        await asyncio.sleep(0)
+        if request_id in self.completed:
+            return self.completed[request_id]
+        return {'status': 'pending'}
+
+    def complete(self, request_id):
+        self.completed[request_id] = {'status': 'authenticated', 'code': f'ac_{request_id}'}
+
+
+@pytest.mark.asyncio
+async def test_poller_resolves_when_authenticated():
+    """Test the waiter resolves with the final status."""
+    server = FakeStatusServer()
+    poller = StatusPoller(server.check_status)
+
+    task = asyncio.ensure_future(poller.wait('req_1', 'https://auth.example.com', poll_interval=0.01))
+    await asyncio.sleep(0.03)
+    server.complete('req_1')
+    status = await task
+
+    assert status['code'] == 'ac_req_1'
+    assert poller.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_poller_coalesces_duplicate_waits():
+    """Test concurrent waits on one request_id share a single poll stream."""
+    server = FakeStatusServer()
+    poller = StatusPoller(server.check_status)
+
+    waits = [
+        asyncio.ensure_future(poller.wait('req_1', 'https://auth.example.com', poll_interval=0.02))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0.05)
+    server.complete('req_1')
+    results = await asyncio.gather(*waits)
+
+    assert all(r['code'] == 'ac_req_1' for r in results)
+    # Five waiters for ~50ms at 20ms intervals would be ~15+ polls without coalescing
+    assert len(server.calls) <= 5
+
+
+@pytest.mark.asyncio
+async def test_poller_per_waiter_timeout():
+    """Test a short deadline expires without affecting other waiters."""
+    server = FakeStatusServer()
+    poller = StatusPoller(server.check_status)
+
+    short = asyncio.ensure_future(poller.wait('req_1', 'https://auth.example.com', poll_interval=0.01, timeout=0.02))
+    long = asyncio.ensure_future(poller.wait('req_1', 'https://auth.example.com', poll_interval=0.01, timeout=5.0))
+
+    with pytest.raises(TimeoutError):
+        await short
+    server.complete('req_1')
+    assert (await long)['status'] == 'authenticated'
+
+
+@pytest.mark.asyncio
+async def test_poller_cancelling_one_waiter_keeps_others():
+    """Test cancelling one waiter does not stop polling for the others."""
+    server = FakeStatusServer()
+    poller = StatusPoller(server.check_status)
+
+    first = asyncio.ensure_future(poller.wait('req_1', 'https://auth.example.com', poll_interval=0.01))
+    second = asyncio.ensure_future(poller.wait('req_1', 'https://auth.example.com', poll_interval=0.01))
+    await asyncio.sleep(0.02)
+    first.cancel()
+    await asyncio.sleep(0.02)
+    server.complete('req_1')
+
+    assert (await second)['code'] == 'ac_req_1'
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_poller_reports_errors():
+    """Test an error status fails every waiter."""
+    async def check_status(request_id, authorization_url, deadline=None):
+        return {'status': 'expired', 'error': 'Request expired'}
+
+    poller = StatusPoller(check_status)
+    with pytest.raises(RuntimeError, match='Request expired'):
+        await poller.wait('req_1', 'https://auth.example.com')
+
+
+@pytest.mark.asyncio
+async def test_poller_bounds_polls_per_second():
+    """Test the global poll rate cap across many request_ids."""
+    server = FakeStatusServer()
+    poller = StatusPoller(server.check_status, max_polls_per_second=100)
+
+    waits = [
+        asyncio.ensure_future(poller.wait(f'req_{i}', 'https://auth.example.com', poll_interval=0.001, timeout=0.1))
+        for i in range(50)
+    ]
+    await asyncio.gather(*waits, return_exceptions=True)
+
+    # 0.1s at 100 polls/s, plus scheduling slack
+    assert len(server.calls) <= 15
+    assert poller.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_poller_aclose_fails_waiters():
+    """Test closing the poller releases outstanding waiters."""
+    server = FakeStatusServer()
+    poller = StatusPoller(server.check_status)
+
+    task = asyncio.ensure_future(poller.wait('req_1', 'https://auth.example.com', poll_interval=0.01))
+    await asyncio.sleep(0.01)
+    await poller.aclose()
+
+    with pytest.raises(Exception, match='closed'):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_sdk_wait_uses_shared_poller():
+    """Test wait_for_authentication_async goes through the SDK's poller."""
+    server = FakeStatusServer()
+    server.complete('req_1')
+    updates = []
+
+    async with AuthAgentSDK(agent_id='agent_123', agent_secret='secret_123', model='gpt-4') as sdk:
+        sdk.check_status_async = server.check_status
+        status = await sdk.wait_for_authentication_async(
+            'req_1', 'https://auth.example.com', on_status_update=updates.append
+        )
+
+    assert status['code'] == 'ac_req_1'
+    assert updates == [status]
+    assert sdk.status_poller.polls_sent == 1
+
+
+@pytest.mark.asyncio
+async def test_sdk_poll_limits_are_configurable():
+    """Test the SDK passes its poll limits to the shared poller."""
+    server = FakeStatusServer()
+
+    async with AuthAgentSDK(
+        agent_id='agent_123', agent_secret='secret_123', model='gpt-4',
+        max_polls_in_flight=50, max_polls_per_second=100
+    ) as sdk:
+        assert sdk.status_poller.max_in_flight == 50
+        assert sdk.status_poller.max_polls_per_second == 100
+        sdk.check_status_async = server.check_status
+        waits = [
+            sdk.wait_for_authentication_async(f'req_{i}', 'https://auth.example.com', poll_interval=0.001, timeout=0.1)
+            for i in range(50)
+        ]
+        await asyncio.gather(*waits, return_exceptions=True)
+
+    # 0.1s at 100 polls/s, plus scheduling slack
+    assert len(server.calls) <= 15
+
+
+@pytest.mark.asyncio
+async def test_poller_passes_latest_waiter_deadline():
+    """Test each poll runs under the deadline of the longest-waiting waiter."""
+    seen = []
+
+    async def check_status(request_id, authorization_url, deadline=None):
+        seen.append(deadline.remaining())
+        return {'status': 'pending'}
+
+    poller = StatusPoller(check_status)
+    waits = [
+        asyncio.ensure_future(poller.wait('req_1', 'https://auth.example.com', poll_interval=0.01, timeout=timeout))
+        for timeout in (0.1, 0.3)
+    ]
+    await asyncio.gather(*waits, return_exceptions=True)
+    assert seen and all(remaining <= 0.3 for remaining in seen)
+    assert max(seen) > 0.1
+
+
+@pytest.mark.asyncio
+async def test_hung_poll_does_not_outlive_waiters():
+    """Test a status check that hangs is cut off at the waiter's deadline, freeing its slot."""
+    async def check_status(request):
+        await asyncio.sleep(5)
+        return web.json_response({'status': 'pending'})
+
+    app = web.Application()
+    app.router.add_get('/api/check-status', check_status)
+    server = TestServer(app)
+    await server.start_server()
+    base_url = str(server.make_url('')).rstrip('/')
+    try:
+        async with AuthAgentSDK(
+            'agent_1', 'secret_1', 'gpt-4', url_validator=URLValidator(blocked_networks=())
+        ) as sdk:
+            with pytest.raises(TimeoutError):
+                await sdk.wait_for_authentication_async('req_1', f'{base_url}/authorize', timeout=0.2)
+            await asyncio.sleep(0.1)
+            assert sdk.status_poller._in_flight == 0
+    finally:
+        await server.close()
@@ -0,0 +1,132 @@
+"""
+Tests for the token lifecycle manager
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from auth_agent_sdk.agent import AuthAgentSDK, FixedPoll
+from auth_agent_sdk.client import AuthAgentClient, TokenManager
+from auth_agent_sdk.common.errors import AuthAgentError
+from auth_agent_sdk.common.validation import URLValidator
+from auth_agent_sdk.testing import (
+    StandInServer,
+    StandInConfig,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+)
+
+LOCAL = URLValidator(blocked_networks=())
+
+
+class FakeClient:
+    def __init__(self, expires_in=3600, delay=0.0):
+        self.expires_in = expires_in
+        self.delay = delay
+        self.calls = 0
+
+    async def refresh_tokens(self, refresh_token):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {
+            'access_token': f'at_{self.calls}',
+            'refresh_token': f'rt_{self.calls}',
+            'expires_in': self.expires_in,
+        }
+
+
+@pytest.mark.asyncio
+async def test_valid_token_returned_without_refresh():
+    """Test that a fresh token is handed out immediately."""
+    client = FakeClient()
+    manager = TokenManager(client)
+    manager.add('user', {'access_token': 'at_0', 'refresh_token': 'rt_0', 'expires_in': 3600})
+    assert await manager.get_access_token('user') == 'at_0'
+    assert client.calls == 0
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_refresh_times_are_jittered():
+    """Test that tokens expiring together are refreshed at spread-out times."""
+    manager = TokenManager(FakeClient(), refresh_margin=60.0, refresh_jitter=30.0, rng=random.Random(1))
+    for i in range(50):
+        manager.add(i, {'access_token': 'at', 'refresh_token': 'rt', 'expires_in': 600})
+    whens = sorted(manager._entries[i].timer.when() for i in range(50))
+    spread = whens[-1] - whens[0]
+    assert 15.0 < spread <= 30.0
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_short_lived_tokens_do_not_refresh_in_a_loop():
+    """Test that a lifetime shorter than the refresh lead is refreshed halfway, not at once."""
+    client = FakeClient(expires_in=0.2)
+    manager = TokenManager(client, refresh_margin=60.0, refresh_jitter=30.0, min_validity=0.0)
+    manager.add('user', {'access_token': 'at_0', 'refresh_token': 'rt_0', 'expires_in': 0.2})
+    await asyncio.sleep(0.35)
+    # Refreshes at ~0.1s, ~0.2s, ~0.3s; without the cap this would be thousands
+    assert 1 <= client.calls <= 5
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_are_single_flight():
+    """Test that many callers of an expiring token trigger one refresh."""
+    client = FakeClient(delay=0.02)
+    manager = TokenManager(client, min_validity=10.0)
+    manager.add('user', {'access_token': 'at_0', 'refresh_token': 'rt_0', 'expires_in': 5})
+    tokens = await asyncio.gather(*(manager.get_access_token('user') for _ in range(10)))
+    assert set(tokens) == {'at_1'}
+    assert client.calls == 1
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_against_stand_in():
+    """Test proactive refresh with refresh-token rotation on the stand-in server."""
+    async with StandInServer(StandInConfig(access_token_ttl=2)) as server:
+        async with AuthAgentClient(
+            DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+            url_validator=LOCAL
+        ) as client, AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=LOCAL) as sdk:
+            url, verifier, _ = client.get_authorization_url()
+            status = await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.01))
+            tokens = await client.exchange_code_for_tokens(status['code'], verifier)
+
+            manager = TokenManager(client, refresh_margin=1.8, refresh_jitter=0.1, min_validity=0.0)
+            manager.add('user', tokens)
+            # The lead is capped at half the 2s lifetime
+            await asyncio.sleep(1.3)
+
+            assert manager.refreshes >= 1
+            refreshed = manager.get('user')
+            assert refreshed.access_token != tokens['access_token']
+            assert refreshed.refresh_token != tokens['refresh_token']
+            assert await manager.get_access_token('user') == refreshed.access_token
+            assert (await client.introspect_token(refreshed.access_token))['active'] is True
+            await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rejected_refresh_token_requires_login():
+    """Test that invalid_grant stops refreshing and reports a login is needed."""
+    async with StandInServer() as server:
+        async with AuthAgentClient(
+            DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+            url_validator=LOCAL
+        ) as client:
+            manager = TokenManager(client, min_validity=10.0)
+            manager.add('user', {'access_token': 'at', 'refresh_token': 'rt_unknown', 'expires_in': 5})
+
+            with pytest.raises(AuthAgentError):
+                await manager.get_access_token('user')
+            with pytest.raises(AuthAgentError) as excinfo:
+                await manager.get_access_token('user')
+            assert excinfo.value.code == 'LOGIN_REQUIRED'
+            assert server.stats.requests['/token'] == 1
+            await manager.aclose()
@@ -0,0 +1,105 @@
+"""
+Tests for local HS256 access-token verification
+"""
+
+import time
+
+import pytest
+
+from auth_agent_sdk.agent import AuthAgentSDK, FixedPoll
+from auth_agent_sdk.client import AuthAgentClient, LocalTokenVerifier
+from auth_agent_sdk.common.errors import AuthAgentSecurityError
+from auth_agent_sdk.common.validation import URLValidator
+from auth_agent_sdk.testing import (
+    StandInServer,
+    encode_jwt,
+    DEFAULT_CLIENT_ID,
+    DEFAULT_CLIENT_SECRET,
+    DEFAULT_AGENT_ID,
+    DEFAULT_AGENT_SECRET,
+    DEFAULT_JWT_SECRET,
+)
+
+ISSUER = 'https://auth.auth-agent.com'
+SECRET = 'test-secret'
+
+
+def _claims(**overrides):
+    now = int(time.time())
+    claims = {
+        'sub': 'agent_1',
+        'client_id': 'client_1',
+        'model': 'gpt-4',
+        'scope': 'openid profile',
+        'iss': ISSUER,
+        'iat': now,
+        'exp': now + 3600,
+    }
+    claims.update(overrides)
+    return claims
+
+
+@pytest.fixture
+def verifier():
+    return LocalTokenVerifier(SECRET, issuer=ISSUER, client_id='client_1', leeway=30.0)
+
+
+def test_valid_token(verifier):
+    """Test that a well-formed token verifies and returns its claims."""
+    claims = verifier.verify(encode_jwt(_claims(), SECRET))
+    assert claims['sub'] == 'agent_1'
+    assert claims['model'] == 'gpt-4'
+
+
+@pytest.mark.parametrize('token', [
+    'not-a-jwt',
+    encode_jwt(_claims(), 'other-secret'),
+    encode_jwt(_claims(exp=int(time.time()) - 60), SECRET),
+    encode_jwt(_claims(iat=int(time.time()) + 300), SECRET),
+    encode_jwt(_claims(iss='https://evil.example'), SECRET),
+    encode_jwt(_claims(client_id='client_2'), SECRET),
+    encode_jwt(_claims(aud='client_2'), SECRET),
+])
+def test_rejected_tokens(verifier, token):
+    """Test rejection of forged, expired and misdirected tokens."""
+    with pytest.raises(AuthAgentSecurityError):
+        verifier.verify(token)
+
+
+def test_clock_skew_tolerated(verifier):
+    """Test that small clock differences are accepted."""
+    now = int(time.time())
+    verifier.verify(encode_jwt(_claims(exp=now - 10, iat=now + 10), SECRET))
+
+
+def test_alg_none_rejected(verifier):
+    """Test that unsigned tokens cannot bypass the signature check."""
+    token = encode_jwt(_claims(), SECRET)
+    _, payload, _ = token.split('.')
+    forged_header = 'eyJhbGciOiJub25lIn0'  # {"alg":"none"}
+    with pytest.raises(AuthAgentSecurityError):
+        verifier.verify(f'{forged_header}.{payload}.')
+
+
+@pytest.mark.asyncio
+async def test_client_verifies_locally_and_falls_back():
+    """Test that the client skips /introspect unless revocation checks are requested."""
+    local = URLValidator(blocked_networks=())
+    async with StandInServer() as server:
+        async with AuthAgentClient(
+            DEFAULT_CLIENT_ID, 'http://localhost:3000/callback', DEFAULT_CLIENT_SECRET, server.url,
+            url_validator=local, jwt_secret=DEFAULT_JWT_SECRET
+        ) as client, AuthAgentSDK(DEFAULT_AGENT_ID, DEFAULT_AGENT_SECRET, 'gpt-4', url_validator=local) as sdk:
+            url, verifier, _ = client.get_authorization_url()
+            status = await sdk.complete_authentication_flow_async(url, poll_strategy=FixedPoll(0.01))
+            token = (await client.exchange_code_for_tokens(status['code'], verifier))['access_token']
+
+            result = await client.verify_access_token_local(token)
+            assert result['active'] is True
+            assert result['sub'] == DEFAULT_AGENT_ID
+            assert (await client.verify_access_token_local(token + 'x'))['active'] is False
+            assert '/introspect' not in server.stats.requests
+
+            result = await client.verify_access_token_local(token, check_revocation=True)
+            assert result['active'] is True
+            assert server.stats.requests['/introspect'] == 1
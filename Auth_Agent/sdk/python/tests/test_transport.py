@@ -0,0 +1,298 @@
+"""
+Tests for pooled HTTP transport
+"""
+
+import asyncio
+import json
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from auth_agent_sdk.agent import AuthAgentSDK
+from auth_agent_sdk.client import AuthAgentClient
+from auth_agent_sdk.common.deadline import Deadline
+from auth_agent_sdk.common.errors import AuthAgentTimeoutError
+from auth_agent_sdk.common.retry import RetryOptions
+from auth_agent_sdk.common.transport import AsyncTransport, SyncTransport, BufferedResponse, PoolOptions
+
+
+@pytest.fixture
+async def server():
+    """Local server that reports which client port each request came from."""
+    async def handler(request):
+        peer = request.transport.get_extra_info('peername')
+        return web.json_response({'port': peer[1]})
+
+    app = web.Application()
+    app.router.add_get('/peer', handler)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    yield test_server
+    await test_server.close()
+
+
+@pytest.fixture
+def sync_server():
+    """Threaded keep-alive HTTP server answering the agent and token endpoints."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _reply(self, body):
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.startswith('/api/check-status'):
+                self._reply({'status': 'authenticated', 'code': 'ac_123'})
+            else:
+                self._reply({'port': self.client_address[1]})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path == '/token':
+                self._reply({'access_token': 'at_123', 'token_type': 'Bearer'})
+            else:
+                self._reply({'success': True, 'message': 'ok'})
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def stalling_server():
+    """Threaded HTTP server that stalls before answering or trickles its body."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            try:
+                if self.path.startswith('/trickle'):
+                    self.send_response(200)
+                    self.send_header('Content-Length', '100')
+                    self.end_headers()
+                    for _ in range(100):
+                        self.wfile.write(b'x')
+                        self.wfile.flush()
+                        time.sleep(0.05)
+                else:
+                    time.sleep(2.0)
+                    self.send_response(200)
+                    self.send_header('Content-Length', '2')
+                    self.end_headers()
+                    self.wfile.write(b'{}')
+            except OSError:
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_pool_options_defaults():
+    """Test default pool options."""
+    options = PoolOptions()
+    assert options.limit == 100
+    assert options.limit_per_host == 10
+    assert options.keepalive_timeout == 30.0
+
+
+@pytest.mark.asyncio
+async def test_transport_reuses_session():
+    """Test the same session is returned on every call."""
+    transport = AsyncTransport()
+    first = await transport.get_session()
+    second = await transport.get_session()
+    assert first is second
+    await transport.aclose()
+    assert transport.closed
+
+
+@pytest.mark.asyncio
+async def test_transport_reuses_connection(server):
+    """Test keep-alive connections are reused across requests."""
+    async with AsyncTransport(PoolOptions(limit_per_host=1)) as transport:
+        ports = set()
+        for _ in range(5):
+            session = await transport.get_session()
+            async with session.get(server.make_url('/peer')) as response:
+                ports.add((await response.json())['port'])
+        assert len(ports) == 1
+    assert transport.closed
+
+
+@pytest.mark.asyncio
+async def test_transport_reopens_after_close():
+    """Test a closed transport creates a new session on demand."""
+    transport = AsyncTransport()
+    first = await transport.get_session()
+    await transport.aclose()
+    second = await transport.get_session()
+    assert first is not second
+    assert first.closed
+    await transport.aclose()
+
+
+def test_transport_closes_session_of_finished_loop():
+    """Test moving to a new event loop closes the session made on the old one."""
+    transport = AsyncTransport()
+    first = asyncio.run(transport.get_session())
+    assert not first.closed
+
+    async def reopen():
+        session = await transport.get_session()
+        await transport.aclose()
+        return session
+
+    second = asyncio.run(reopen())
+    assert second is not first
+    assert first.closed
+
+
+def test_transport_closes_session_on_its_own_running_loop():
+    """Test a session whose loop still runs in another thread is closed by that loop."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        transport = AsyncTransport()
+        first = asyncio.run_coroutine_threadsafe(transport.get_session(), loop).result(5)
+        asyncio.run(transport.get_session())
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), loop).result(5)
+        assert first.closed
+        asyncio.run(transport.aclose())
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+
+@pytest.mark.asyncio
+async def test_sdk_context_manager_closes_transport():
+    """Test the SDK closes its own transport on exit."""
+    async with AuthAgentSDK(agent_id='agent_123', agent_secret='secret_123', model='gpt-4') as sdk:
+        await sdk.transport.get_session()
+        assert not sdk.transport.closed
+    assert sdk.transport.closed
+
+
+@pytest.mark.asyncio
+async def test_sdk_does_not_close_shared_transport():
+    """Test a caller-provided transport outlives the SDK."""
+    transport = AsyncTransport()
+    async with AuthAgentSDK(
+        agent_id='agent_123', agent_secret='secret_123', model='gpt-4', transport=transport
+    ) as sdk:
+        await sdk.transport.get_session()
+    assert not transport.closed
+    await transport.aclose()
+
+
+def test_sync_transport_reuses_connection(sync_server):
+    """Test keep-alive connections are reused by the sync transport."""
+    with SyncTransport() as transport:
+        ports = {transport.get_session().get(f"{sync_server}/peer").json()['port'] for _ in range(5)}
+        assert len(ports) == 1
+    assert transport.closed
+
+
+def test_sync_request_buffers_body_and_reuses_connection(sync_server):
+    """Test request() returns the body read under its deadline and keeps the connection pooled."""
+    with SyncTransport() as transport:
+        responses = [transport.request('GET', f"{sync_server}/peer", Deadline(5.0)) for _ in range(5)]
+        assert all(isinstance(response, BufferedResponse) and response.ok for response in responses)
+        assert responses[0].headers['Content-Type'] == 'application/json'
+        assert len({response.json()['port'] for response in responses}) == 1
+
+
+def test_sync_transport_session_per_thread():
+    """Test each thread gets its own session sharing one pool."""
+    transport = SyncTransport()
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(transport.get_session()))
+    thread.start()
+    thread.join()
+    main_session = transport.get_session()
+    assert main_session is transport.get_session()
+    assert sessions[0] is not main_session
+    assert sessions[0].get_adapter('https://x') is main_session.get_adapter('https://x')
+    transport.close()
+
+
+def test_sync_transport_recreates_after_close():
+    """Test sessions are rebuilt on a fresh pool after close."""
+    transport = SyncTransport()
+    first = transport.get_session()
+    transport.close()
+    second = transport.get_session()
+    assert first is not second
+    transport.close()
+
+
+def test_sdk_sync_methods(sync_server):
+    """Test the sync SDK methods run over the pooled transport."""
+    with AuthAgentSDK(agent_id='agent_123', agent_secret='secret_123', model='gpt-4') as sdk:
+        sdk._extract_auth_server_url = lambda authorization_url: sync_server
+        result = sdk.authenticate('req_123', sync_server)
+        assert result['success'] is True
+        status = sdk.check_status('req_123', sync_server)
+        assert status['code'] == 'ac_123'
+    assert sdk.sync_transport.closed
+
+
+def test_client_sync_token_exchange(sync_server):
+    """Test the sync token exchange runs over the pooled transport."""
+    with AuthAgentClient(client_id='test', redirect_uri='https://example.com/callback') as client:
+        client.auth_server_url = sync_server
+        tokens = client.exchange_code_for_tokens_sync('ac_123', 'verifier')
+        assert tokens['access_token'] == 'at_123'
+
+
+def test_sync_request_enforces_deadline_while_waiting(stalling_server):
+    """Test a request to a server that never answers is cut off at the deadline."""
+    with SyncTransport() as transport:
+        start = time.perf_counter()
+        with pytest.raises(AuthAgentTimeoutError):
+            transport.request('GET', f"{stalling_server}/hang", Deadline(0.3))
+        assert time.perf_counter() - start < 1.0
+
+
+def test_sync_request_enforces_deadline_while_reading_body(stalling_server):
+    """Test a body trickled one byte at a time cannot outlast the deadline."""
+    threads = threading.active_count()
+    with SyncTransport() as transport:
+        start = time.perf_counter()
+        with pytest.raises(AuthAgentTimeoutError):
+            transport.request('GET', f"{stalling_server}/trickle", Deadline(0.5))
+        assert time.perf_counter() - start < 1.0
+    # Cancellation is cooperative: no watchdog threads are left behind
+    assert threading.active_count() <= threads + 1
+
+
+def test_sdk_sync_flow_bounded_by_timeout(stalling_server):
+    """Test the sync flow's timeout covers requests that hang, retries included."""
+    options = RetryOptions(max_retries=3, initial_delay=0.01)
+    with AuthAgentSDK(agent_id='agent_123', agent_secret='secret_123', model='gpt-4', retry_options=options) as sdk:
+        sdk._extract_auth_server_url = lambda authorization_url: stalling_server
+        start = time.perf_counter()
+        with pytest.raises(AuthAgentTimeoutError):
+            sdk.check_status('req_123', stalling_server, Deadline(0.5))
+        assert time.perf_counter() - start < 1.5
@@ -3,7 +3,7 @@ Tests for URL validation and SSRF protection
 """
 
 import pytest
-from auth_agent_sdk.common.validation import validate_url, validate_redirect_uri
+from auth_agent_sdk.common.validation import validate_url, validate_redirect_uri, URLValidator
 from auth_agent_sdk.common.errors import AuthAgentSecurityError, AuthAgentValidationError
 
 
@@ -69,6 +69,47 @@ def test_validate_url_invalid():
         validate_url('')
 
 
+@pytest.mark.parametrize('url', [
+    'http://[::1]/',
+    'http://[fe80::1]/',
+    'http://[fd12:3456::1]/',
+    'http://[::ffff:127.0.0.1]/',
+    'http://169.254.169.254/latest/meta-data',
+    'http://100.64.0.1/',
+    'http://0.0.0.0/',
+    'http://2130706433/',
+    'http://0x7f.1/',
+    'http://localhost./',
+    'http://app.localhost/',
+])
+def test_validate_url_block_extended_ranges(url):
+    """Test blocking of IPv6, link-local, CGNAT and shorthand IPv4 addresses."""
+    with pytest.raises(AuthAgentSecurityError):
+        validate_url(url)
+
+
+def test_validate_url_public_ip_allowed():
+    """Test that public addresses pass."""
+    assert validate_url('https://8.8.8.8/').hostname == '8.8.8.8'
+    assert validate_url('https://[2606:4700::1111]/').hostname == '2606:4700::1111'
+
+
+def test_url_validator_caches_verdicts():
+    """Test that hostname verdicts are memoized, including rejections."""
+    validator = URLValidator(['auth-agent.com'], cache_size=2)
+
+    validator.validate('https://auth.auth-agent.com/authorize')
+    validator.validate('https://auth.auth-agent.com/token')
+    for _ in range(2):
+        with pytest.raises(AuthAgentSecurityError):
+            validator.validate('https://evil.com/')
+
+    info = validator.cache_info()
+    assert info.hits == 2
+    assert info.misses == 2
+    assert info.currsize == 2
+
+
 def test_validate_redirect_uri_https():
     """Test validation of HTTPS redirect URIs."""
     validate_redirect_uri('https://example.com/callback')
@@ -29,6 +29,7 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "aiohttp>=3.8.0",
+        "requests>=2.28.0",
         "typing-extensions>=4.0.0; python_version<'3.11'",
         "browser-use>=0.1.0",
         "playwright>=1.40.0",